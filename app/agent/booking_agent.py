@@ -1,10 +1,12 @@
+import asyncio
 from datetime import date
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.agents import AgentExecutor, create_tool_calling_agent
-from app.database import SessionLocal
-from app.chatbot.models import Session, Message
+from app.agent.context import SessionContext, load_session_context
+from app.agent.fast_path import fast_path
+from app.agent.usage import TurnUsage, prompt_usage
 
 from tools.blanes import (
     list_reservations,
@@ -24,10 +26,12 @@ from tools.blanes import (
     # handle_filtered_pagination_response,
     authenticate_email,
     get_available_time_slots,
+    get_available_time_slots_range,
     get_available_periods,
     handle_user_pagination_response,
 )
 from tools.misc_tools import sum_tool
+from tools.output_budget import tool_output_budget
 
 load_dotenv()
 district_map = {
@@ -218,19 +222,15 @@ district_map = {
 # {chat_history}
 # """
 
-system_prompt = """Hi there! I’m *Dabablane AI* — your smart and talkative assistant who’s always here for you. 😎  
+# The system prompt is a static prefix (identical bytes on every turn and for
+# every session, so OpenAI can cache it: tools, rules, district map) followed by
+# the per-session section. Keep anything that varies out of the prefix.
+STATIC_SYSTEM_PROMPT = """Hi there! I’m *Dabablane AI* — your smart and talkative assistant who’s always here for you. 😎  
 Think of me as your tech-savvy buddy: I can help you make reservations and even find your booking details.  
 I’m powered by a special protocol called *RISEN* to stay secure, reliable, and super helpful.
 
 ---
 
-🧠 *My Memory for This Session*  
-Session ID: `{session_id}`  
-Client Email: `{client_email}`  
-Date: `{date}`  
-
----
-
 🔐 *RISEN Protocol*:
 
 *R - Role*: I’m your tool-powered assistant and companion. I handle the serious tasks via tools but keep the conversation friendly.  
@@ -250,10 +250,11 @@ Date: `{date}`
 - 🛎️ Make new reservations.  
 - 📍 Suggest blanes: category is **mandatory**, location is optional.  
 - 📄 Show results (10 at a time) with title + price if available → then ask “Want more? Or see details of any?”.  
+- ➡️ Pass the session ID to listing tools. On “Want more?” → yes, call `handle_user_pagination_response` with the session ID and the `cursor` shown under the last results (never search again just to page).  
 - 🔎 On “See details”, use `get_blane_info` with blane id and ask: “Do you want me to book this for you, or see other blanes?”.  
 - 🧾 Only start booking after the user has seen details.  
 - 💵 Handle payments properly (partial, online, or cash).  
-- use get_available_time_slots and get_available_periods to show available slots or periods for the selected blane.
+- use get_available_time_slots and get_available_periods to show available slots or periods for the selected blane. For several dates ("this weekend", "next week"), call get_available_time_slots_range once with the date range.
 
 ---
 
@@ -272,7 +273,7 @@ Date: `{date}`
    - Collect required details.  
    - `preview_reservation(...)` → show all the data you have, recap & price.  
    - Confirm all the details with user.  
-   - `create_reservation(...)` → finalize booking.  
+   - `create_reservation(...)` → finalize booking, passing the recap's `quote_id`.  
 
 4. If user wants to see more blanes → repeat step 1 with same category/location.  
 
@@ -282,12 +283,28 @@ Date: `{date}`
 (Use this to normalize spelling for `list_blanes_by_location_and_category`)  
 {district_map}  
 
+---
+"""
+
+SESSION_PROMPT = """
+🧠 *My Memory for This Session*  
+Session ID: `{session_id}`  
+Client Email: `{client_email}`  
+Date: `{date}`  
+
 ---
 
 🗨️ **Previous Messages**:  
 {chat_history}
 """
 
+# The district map is rendered into the prefix once, braces escaped for the
+# prompt template.
+_district_map_text = str(district_map).replace("{", "{{").replace("}", "}}")
+system_prompt = (
+    STATIC_SYSTEM_PROMPT.replace("{district_map}", _district_map_text) + SESSION_PROMPT
+)
+
 # system_prompt = """
 # Hi there! I’m *Dabablane AI* — your smart and talkative assistant who’s always here for you. 😎
 # Think of me as your tech-savvy buddy: I can help you make reservations, and even find your booking details.
@@ -534,22 +551,6 @@ Date: `{date}`
 # """
 
 
-from sqlalchemy import desc
-
-
-def get_chat_history(session_id: str):
-    with SessionLocal() as db:
-        history = (
-            db.query(Message)
-            .filter(Message.session_id == session_id)
-            .order_by(desc(Message.timestamp))
-            .limit(20)
-            .all()
-        )
-        # reverse the order to show oldest first (chat style)
-        return [(msg.sender, msg.content) for msg in reversed(history)]
-
-
 class BookingToolAgent:
     def __init__(self):
         self.tools = [
@@ -571,11 +572,16 @@ class BookingToolAgent:
             # handle_filtered_pagination_response,
             authenticate_email,
             get_available_time_slots,
+            get_available_time_slots_range,
             get_available_periods,
             handle_user_pagination_response,
         ]
+        # Every tool output is capped and counted before reaching the agent.
+        self.tools = tool_output_budget.wrap_all(self.tools)
 
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        # stream_usage: the agent streams, and the usage (with cached tokens)
+        # only comes back on a stream when asked for.
+        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, stream_usage=True)
 
         self.prompt = ChatPromptTemplate.from_messages(
             [
@@ -591,30 +597,62 @@ class BookingToolAgent:
 
         self.executor = AgentExecutor(agent=self.agent, tools=self.tools, verbose=True)
 
-    def get_response(self, incoming_text: str, session_id: str):
-        # Get and format chat history
-        raw_history = get_chat_history(session_id)
-        formatted_history = "\n".join(
-            [f"{i+1}. {sender}: {msg}" for i, (sender, msg) in enumerate(raw_history)]
-        )
-        # formatted_history = "\n".join([f"{sender}: {msg}" for sender, msg in raw_history])
-
-        db = SessionLocal()
-        session = db.query(Session).filter_by(id=session_id).first()
-        client_email = session.client_email if session else "unauthenticated"
+    def _build_inputs(
+        self, incoming_text: str, session_id: str, context: SessionContext = None
+    ) -> dict:
+        # One query for the session's email and recent history, unless the
+        # caller already loaded it.
+        if context is None:
+            context = load_session_context(session_id)
+        client_email = context.client_email or "unauthenticated"
         print(f"client email : {client_email}")
-        db.close()
         print(incoming_text)
+        return {
+            "input": incoming_text,
+            "date": date.today().isoformat(),
+            "session_id": session_id,
+            "chat_history": context.formatted_history(),
+            "client_email": client_email,
+        }
+
+    def get_response(
+        self, incoming_text: str, session_id: str, context: SessionContext = None
+    ):
+        if context is None:
+            context = load_session_context(session_id)
+        # Greetings, "show more" and the like are answered without the LLM.
+        reply = fast_path.route(incoming_text, session_id, context)
+        if reply is not None:
+            return reply
+
         # Run agent with context
+        usage = TurnUsage()
         response = self.executor.invoke(
-            {
-                "input": incoming_text,
-                "date": date.today().isoformat(),
-                "session_id": session_id,
-                "chat_history": formatted_history,
-                "client_email": client_email,
-                "district_map": district_map,
-            }
+            self._build_inputs(incoming_text, session_id, context),
+            config={"callbacks": [usage]},
+        )
+        prompt_usage.record(usage)
+
+        return response["output"]
+
+    async def aget_response(
+        self, incoming_text: str, session_id: str, context: SessionContext = None
+    ):
+        """
+        Async variant of `get_response`. The LLM calls and the tools that have
+        async versions run on the event loop, so one worker interleaves many
+        conversations; the DB reads and sync-only tools run in threads.
+        """
+        if context is None:
+            context = await asyncio.to_thread(load_session_context, session_id)
+        reply = await asyncio.to_thread(
+            fast_path.route, incoming_text, session_id, context
         )
+        if reply is not None:
+            return reply
+        inputs = self._build_inputs(incoming_text, session_id, context)
+        usage = TurnUsage()
+        response = await self.executor.ainvoke(inputs, config={"callbacks": [usage]})
+        prompt_usage.record(usage)
 
         return response["output"]
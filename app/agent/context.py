@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, true
+
+from app.chatbot.models import Message, Session, SessionSummary
+from app.database import SessionLocal
+
+# Messages not yet folded into the session summary (app/agent/memory.py) are
+# shown verbatim, at most HISTORY_LIMIT of them, each cut to
+# HISTORY_MESSAGE_CHARS so a pasted listing can't take over the prompt.
+HISTORY_LIMIT = 20
+HISTORY_MESSAGE_CHARS = 800
+
+
+@dataclass
+class SessionContext:
+    """What the agent needs about a session for one turn."""
+
+    session_id: str
+    client_email: Optional[str] = None
+    history: List[Tuple[str, str]] = field(default_factory=list)  # oldest first
+    summary: str = ""  # Older messages, summarized
+
+    def formatted_history(self) -> str:
+        lines = [
+            f"{i+1}. {sender}: {_clip(msg)}"
+            for i, (sender, msg) in enumerate(self.history)
+        ]
+        if self.summary:
+            lines = [
+                "Summary of the earlier conversation:",
+                self.summary,
+                "",
+                "Latest messages:",
+            ] + lines
+        return "\n".join(lines)
+
+
+def _clip(text, limit: int = HISTORY_MESSAGE_CHARS) -> str:
+    text = text or ""
+    return text if len(text) <= limit else text[:limit].rstrip() + " […]"
+
+
+def _summarized_until(session_id: str):
+    return (
+        select(SessionSummary.summarized_until)
+        .where(SessionSummary.session_id == session_id)
+        .scalar_subquery()
+    )
+
+
+def _recent_messages(session_id: str, limit: int):
+    """The session's newest messages not yet covered by its summary."""
+    return (
+        select(Message.sender, Message.content, Message.timestamp, Message.id)
+        .where(
+            Message.session_id == session_id,
+            Message.id > func.coalesce(_summarized_until(session_id), 0),
+        )
+        .order_by(Message.timestamp.desc(), Message.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+
+
+def load_session_context(
+    session_id: str, db=None, limit: int = HISTORY_LIMIT
+) -> SessionContext:
+    """
+    Loads the session's client email, its summary and its last `limit`
+    unsummarized messages in a single query. Pass `db` to reuse an open DB
+    session.
+    """
+    own_db = db is None
+    if own_db:
+        db = SessionLocal()
+
+    try:
+        recent = _recent_messages(session_id, limit)
+        # Anchor on the id itself so we get a row even for a session with no
+        # Session record or no messages yet.
+        anchor = select(literal(session_id).label("id")).subquery()
+        rows = db.execute(
+            select(
+                Session.client_email,
+                SessionSummary.summary,
+                recent.c.sender,
+                recent.c.content,
+            )
+            .select_from(anchor)
+            .outerjoin(Session, Session.id == anchor.c.id)
+            .outerjoin(SessionSummary, SessionSummary.session_id == anchor.c.id)
+            .outerjoin(recent, true())
+            .order_by(recent.c.timestamp, recent.c.id)
+        ).all()
+        return SessionContext(
+            session_id=session_id,
+            client_email=rows[0].client_email if rows else None,
+            history=[(row.sender, row.content) for row in rows if row.sender],
+            summary=(rows[0].summary or "") if rows else "",
+        )
+
+    finally:
+        if own_db:
+            db.close()
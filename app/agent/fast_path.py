@@ -0,0 +1,184 @@
+import os
+import re
+import textwrap
+import threading
+from collections import Counter
+from urllib.parse import unquote, urlparse
+
+from tools.blanes import (
+    CATEGORY_ALIASES,
+    CATEGORY_KEYWORDS,
+    _show_listing_page,
+    classify_message,
+    find_blanes_by_name_or_link,
+    get_blane_info,
+    introduction_message,
+    list_blanes_by_location_and_category,
+)
+from tools.catalog import catalog
+from tools.cursors import listing_cursors
+from tools.name_search import name_index
+from tools.text_normalize import fold, tokenize
+
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() != "false"
+# A greeting longer than this probably carries a request too ("hi, I need a
+# spa in Anfa tomorrow"): leave it to the agent.
+FAST_PATH_MAX_GREETING_WORDS = 5
+# A link whose best match scores at least this opens the blane directly.
+FAST_PATH_LINK_SCORE = 90
+
+_LINK_RE = re.compile(r"^(?:https?://|www\.)\S*dabablane\S*$", re.IGNORECASE)
+
+# Whole messages asking for the next page of the last listing (fullmatch).
+_SHOW_MORE_RE = re.compile(
+    r"(?:(?:show|see|give|send)(?: me)? )?(?:some )?"
+    r"(?:more|next|the next ones|next page|others|other ones)(?: please)?"
+    r"|(?:voir|afficher|montre[rz]?(?: moi)?) (?:plus|la suite|les suivants)"
+    r"|plus|la suite|suivants?|encore"
+)
+
+# Words that may surround a bare category name ("show me spas please").
+_FILLER_WORDS = {
+    "a", "an", "any", "find", "for", "i", "im", "looking", "me", "please",
+    "show", "some", "the", "want", "cherche", "des", "je", "moi", "montre",
+    "svp", "stp", "un", "une", "veux", "voir",
+}  # fmt: skip
+
+_ASK_EMAIL = "📧 To get started, could you share your email address?"
+_OFFER_BOOKING = "Do you want me to book this for you, or see other blanes?"
+
+
+def _category_of(words: list):
+    """The category a message names, if it names nothing else."""
+    rest = [w for w in words if w not in _FILLER_WORDS]
+    if len(rest) != 1:
+        return None
+    word = rest[0]
+    for candidate in (word, word[:-1] if word.endswith("s") else word):
+        candidate = CATEGORY_ALIASES.get(candidate, candidate)
+        if candidate in CATEGORY_KEYWORDS:
+            return candidate
+    return None
+
+
+class FastPathRouter:
+    """
+    Answers the turns that don't need the LLM before the agent runs.
+
+    `route` classifies the message with the same rules as the
+    `check_message_relevance` tool and a few whole-message patterns:
+
+    - greetings: the introduction (and the email request if unauthenticated)
+    - clearly off-topic messages: the redirect message
+    - "show more": the next page of the session's last listing
+    - a bare category name ("spa", "restaurants"): that category's listing
+    - a dabablane link: the blane's details, or its closest matches
+
+    Anything else, or anything ambiguous, returns None and goes to the agent.
+    The tool calls are only taken for authenticated sessions, since the agent
+    asks for the email before anything else.
+    """
+
+    def __init__(self, enabled: bool = FAST_PATH_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.served = Counter()
+
+    def route(self, incoming_text: str, session_id: str, context=None):
+        """The reply for this turn, or None to run the agent."""
+        with self._lock:
+            self.turns += 1
+        if not self.enabled:
+            return None
+        try:
+            intent, reply = self._route(incoming_text.strip(), session_id, context)
+        except Exception as e:
+            print(f"❌ Fast path failed, using the agent: {e}")
+            return None
+        if reply is None or reply.startswith("❌"):
+            # Let the agent deal with tool errors (expired list, API down...).
+            return None
+        with self._lock:
+            self.served[intent] += 1
+            served = sum(self.served.values())
+            turns = self.turns
+        print(
+            f"⚡ Fast path ({intent}) for {session_id}: "
+            f"{served}/{turns} turns ({served / turns:.0%}) without the LLM"
+        )
+        return reply
+
+    def _route(self, text: str, session_id: str, context) -> tuple:
+        if not text:
+            return None, None
+        authenticated = bool(context and context.client_email)
+
+        if _LINK_RE.match(text):
+            return "link", self._open_link(text) if authenticated else None
+
+        words = tokenize(text)
+        verdict, scores = classify_message(text)
+        if verdict.startswith("irrelevant") and scores.get("irrelevant"):
+            # Only when an off-topic keyword matched: a message that matched
+            # nothing at all is often an answer ("2", "tomorrow at 5").
+            if not scores.get("intent"):
+                return "irrelevant", verdict.split(":", 1)[1].strip()
+        if (
+            verdict == "greeting"
+            and len(words) <= FAST_PATH_MAX_GREETING_WORDS
+            and not (scores["blane"] or scores["location"] or scores["intent"])
+        ):
+            return "greeting", self._greet(text, authenticated)
+
+        if not authenticated:
+            return None, None
+        if _SHOW_MORE_RE.fullmatch(" ".join(words)):
+            cursor = listing_cursors.latest(session_id)
+            if cursor is None:
+                return None, None
+            return "show_more", _show_listing_page(cursor.token, session_id)
+        category = _category_of(words)
+        if category:
+            return "category", list_blanes_by_location_and_category.invoke(
+                {"category": category, "session_id": session_id}
+            )
+        return None, None
+
+    def _greet(self, text: str, authenticated: bool) -> str:
+        parts = []
+        if "salam" in fold(text):
+            parts.append("Walikum Assalam! 👋")
+        parts.append(textwrap.dedent(introduction_message.func()).strip())
+        if not authenticated:
+            parts.append(_ASK_EMAIL)
+        return "\n\n".join(parts)
+
+    def _open_link(self, link: str):
+        if not catalog.ensure_loaded():
+            return None
+        # The last path segment is the slug, as in find_blanes_by_name_or_link.
+        path = urlparse(link if link.startswith("http") else f"https://{link}").path
+        slug = ([s for s in path.split("/") if s][-1:] or [""])[0]
+        matches = name_index.search(unquote(slug).replace("-", " "), limit=2)
+        # One clearly best match: show it, as the agent would next.
+        if matches and matches[0][1] >= FAST_PATH_LINK_SCORE:
+            if len(matches) == 1 or matches[1][1] < matches[0][1]:
+                info = get_blane_info.invoke({"blane_id": matches[0][0]})
+                return f"{info}\n\n{_OFFER_BOOKING}"
+        result = find_blanes_by_name_or_link.invoke({"query": link})
+        return f"{result}\n\nWhich one is it?"
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = sum(self.served.values())
+            return {
+                "enabled": self.enabled,
+                "turns": self.turns,
+                "served": served,
+                "served_ratio": round(served / self.turns, 3) if self.turns else None,
+                "by_intent": dict(self.served),
+            }
+
+
+fast_path = FastPathRouter()
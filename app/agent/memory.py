@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.chatbot.models import Message, SessionSummary
+from app.database import SessionLocal
+
+# The agent sees the summary plus the messages after it. Once more than
+# MEMORY_RECENT_MESSAGES + MEMORY_SUMMARIZE_BATCH are unsummarized, all but the
+# last MEMORY_RECENT_MESSAGES are folded into the summary, so a turn's prompt
+# carries at most ~RECENT + BATCH raw messages whatever the conversation length.
+MEMORY_RECENT_MESSAGES = int(os.getenv("MEMORY_RECENT_MESSAGES", 6))
+MEMORY_SUMMARIZE_BATCH = int(os.getenv("MEMORY_SUMMARIZE_BATCH", 4))
+MEMORY_MODEL = os.getenv("MEMORY_MODEL", "gpt-4o-mini")
+MEMORY_SUMMARY_CHARS = int(os.getenv("MEMORY_SUMMARY_CHARS", 1500))
+# Each message is cut to this length before summarizing; the ends of long
+# listings and blane descriptions don't belong in the summary anyway.
+MEMORY_MESSAGE_CHARS = 1200
+
+SUMMARY_PROMPT = """You maintain the memory of a conversation between a client and the DabaBlane booking assistant.
+
+Update the summary below with the new messages. Keep:
+- who the client is (name, email, phone, city) if given
+- blanes discussed, with their ids, and what the client thought of them
+- booking details collected so far (dates, times, quantities, persons, payment)
+- reservations made or cancelled, with their references
+- open questions and what the assistant was about to do next
+
+Drop greetings, full descriptions and listings (keep only the blane ids and names the client cared about).
+Write short bullet points in the conversation's language, at most {max_chars} characters.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+
+class ConversationMemory:
+    """
+    Rolling per-session summary of the conversation (table session_summaries).
+
+    After each turn `schedule_update` queues the session on a background
+    worker, which folds the oldest unsummarized messages into the summary with
+    one small LLM call. `load_session_context` then reads the summary and only
+    the messages after `summarized_until`. Turns for a session that's already
+    being summarized are coalesced into one more run.
+    """
+
+    def __init__(
+        self,
+        llm=None,
+        session_factory=SessionLocal,
+        recent: int = MEMORY_RECENT_MESSAGES,
+        batch: int = MEMORY_SUMMARIZE_BATCH,
+        max_chars: int = MEMORY_SUMMARY_CHARS,
+    ):
+        self._llm = llm
+        self.session_factory = session_factory
+        self.recent = recent
+        self.batch = batch
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._running = set()
+        self._again = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="conversation-memory"
+        )
+        self.scheduled = 0
+        self.updates = 0
+        self.messages_summarized = 0
+        self.errors = 0
+        self.last_update_ms = None
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+
+            self._llm = ChatOpenAI(model=MEMORY_MODEL, temperature=0)
+        return self._llm
+
+    # ----- Scheduling -----
+
+    def schedule_update(self, session_id: str):
+        """Queues a summary update for the session; returns immediately."""
+        with self._lock:
+            self.scheduled += 1
+            if session_id in self._running:
+                self._again.add(session_id)
+                return
+            self._running.add(session_id)
+        self._executor.submit(self._run, session_id)
+
+    def _run(self, session_id: str):
+        while True:
+            try:
+                self.update(session_id)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Error summarizing session {session_id}: {e}")
+            with self._lock:
+                if session_id not in self._again:
+                    self._running.discard(session_id)
+                    return
+                self._again.discard(session_id)
+
+    # ----- Summarizing -----
+
+    def summarize(self, summary: str, messages: list) -> str:
+        """New summary from the current one and (sender, content) messages."""
+        lines = []
+        for sender, content in messages:
+            content = (content or "").strip()
+            if len(content) > MEMORY_MESSAGE_CHARS:
+                content = content[:MEMORY_MESSAGE_CHARS].rstrip() + " […]"
+            lines.append(f"{sender}: {content}")
+        prompt = SUMMARY_PROMPT.format(
+            max_chars=self.max_chars,
+            summary=summary or "(empty)",
+            messages="\n".join(lines),
+        )
+        result = self.llm.invoke(prompt)
+        text = getattr(result, "content", result)
+        return str(text).strip()[: self.max_chars * 2]
+
+    def update(self, session_id: str) -> bool:
+        """
+        Folds the session's older unsummarized messages into its summary, if
+        there are at least `batch` of them. Returns True if it did.
+
+        `summarized_until` is a message id, so messages are taken in id order:
+        everything up to it has been folded exactly once, whatever their
+        timestamps. The LLM call runs with no database session open: the
+        messages are read in one short session and the summary written in
+        another, which gives up if the summary moved on in between.
+        """
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            row = db.get(SessionSummary, session_id)
+            summary = row.summary if row else ""
+            summarized_until = row.summarized_until if row else 0
+            pending = db.execute(
+                select(Message.id, Message.sender, Message.content)
+                .where(Message.session_id == session_id)
+                .where(Message.id > summarized_until)
+                .order_by(Message.id)
+            ).all()
+        finally:
+            db.close()
+        fold = pending[: max(len(pending) - self.recent, 0)]
+        if len(fold) < self.batch:
+            return False
+
+        summary = self.summarize(summary, [(m.sender, m.content) for m in fold])
+
+        db = self.session_factory()
+        try:
+            row = db.get(SessionSummary, session_id)
+            if (row.summarized_until if row else 0) != summarized_until:
+                return False
+            if row is None:
+                row = SessionSummary(session_id=session_id)
+                db.add(row)
+            row.summary = summary
+            row.summarized_until = fold[-1].id
+            row.updated_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+        self.updates += 1
+        self.messages_summarized += len(fold)
+        self.last_update_ms = round((time.perf_counter() - started) * 1000, 1)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "scheduled": self.scheduled,
+            "updates": self.updates,
+            "messages_summarized": self.messages_summarized,
+            "running": len(self._running),
+            "errors": self.errors,
+            "last_update_ms": self.last_update_ms,
+        }
+
+
+conversation_memory = ConversationMemory()
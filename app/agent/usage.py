@@ -0,0 +1,108 @@
+import threading
+from collections import deque
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# How many recent turns /metrics keeps.
+USAGE_RECENT_TURNS = 50
+
+
+class TurnUsage(BaseCallbackHandler):
+    """
+    Callback for one agent turn: adds up the token usage OpenAI reports for
+    each LLM call of the turn (a turn with tool calls makes several). Cached
+    input tokens are the prompt prefix the provider served from its cache.
+    """
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    self._add(
+                        usage.get("input_tokens"),
+                        (usage.get("input_token_details") or {}).get("cache_read"),
+                        usage.get("output_tokens"),
+                    )
+                    return
+        # No usage on the message: fall back to the raw OpenAI fields.
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        if token_usage:
+            self._add(
+                token_usage.get("prompt_tokens"),
+                (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+                token_usage.get("completion_tokens"),
+            )
+
+    def _add(self, input_tokens, cached, output_tokens):
+        self.llm_calls += 1
+        self.input_tokens += input_tokens or 0
+        self.cached_input_tokens += cached or 0
+        self.output_tokens += output_tokens or 0
+
+    def as_dict(self) -> dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "uncached_input_tokens": self.input_tokens - self.cached_input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+class PromptUsageStats:
+    """
+    Totals and recent per-turn token usage, for /metrics. Turns are kept
+    without their session id: that's the client's phone number.
+    """
+
+    def __init__(self, recent: int = USAGE_RECENT_TURNS):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self.turns = 0
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.output_tokens = 0
+
+    def record(self, usage: TurnUsage):
+        turn = usage.as_dict()
+        with self._lock:
+            self.turns += 1
+            self.llm_calls += usage.llm_calls
+            self.input_tokens += usage.input_tokens
+            self.cached_input_tokens += usage.cached_input_tokens
+            self.output_tokens += usage.output_tokens
+            self._recent.append(turn)
+        print(
+            f"🧮 Tokens: {turn['input_tokens']} in "
+            f"({turn['cached_input_tokens']} cached), {turn['output_tokens']} out, "
+            f"{turn['llm_calls']} LLM calls"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "llm_calls": self.llm_calls,
+                "input_tokens": self.input_tokens,
+                "cached_input_tokens": self.cached_input_tokens,
+                "uncached_input_tokens": self.input_tokens - self.cached_input_tokens,
+                "output_tokens": self.output_tokens,
+                "cache_hit_ratio": (
+                    round(self.cached_input_tokens / self.input_tokens, 3)
+                    if self.input_tokens
+                    else None
+                ),
+                "recent_turns": list(self._recent),
+            }
+
+
+prompt_usage = PromptUsageStats()
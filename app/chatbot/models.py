@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -41,3 +41,38 @@ class Message(Base):
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     session = relationship("Session", back_populates="messages")
+
+    # History reads filter on session_id and order by newest first
+    # (migrations/versions/0002).
+    __table_args__ = (
+        Index(
+            "ix_messages_session_id_timestamp",
+            session_id,
+            timestamp.desc(),
+            id.desc(),
+        ),
+    )
+
+
+class ProcessedMessage(Base):
+    """WhatsApp message ids already taken for processing (webhook dedup)."""
+
+    __tablename__ = "processed_messages"
+
+    wa_message_id = Column(String(128), primary_key=True)
+    wa_id = Column(String(30), nullable=True)
+    received_at = Column(DateTime, default=datetime.utcnow)
+
+
+class SessionSummary(Base):
+    """
+    Rolling summary of a session's older messages (app/agent/memory.py).
+    Messages with ids up to `summarized_until` are covered by `summary`.
+    """
+
+    __tablename__ = "session_summaries"
+
+    session_id = Column(String(64), ForeignKey("sessions.id"), primary_key=True)
+    summary = Column(Text, nullable=False, default="")
+    summarized_until = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
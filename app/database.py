@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 import requests
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
@@ -10,6 +11,8 @@ load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL")
 
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
 # Enhanced engine configuration with connection pooling and SSL handling
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -30,6 +33,21 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def run_migrations(connection=None):
+    """
+    Upgrades the database to the latest Alembic revision, like
+    `alembic upgrade head`. Uses `connection` if given, else the app engine.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+
 def get_db():
     db = SessionLocal()
     try:
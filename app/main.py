@@ -1,15 +1,74 @@
+import asyncio
+import os
+
 from fastapi import FastAPI
 
 from app.routers import wati_webhook
 from app.routers import agent
-from app.database import engine
-from app.chatbot import models
+from app.routers import metrics
+from app.database import run_migrations
+from app.services.dedup import message_dedup
+from app.services.whatsapp_sender import whatsapp_sender
+from tools.token_manager import token_manager
+from tools.http_client import close_clients
+from tools.catalog import catalog
 
 
-models.Base.metadata.create_all(bind=engine)
+# Schema changes go through Alembic (migrations/). Set RUN_MIGRATIONS=false
+# when `alembic upgrade head` runs as a separate deploy step.
+if os.getenv("RUN_MIGRATIONS", "true").lower() != "false":
+    run_migrations()
 
 app = FastAPI()
 
 
 app.include_router(agent.router)
 app.include_router(wati_webhook.router)
+app.include_router(metrics.router)
+
+
+@app.on_event("startup")
+def warm_up_api_token():
+    # Log in to the Dabablane API once at boot and keep the token refreshed
+    # in the background, so the first WhatsApp message doesn't pay for it.
+    token_manager.get_token()
+
+
+@app.on_event("startup")
+def start_blane_catalog():
+    # Loads all active blanes in the background and keeps them refreshed, so
+    # listing and search tools answer from memory.
+    catalog.start()
+
+
+@app.on_event("startup")
+async def start_webhook_workers():
+    # Webhook messages are acknowledged immediately and processed here.
+    wati_webhook.message_queue.start()
+
+
+@app.on_event("startup")
+async def start_processed_message_pruning():
+    # processed_messages only has to cover Meta's redelivery window.
+    app.state.dedup_pruner = asyncio.create_task(message_dedup.prune_forever())
+
+
+@app.on_event("startup")
+async def start_whatsapp_sender():
+    # Replies are queued by the webhook workers and sent from here.
+    whatsapp_sender.start()
+
+
+@app.on_event("shutdown")
+async def stop_webhook_workers():
+    app.state.dedup_pruner.cancel()
+    await wati_webhook.message_queue.stop()
+    # After the workers, so the replies of the last turns still go out.
+    await whatsapp_sender.stop()
+
+
+@app.on_event("shutdown")
+def close_http_clients():
+    catalog.stop()
+    token_manager.stop()
+    close_clients()
@@ -1,10 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
 from pydantic import BaseModel
 from app.agent.booking_agent import BookingToolAgent
 from app.database import SessionLocal
-from sqlalchemy.orm import Session
-from app.chatbot.models import Session as SessionModel, Message
-from app.database import get_db
+from app.agent.memory import conversation_memory
+from app.chatbot.models import Session as SessionModel, Message, SessionSummary
 import uuid
 from datetime import datetime
 
@@ -19,19 +18,20 @@ class ChatInput(BaseModel):
 
 
 @router.post("/chat")
-def chat_with_agent(request: ChatInput, db: Session = Depends(get_db)):
+def chat_with_agent(request: ChatInput):
     session_id = request.session_id
     user_message = request.message
 
-    # Log user message
-    user_msg = Message(
-        session_id=session_id,
-        sender="user",
-        content=user_message,
-        timestamp=datetime.utcnow(),
-    )
-    db.add(user_msg)
-    db.commit()
+    # Log user message. No DB session stays open while the agent runs.
+    with SessionLocal() as db:
+        user_msg = Message(
+            session_id=session_id,
+            sender="user",
+            content=user_message,
+            timestamp=datetime.utcnow(),
+        )
+        db.add(user_msg)
+        db.commit()
 
     # Get agent response
     response_text = agent.get_response(user_message, session_id)
@@ -39,14 +39,16 @@ def chat_with_agent(request: ChatInput, db: Session = Depends(get_db)):
     response_text = response_text.replace("**", "*")
 
     # Log bot response
-    bot_msg = Message(
-        session_id=session_id,
-        sender="bot",
-        content=response_text,
-        timestamp=datetime.utcnow(),
-    )
-    db.add(bot_msg)
-    db.commit()
+    with SessionLocal() as db:
+        bot_msg = Message(
+            session_id=session_id,
+            sender="bot",
+            content=response_text,
+            timestamp=datetime.utcnow(),
+        )
+        db.add(bot_msg)
+        db.commit()
+    conversation_memory.schedule_update(session_id)
 
     return {"response": response_text}
 
@@ -76,6 +78,7 @@ def delete_session(session_id: str):
     db = SessionLocal()
     # Delete messages associated with the session
     db.query(Message).filter(Message.session_id == session_id).delete()
+    db.query(SessionSummary).filter(SessionSummary.session_id == session_id).delete()
     # Delete the session itself
     deleted = db.query(SessionModel).filter(SessionModel.id == session_id).delete()
     db.commit()
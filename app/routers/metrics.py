@@ -0,0 +1,70 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from app.agent.fast_path import fast_path
+from app.agent.memory import conversation_memory
+from app.agent.usage import prompt_usage
+from app.routers.wati_webhook import message_queue
+from app.services.dedup import message_dedup
+from app.services.delivery_status import delivery_statuses
+from app.services.whatsapp_sender import whatsapp_sender
+from tools.availability import availability_cache
+from tools.blane_cache import blane_cache
+from tools.blanes import location_index
+from tools.cursors import listing_cursors
+from tools.name_search import name_index
+from tools.output_budget import tool_output_budget
+from tools.pricing import quote_book
+from tools.schedule import blane_schedules
+from tools.semantic_search import semantic_index
+
+# /metrics is for operators. With METRICS_TOKEN set, it needs
+# "Authorization: Bearer <METRICS_TOKEN>". Without it, only requests from the
+# machine itself get in; proxied requests (X-Forwarded-For) never count as
+# local, so a reverse proxy on the same host doesn't expose it.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+LOCAL_HOSTS = {"127.0.0.1", "::1"}
+
+router = APIRouter()
+
+
+def require_metrics_access(
+    request: Request,
+    authorization: str = Header(None),
+    x_forwarded_for: str = Header(None),
+):
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}".encode()
+        if secrets.compare_digest((authorization or "").encode(), expected):
+            return
+    elif (
+        x_forwarded_for is None
+        and request.client is not None
+        and request.client.host in LOCAL_HOSTS
+    ):
+        return
+    raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_access)])
+def get_metrics():
+    return {
+        "webhook_queue": message_queue.stats(),
+        "webhook_duplicates": message_dedup.stats(),
+        "delivery_statuses": delivery_statuses.stats(),
+        "whatsapp_sender": whatsapp_sender.stats(),
+        "blane_cache": blane_cache.stats(),
+        "availability_cache": availability_cache.stats(),
+        "blane_schedules": blane_schedules.stats(),
+        "quotes": quote_book.stats(),
+        "semantic_index": semantic_index.stats(),
+        "name_index": name_index.stats(),
+        "location_index": location_index.stats(),
+        "listing_cursors": listing_cursors.stats(),
+        "conversation_memory": conversation_memory.stats(),
+        "prompt_usage": prompt_usage.stats(),
+        "fast_path": fast_path.stats(),
+        "tool_outputs": tool_output_budget.stats(),
+    }
@@ -231,20 +231,25 @@
 #     except httpx.RequestError as e:
 #         logger.error("❌ Network error while sending message: %s", e)
 from fastapi import APIRouter, Request
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from datetime import datetime
-import os
-import httpx
+import asyncio
 import logging
 import traceback
 import time
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 from app.agent.booking_agent import BookingToolAgent
+from app.agent.context import load_session_context
+from app.agent.memory import conversation_memory
 from app.database import SessionLocal
-from app.chatbot.models import Session as SessionModel, Message
+from app.chatbot.models import Session as SessionModel, Message, ProcessedMessage
 from app.format_message import formatting
+from app.services.conversation_queue import ConversationQueue
+from app.services.dedup import message_dedup
+from app.services.delivery_status import delivery_statuses
+from app.services.whatsapp_sender import whatsapp_sender
 
 # Load environment variables
 load_dotenv()
@@ -255,8 +260,6 @@ logger = logging.getLogger(__name__)
 
 # Config
 VERIFY_TOKEN = "my_custom_secret_token"
-WHATSAPP_TOKEN = os.getenv("META_ACCESS_TOKEN")
-PHONE_NUMBER_ID = os.getenv("META_PHONE_NUMBER_ID")
 
 router = APIRouter()
 agent = BookingToolAgent()
@@ -299,41 +302,144 @@ def verify_webhook(request: Request):
     return PlainTextResponse("Invalid token", status_code=403)
 
 
+def _extract_events(data: dict):
+    """
+    Walks every entry, change, message and status in a webhook payload.
+    Returns ({wa_id: [message, ...]}, [status, ...], ignored_count), with each
+    sender's messages in the order they were sent.
+    """
+    by_sender = {}
+    statuses = []
+    ignored = 0
+
+    for entry in data.get("entry") or []:
+        for change in entry.get("changes") or []:
+            value = change.get("value") or {}
+            statuses.extend(value.get("statuses") or [])
+            for message in value.get("messages") or []:
+                # Ensure it's a text message with a body; anything else is
+                # acknowledged and skipped, or Meta would keep redelivering it.
+                text = message.get("text")
+                if (
+                    "from" not in message
+                    or not isinstance(text, dict)
+                    or not isinstance(text.get("body"), str)
+                ):
+                    logger.warning(
+                        "⚠️ Non-text or malformed message received. Ignored."
+                    )
+                    ignored += 1
+                    continue
+                by_sender.setdefault(message["from"], []).append(message)
+
+    for messages in by_sender.values():
+        messages.sort(key=lambda m: int(m.get("timestamp") or 0))
+    return by_sender, statuses, ignored
+
+
 @router.post("/meta-webhook")
 async def receive_message(request: Request):
-    db = None
-
+    """
+    Validates the payload, queues its messages and acknowledges Meta at once.
+    Meta batches several messages and status updates into one POST, so every
+    entry/change is processed: statuses go to a cheap counter, messages are
+    queued per sender. Agent turns run on `message_queue` workers (senders in
+    parallel, each sender in order), so a slow LLM call never delays the 200
+    for other incoming webhooks.
+    """
     try:
         data = await request.json()
         logger.info("📩 Incoming data: %s", data)
+        by_sender, statuses, ignored = _extract_events(data)
+    except Exception as e:
+        logger.error("❌ Invalid webhook payload: %s", e)
+        return {"status": "ignored"}
 
-        entry = data.get("entry", [])[0]
-        changes = entry.get("changes", [])[0]
-        value = changes.get("value", {})
-        messages = value.get("messages")
+    for status in statuses:
+        delivery_statuses.record(status)
 
-        if not messages:
-            logger.info("🔕 No new message received.")
-            return {"status": "ignored"}
+    if not by_sender:
+        logger.info("🔕 No new message received.")
+        return {"status": "ignored", "statuses": len(statuses)}
 
-        message = messages[0]
-        wa_id = message["from"]
-        session_id = wa_id
+    queued = duplicates = rejected = 0
+    for wa_id, messages in by_sender.items():
+        for message in messages:
+            message_id = message.get("id")
 
-        # Ensure it's a text message
-        if "text" not in message:
-            logger.warning("⚠️ Non-text message received. Ignored.")
-            return {"status": "ignored"}
+            # Meta redelivers when it thinks we were too slow; drop repeats early.
+            if message_id and not message_dedup.mark_seen(message_id):
+                logger.info("🔁 Duplicate delivery of %s dropped.", message_id)
+                duplicates += 1
+                continue
+
+            text = message["text"]["body"]
+            logger.info(f"✅ Message from {wa_id}: {text}")
+
+            if message_queue.submit(wa_id, (message_id, text)):
+                queued += 1
+            else:
+                # Forget it so Meta's redelivery of this batch gets it in.
+                if message_id:
+                    message_dedup.forget(message_id)
+                rejected += 1
+
+    summary = {
+        "queued": queued,
+        "duplicates": duplicates,
+        "ignored": ignored,
+        "statuses": len(statuses),
+    }
+    if rejected:
+        # Not acknowledged, so Meta redelivers the batch once we have room;
+        # the messages queued above are dropped as duplicates then.
+        logger.warning("⚠️ Webhook queue full, asking Meta to retry %d", rejected)
+        return JSONResponse({"status": "busy", **summary}, status_code=503)
 
-        text = message["text"]["body"]
-        logger.info(f"✅ Message from {wa_id}: {text}")
+    return {"status": "queued", **summary}
 
+
+def start_turn(wa_id: str, messages: list):
+    """
+    DB work before the agent runs: claims the (message_id, text) pairs, saves
+    the user messages and loads the agent's session context. Runs in a worker
+    thread; returns (texts, context), with no texts if every message had
+    already been processed.
+    """
+    session_id = wa_id
+    db = None
+
+    try:
         # Create database session with retry logic
         def create_db_session():
             return SessionLocal()
 
         db = db_operation_with_retry(create_db_session)
 
+        # --- Claim message ids; the unique key rejects ones already handled ---
+        def claim_messages():
+            fresh = []
+            for message_id, text in messages:
+                if message_id:
+                    try:
+                        with db.begin_nested():
+                            db.add(
+                                ProcessedMessage(wa_message_id=message_id, wa_id=wa_id)
+                            )
+                    except IntegrityError:
+                        message_dedup.record_db_duplicate()
+                        logger.info(
+                            "🔁 %s was already processed, skipping.", message_id
+                        )
+                        continue
+                fresh.append(text)
+            db.commit()
+            return fresh
+
+        texts = db_operation_with_retry(claim_messages)
+        if not texts:
+            return texts, None
+
         # --- Session handling with retry ---
         def get_or_create_session():
             session = db.query(SessionModel).filter_by(id=session_id).first()
@@ -343,25 +449,44 @@ async def receive_message(request: Request):
                 db.commit()
             return session
 
-        session = db_operation_with_retry(get_or_create_session)
-
-        # --- Save user message with retry ---
-        def save_user_message():
-            user_message = Message(
-                session_id=session_id,
-                sender="user",
-                content=text,
-                timestamp=datetime.utcnow(),
-            )
-            db.add(user_message)
+        db_operation_with_retry(get_or_create_session)
+
+        # --- Save user messages with retry ---
+        def save_user_messages():
+            for text in texts:
+                db.add(
+                    Message(
+                        session_id=session_id,
+                        sender="user",
+                        content=text,
+                        timestamp=datetime.utcnow(),
+                    )
+                )
             db.commit()
-            return user_message
 
-        db_operation_with_retry(save_user_message)
+        db_operation_with_retry(save_user_messages)
+
+        # --- Email and history for the agent, in one query ---
+        context = db_operation_with_retry(
+            lambda: load_session_context(session_id, db=db)
+        )
+        return texts, context
+
+    finally:
+        if db:
+            try:
+                db.close()
+            except:
+                logger.warning("Failed to close database session")
 
-        # --- Get bot response ---
-        response = agent.get_response(incoming_text=text, session_id=session_id)
-        formatted_response = formatting(response)
+
+def save_reply(wa_id: str, formatted_response: str):
+    """Saves the bot reply. Runs in a worker thread."""
+    session_id = wa_id
+    db = None
+
+    try:
+        db = db_operation_with_retry(SessionLocal)
 
         # --- Save bot response with retry ---
         def save_bot_message():
@@ -377,66 +502,53 @@ async def receive_message(request: Request):
 
         db_operation_with_retry(save_bot_message)
 
-        logger.info(f"🤖 Bot reply to {wa_id}: {formatted_response}")
-        await send_whatsapp_message(wa_id, formatted_response)
+    finally:
+        if db:
+            try:
+                db.close()
+            except:
+                logger.warning("Failed to close database session")
+
+
+async def handle_message(wa_id: str, messages: list):
+    """
+    Worker job for one turn. The agent runs on the event loop through
+    `aget_response`; only the DB writes go to threads.
+    """
+    try:
+        texts, context = await asyncio.to_thread(start_turn, wa_id, messages)
+        if not texts:
+            return
+
+        # --- Get bot response (one turn for the whole burst) ---
+        response = await agent.aget_response(
+            incoming_text="\n".join(texts), session_id=wa_id, context=context
+        )
+        formatted_response = formatting(response)
+        await asyncio.to_thread(save_reply, wa_id, formatted_response)
+        conversation_memory.schedule_update(wa_id)
 
     except OperationalError as e:
         logger.error("❌ Database connection error in webhook: %s", e)
-        # Return a graceful response even if database fails
-        if "wa_id" in locals():
-            try:
-                await send_whatsapp_message(
-                    wa_id,
-                    "Sorry, I'm experiencing technical difficulties. Please try again in a moment.",
-                )
-            except:
-                pass
-        return {"status": "database_error", "error": "temporary_database_issue"}
+        send_whatsapp_message(
+            wa_id,
+            "Sorry, I'm experiencing technical difficulties. Please try again in a moment.",
+        )
+        return
 
     except Exception as e:
         logger.error("❌ Exception in webhook: %s", e)
         traceback.print_exc()
-        # Send error message to user if possible
-        if "wa_id" in locals():
-            try:
-                await send_whatsapp_message(
-                    wa_id, "Sorry, something went wrong. Please try again."
-                )
-            except:
-                pass
-        return {"status": "error"}
+        send_whatsapp_message(wa_id, "Sorry, something went wrong. Please try again.")
+        return
 
-    finally:
-        if db:
-            try:
-                db.close()
-            except:
-                logger.warning("Failed to close database session")
+    logger.info(f"🤖 Bot reply to {wa_id}: {formatted_response}")
+    send_whatsapp_message(wa_id, formatted_response)
 
-    return {"status": "ok"}
 
+message_queue = ConversationQueue(handle_message)
 
-async def send_whatsapp_message(recipient_number: str, message: str):
-    url = f"https://graph.facebook.com/v19.0/{PHONE_NUMBER_ID}/messages"
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": recipient_number,
-        "type": "text",
-        "text": {"body": message},
-    }
 
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:  # Increased timeout
-            response = await client.post(url, json=payload, headers=headers)
-            if response.status_code != 200:
-                logger.error("❌ WhatsApp send failed: %s", response.text)
-            else:
-                logger.info("✅ Message sent successfully to %s", recipient_number)
-    except httpx.RequestError as e:
-        logger.error("❌ Network error while sending message: %s", e)
-    except Exception as e:
-        logger.error("❌ Unexpected error while sending message: %s", e)
+def send_whatsapp_message(recipient_number: str, message: str) -> bool:
+    """Hands the message to the outbound sender; doesn't wait for Meta."""
+    return whatsapp_sender.send(recipient_number, message)
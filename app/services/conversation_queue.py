@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+import time
+
+from app.services.message_queue import MessageWorkerPool, WEBHOOK_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# A turn starts once a sender has been quiet for DEBOUNCE seconds, or at the
+# latest MAX_WAIT seconds after their first buffered message.
+DEBOUNCE_SECONDS = float(os.getenv("WEBHOOK_DEBOUNCE_SECONDS", 1.5))
+DEBOUNCE_MAX_WAIT = float(os.getenv("WEBHOOK_DEBOUNCE_MAX_WAIT", 5.0))
+POOL_FULL_RETRY = 1.0
+
+
+class _Conversation:
+    __slots__ = ("pending", "first_at", "last_at", "timer", "busy")
+
+    def __init__(self):
+        self.pending = []
+        self.first_at = 0.0
+        self.last_at = 0.0
+        self.timer = None
+        self.busy = False  # Queued on or running in the worker pool
+
+
+class ConversationQueue:
+    """
+    Per-sender serial queue in front of the agent.
+
+    Messages from one wa_id are buffered until the sender pauses for the
+    debounce window, then handed to `handler(wa_id, messages)` as a single turn.
+    At most one turn per wa_id is queued or running at a time, so history
+    reads and writes of a session never race; messages that arrive during a
+    turn are merged into the next one. Turns run on a MessageWorkerPool, which
+    bounds how many conversations are processed at once.
+    """
+
+    def __init__(
+        self,
+        handler,
+        debounce: float = DEBOUNCE_SECONDS,
+        max_wait: float = DEBOUNCE_MAX_WAIT,
+        max_pending: int = WEBHOOK_QUEUE_SIZE,
+        **pool_kwargs,
+    ):
+        self.handler = handler
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.pool = MessageWorkerPool(
+            self._run_turn, name="conversation", **pool_kwargs
+        )
+        self._conversations = {}
+        self.received = 0
+        self.rejected = 0
+        self.turns = 0
+
+    def start(self):
+        self.pool.start()
+
+    async def stop(self, timeout: float = 10.0):
+        """Dispatches everything still buffered, then drains the pool."""
+        for wa_id, conv in list(self._conversations.items()):
+            if conv.timer:
+                conv.timer.cancel()
+                conv.timer = None
+            if conv.pending and not conv.busy:
+                self._dispatch(wa_id, conv)
+        await self.pool.stop(timeout)
+
+    def pending_count(self) -> int:
+        return sum(len(c.pending) for c in self._conversations.values())
+
+    def submit(self, wa_id: str, message) -> bool:
+        """
+        Buffers a message for its sender. Returns False when too many messages
+        are already waiting, so the caller can ask Meta to redeliver.
+        """
+        if self.pending_count() >= self.max_pending:
+            self.rejected += 1
+            return False
+
+        now = time.monotonic()
+        conv = self._conversations.get(wa_id)
+        if conv is None:
+            conv = self._conversations[wa_id] = _Conversation()
+        if not conv.pending:
+            conv.first_at = now
+        conv.pending.append(message)
+        conv.last_at = now
+        self.received += 1
+
+        if not conv.busy and conv.timer is None:
+            self._arm(wa_id, conv, self.debounce)
+        return True
+
+    def _arm(self, wa_id, conv, delay):
+        loop = asyncio.get_running_loop()
+        conv.timer = loop.call_later(delay, self._on_timer, wa_id)
+
+    def _on_timer(self, wa_id):
+        conv = self._conversations.get(wa_id)
+        if conv is None:
+            return
+        conv.timer = None
+        if conv.busy or not conv.pending:
+            return
+
+        now = time.monotonic()
+        quiet_left = conv.last_at + self.debounce - now
+        deadline_left = conv.first_at + self.max_wait - now
+        wait = min(quiet_left, deadline_left)
+        if wait > 0:
+            # More messages came in since the timer was armed.
+            self._arm(wa_id, conv, wait)
+            return
+        self._dispatch(wa_id, conv)
+
+    def _dispatch(self, wa_id, conv):
+        conv.busy = True
+        if not self.pool.submit(wa_id):
+            conv.busy = False
+            logger.warning("⚠️ Worker pool full, delaying turn for %s", wa_id)
+            self._arm(wa_id, conv, POOL_FULL_RETRY)
+
+    async def _run_turn(self, wa_id):
+        conv = self._conversations[wa_id]
+        messages, conv.pending = conv.pending, []
+        self.turns += 1
+        try:
+            await self.handler(wa_id, messages)
+        finally:
+            conv.busy = False
+            if conv.pending:
+                # Messages that arrived mid-turn get their own debounce window.
+                self._on_timer(wa_id)
+            elif conv.timer is None:
+                del self._conversations[wa_id]
+
+    def stats(self) -> dict:
+        return {
+            "conversations": len(self._conversations),
+            "pending_messages": self.pending_count(),
+            "received": self.received,
+            "rejected": self.rejected,
+            "turns": self.turns,
+            "merged_messages": self.received - self.pending_count() - self.turns,
+            "pool": self.pool.stats(),
+        }
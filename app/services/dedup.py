@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEDUP_CACHE_SIZE = int(os.getenv("WEBHOOK_DEDUP_CACHE_SIZE", 10000))
+# Meta stops redelivering a webhook after 7 days, so older processed ids can
+# go; pruned at startup and then every PRUNE_INTERVAL seconds.
+PROCESSED_MESSAGE_RETENTION_DAYS = int(os.getenv("PROCESSED_MESSAGE_RETENTION_DAYS", 7))
+PROCESSED_MESSAGE_PRUNE_INTERVAL = int(
+    os.getenv("PROCESSED_MESSAGE_PRUNE_INTERVAL", 6 * 3600)
+)
+
+
+class MessageDeduplicator:
+    """
+    In-memory LRU of recently seen WhatsApp message ids.
+
+    Meta redelivers a webhook when it doesn't get a timely 200, so the same
+    message `id` can arrive several times. The webhook drops repeats here in
+    O(1) before any DB or LLM work. The `processed_messages` table (unique on
+    the id) catches the rest: redeliveries after a restart, after eviction
+    from this cache, or handled by another process.
+    """
+
+    def __init__(self, max_size: int = DEDUP_CACHE_SIZE):
+        self.max_size = max_size
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_duplicates = 0
+        self.db_duplicates = 0
+        self.pruned = 0
+
+    def mark_seen(self, message_id: str) -> bool:
+        """Records the id; returns False if it was already seen."""
+        with self._lock:
+            if message_id in self._seen:
+                self._seen.move_to_end(message_id)
+                self.memory_duplicates += 1
+                return False
+            self._seen[message_id] = None
+            if len(self._seen) > self.max_size:
+                self._seen.popitem(last=False)
+            return True
+
+    def forget(self, message_id: str):
+        """Un-marks an id whose delivery we didn't accept, so a retry gets in."""
+        with self._lock:
+            self._seen.pop(message_id, None)
+
+    def record_db_duplicate(self):
+        with self._lock:
+            self.db_duplicates += 1
+
+    def prune(self, retention_days: int = PROCESSED_MESSAGE_RETENTION_DAYS) -> int:
+        """Deletes `processed_messages` rows older than `retention_days`."""
+        from app.chatbot.models import ProcessedMessage
+        from app.database import SessionLocal
+
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        db = SessionLocal()
+        try:
+            deleted = (
+                db.query(ProcessedMessage)
+                .filter(ProcessedMessage.received_at < cutoff)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+        with self._lock:
+            self.pruned += deleted
+        if deleted:
+            logger.info("🧹 Pruned %d processed message ids", deleted)
+        return deleted
+
+    async def prune_forever(self, interval: int = PROCESSED_MESSAGE_PRUNE_INTERVAL):
+        """Runs `prune` in a thread now and then every `interval` seconds."""
+        while True:
+            try:
+                await asyncio.to_thread(self.prune)
+            except Exception as e:
+                logger.error("❌ Pruning processed messages failed: %s", e)
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        return {
+            "cached_ids": len(self._seen),
+            "max_size": self.max_size,
+            "dropped_in_memory": self.memory_duplicates,
+            "dropped_by_db": self.db_duplicates,
+            "dropped_total": self.memory_duplicates + self.db_duplicates,
+            "pruned_db_rows": self.pruned,
+        }
+
+
+message_dedup = MessageDeduplicator()
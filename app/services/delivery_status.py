@@ -0,0 +1,36 @@
+import logging
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryStatusTracker:
+    """
+    Cheap path for Meta status callbacks (sent / delivered / read / failed).
+
+    They arrive in the same webhook as user messages but never need the agent
+    or the DB; we only count them and log failed deliveries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def record(self, status: dict):
+        state = status.get("status", "unknown")
+        with self._lock:
+            self.counts[state] += 1
+        if state == "failed":
+            logger.warning(
+                "❌ WhatsApp delivery to %s failed: %s",
+                status.get("recipient_id"),
+                status.get("errors"),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+delivery_statuses = DeliveryStatusTracker()
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", 32))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", 1000))
+
+
+class MessageWorkerPool:
+    """
+    Bounded in-process queue drained by a fixed number of asyncio workers.
+
+    The webhook only validates and `submit()`s a job, then acknowledges Meta
+    right away; the slow part (DB, agent, reply) runs on the workers. Handlers
+    are coroutines and must push blocking work to a thread themselves
+    (`asyncio.to_thread`), otherwise they would stall the event loop again.
+    """
+
+    def __init__(
+        self,
+        handler,
+        workers: int = WEBHOOK_WORKERS,
+        max_queue: int = WEBHOOK_QUEUE_SIZE,
+        name: str = "webhook",
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.name = name
+        self._queue = None
+        self._tasks = []
+        self.busy = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+
+    def start(self):
+        """Spawns the workers on the running event loop (idempotent)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info("🧵 Started %d %s workers", self.workers, self.name)
+
+    async def stop(self, timeout: float = 10.0):
+        """Lets queued jobs finish for up to `timeout` seconds, then cancels."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "⚠️ %d %s jobs still queued at shutdown", self._queue.qsize(), self.name
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, *args) -> bool:
+        """
+        Enqueues `handler(*args)` without waiting. Returns False when the queue
+        is full, so the caller can tell Meta to redeliver later.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait((time.monotonic(), args))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.submitted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            enqueued_at, args = await self._queue.get()
+            self.total_wait += time.monotonic() - enqueued_at
+            self.busy += 1
+            try:
+                await self.handler(*args)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("❌ %s job failed: %s", self.name, e)
+            finally:
+                self.busy -= 1
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        started = self.processed + self.failed + self.busy
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_queue_wait_ms": (
+                round(self.total_wait / started * 1000, 1) if started else None
+            ),
+        }
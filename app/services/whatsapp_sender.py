@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import Counter
+
+import httpx
+from dotenv import load_dotenv
+
+from app.services.message_queue import MessageWorkerPool
+from tools.http_client import HTTP2_AVAILABLE
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+WHATSAPP_TOKEN = os.getenv("META_ACCESS_TOKEN")
+PHONE_NUMBER_ID = os.getenv("META_PHONE_NUMBER_ID")
+GRAPH_API_URL = os.getenv("META_GRAPH_API_URL", "https://graph.facebook.com/v19.0")
+
+# Meta allows 80 messages per second per business number by default; stay
+# under it, with a few requests in flight to absorb Graph API latency.
+WHATSAPP_SEND_RATE = float(os.getenv("WHATSAPP_SEND_RATE", 60))
+WHATSAPP_SEND_CONCURRENCY = int(os.getenv("WHATSAPP_SEND_CONCURRENCY", 8))
+WHATSAPP_SEND_QUEUE_SIZE = int(os.getenv("WHATSAPP_SEND_QUEUE_SIZE", 1000))
+# Attempts per message on 429 / 5xx / network errors, with full-jitter
+# exponential backoff between them (or Meta's Retry-After, if sent).
+WHATSAPP_SEND_MAX_ATTEMPTS = int(os.getenv("WHATSAPP_SEND_MAX_ATTEMPTS", 5))
+WHATSAPP_RETRY_BASE = float(os.getenv("WHATSAPP_RETRY_BASE", 0.5))
+WHATSAPP_RETRY_MAX = float(os.getenv("WHATSAPP_RETRY_MAX", 30))
+
+SEND_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class WhatsAppSender:
+    """
+    Outbound WhatsApp messages, sent off the conversation workers.
+
+    `send` only enqueues and returns, so a turn is done as soon as its reply
+    is saved. Messages go out over one long-lived pooled client (no TLS
+    handshake per message), at most `concurrency` at a time and `rate` per
+    second. 429 and 5xx answers and network errors are retried with jittered
+    backoff; other errors are logged and counted. Replies to one recipient
+    are sent one at a time, in the order they were queued.
+    """
+
+    def __init__(
+        self,
+        token: str = WHATSAPP_TOKEN,
+        phone_number_id: str = PHONE_NUMBER_ID,
+        rate: float = WHATSAPP_SEND_RATE,
+        concurrency: int = WHATSAPP_SEND_CONCURRENCY,
+        max_queue: int = WHATSAPP_SEND_QUEUE_SIZE,
+        max_attempts: int = WHATSAPP_SEND_MAX_ATTEMPTS,
+        base_url: str = GRAPH_API_URL,
+    ):
+        self.token = token
+        self.url = f"{base_url}/{phone_number_id}/messages"
+        self.rate = rate
+        self.max_attempts = max_attempts
+        self.pool = MessageWorkerPool(
+            self._deliver,
+            workers=concurrency,
+            max_queue=max_queue,
+            name="whatsapp-send",
+        )
+        self._client = None
+        self._pace_lock = None
+        self._next_slot = 0.0
+        self._recipient_locks = {}  # recipient -> [asyncio.Lock, users]
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.responses = Counter()
+        self.total_latency = 0.0
+
+    def start(self):
+        """Opens the client and spawns the workers on the running loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=SEND_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=self.pool.workers,
+                    max_keepalive_connections=self.pool.workers,
+                    keepalive_expiry=120.0,
+                ),
+                headers={"Authorization": f"Bearer {self.token}"},
+                http2=HTTP2_AVAILABLE,
+            )
+            self._pace_lock = asyncio.Lock()
+        self.pool.start()
+
+    async def stop(self, timeout: float = 10.0):
+        """Sends what's queued for up to `timeout` seconds, then closes."""
+        await self.pool.stop(timeout)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def send(self, recipient: str, message: str) -> bool:
+        """
+        Queues a text message without waiting for Meta. Returns False (and
+        logs it) when the outbound queue is full.
+        """
+        self.start()
+        if self.pool.submit(recipient, message, time.monotonic()):
+            return True
+        logger.error("❌ WhatsApp send queue full, reply to %s dropped", recipient)
+        return False
+
+    async def _pace(self):
+        """Spaces sends `1 / rate` seconds apart across all workers."""
+        async with self._pace_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + 1 / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        retry_after = None
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), WHATSAPP_RETRY_MAX)
+            except ValueError:
+                pass
+        return random.uniform(
+            0, min(WHATSAPP_RETRY_MAX, WHATSAPP_RETRY_BASE * 2**attempt)
+        )
+
+    async def _deliver(self, recipient: str, message: str, queued_at: float):
+        entry = self._recipient_locks.setdefault(recipient, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await self._post(recipient, message, queued_at)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._recipient_locks[recipient]
+
+    async def _post(self, recipient: str, message: str, queued_at: float):
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": recipient,
+            "type": "text",
+            "text": {"body": message},
+        }
+        for attempt in range(self.max_attempts):
+            response = error = None
+            await self._pace()
+            try:
+                response = await self._client.post(self.url, json=payload)
+                self.responses[response.status_code] += 1
+            except httpx.RequestError as e:
+                error = e
+                self.responses["network_error"] += 1
+
+            if response is not None and response.status_code == 200:
+                self.sent += 1
+                self.total_latency += time.monotonic() - queued_at
+                logger.info("✅ Message sent successfully to %s", recipient)
+                return
+            if response is not None and not _retryable(response.status_code):
+                break
+            if attempt + 1 < self.max_attempts:
+                delay = self._backoff(attempt, response)
+                self.retries += 1
+                logger.warning(
+                    "⚠️ WhatsApp send to %s failed (%s), retry %d in %.1fs",
+                    recipient,
+                    response.status_code if response is not None else error,
+                    attempt + 1,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+        self.failed += 1
+        logger.error(
+            "❌ WhatsApp send to %s failed: %s",
+            recipient,
+            response.text if response is not None else error,
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self.pool.stats(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "responses": {str(k): v for k, v in self.responses.items()},
+            "avg_send_latency_ms": (
+                round(self.total_latency / self.sent * 1000, 1) if self.sent else None
+            ),
+        }
+
+
+whatsapp_sender = WhatsAppSender()
@@ -0,0 +1,174 @@
+"""
+Runs SESSIONS simulated conversations through BookingToolAgent, with the sync
+`get_response` on a thread pool vs `aget_response` on one event loop.
+
+Each turn is the common "tell me about this blane" shape: one LLM step that
+calls `blanes_info`, one API fetch, one LLM step for the answer. The LLM and
+the Dabablane API are stubbed with fixed latencies, so it needs no network:
+- sync: THREADS worker threads (the old webhook setup), each blocked for the
+  whole turn, so at most THREADS conversations make progress at a time.
+- async: every turn is a coroutine on one loop; waits on the LLM and API
+  overlap, bounded only by the worker pool size.
+
+    python -m benchmarks.bench_async_agent
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import tools.blane_cache as blane_cache_module
+from app.agent.booking_agent import BookingToolAgent
+from app.agent.context import SessionContext
+from app.services.message_queue import WEBHOOK_WORKERS
+from tools.blane_cache import blane_cache
+from tools.token_manager import token_manager
+
+SESSIONS = 200
+THREADS = 8
+LLM_SECONDS = 0.3
+API_SECONDS = 0.1
+
+BLANE = {
+    "id": 1,
+    "name": "Hammam & Massage",
+    "city": "Casablanca",
+    "description": "Traditional hammam followed by a 30 min massage.",
+    "price_current": 250,
+    "type": "reservation",
+    "type_time": "time",
+    "slug": "hammam-massage",
+}
+
+
+class StubLLM(BaseChatModel):
+    """Calls `blanes_info` on the first step and answers on the second."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages) -> ChatResult:
+        if any(isinstance(m, ToolMessage) for m in messages):
+            message = AIMessage(content="Here are the details of this blane.")
+        else:
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "blanes_info", "args": {"blane_id": 1}, "id": "call_1"}
+                ],
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(LLM_SECONDS)
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(LLM_SECONDS)
+        return self._reply(messages)
+
+
+class StubResponse:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"data": BLANE}
+
+
+def stub_api_get(url, **kwargs):
+    time.sleep(API_SECONDS)
+    return StubResponse()
+
+
+async def stub_aapi_get(url, **kwargs):
+    await asyncio.sleep(API_SECONDS)
+    return StubResponse()
+
+
+def build_agent() -> BookingToolAgent:
+    agent = BookingToolAgent()
+    agent.llm = StubLLM()
+    agent.agent = create_tool_calling_agent(
+        llm=agent.llm, tools=agent.tools, prompt=agent.prompt
+    )
+    agent.executor = AgentExecutor(agent=agent.agent, tools=agent.tools)
+    return agent
+
+
+def context(i: int) -> SessionContext:
+    # Passing a preloaded context keeps the DB out of the benchmark.
+    return SessionContext(session_id=f"s{i}")
+
+
+def run_sync(agent) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(
+            pool.map(
+                lambda i: agent.get_response("info blane 1", f"s{i}", context(i)),
+                range(SESSIONS),
+            )
+        )
+    return time.perf_counter() - started
+
+
+async def run_async(agent) -> float:
+    limit = asyncio.Semaphore(WEBHOOK_WORKERS)
+
+    async def turn(i):
+        async with limit:
+            return await agent.aget_response("info blane 1", f"s{i}", context(i))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(turn(i) for i in range(SESSIONS)))
+    return time.perf_counter() - started
+
+
+def report(label: str, elapsed: float):
+    print(
+        f"{label:<6} {elapsed:7.2f} s total   {SESSIONS / elapsed:7.1f} turns/s   "
+        f"{elapsed / SESSIONS * 1000:7.1f} ms/turn amortized"
+    )
+
+
+def main():
+    blane_cache_module.api_get = stub_api_get
+    blane_cache_module.aapi_get = stub_aapi_get
+    blane_cache.ttl = blane_cache.stale_ttl = 0  # Fetch on every turn
+    token_manager._token = "bench-token"
+    token_manager._expires_at = float("inf")
+
+    agent = build_agent()
+    turn_ms = (2 * LLM_SECONDS + API_SECONDS) * 1000
+    print(
+        f"{SESSIONS} sessions, one {turn_ms:.0f} ms turn each "
+        f"(sync: {THREADS} threads, async: {WEBHOOK_WORKERS} concurrent turns)"
+    )
+    # The agent prints every turn's input; keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_elapsed = run_sync(agent)
+        async_elapsed = asyncio.run(run_async(agent))
+    report("sync", sync_elapsed)
+    report("async", async_elapsed)
+
+
+if __name__ == "__main__":
+    main()
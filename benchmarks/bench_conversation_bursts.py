@@ -0,0 +1,66 @@
+"""
+Counts agent turns for bursty WhatsApp traffic, with and without the
+per-sender debounce in app/services/conversation_queue.py.
+
+SENDERS users each send BURST messages GAP seconds apart (the "hi" / "I want
+a spa" / "in Casablanca" / "for 2" pattern). Every message used to start its
+own agent run, concurrently on the same session; the queue should merge each
+burst into one turn and never run two turns of one sender at once.
+
+    python -m benchmarks.bench_conversation_bursts
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter
+
+from app.services.conversation_queue import DEBOUNCE_SECONDS, ConversationQueue
+
+SENDERS = 50
+BURST = 4
+GAP = 0.4
+AGENT_SECONDS = 0.8
+
+
+async def main():
+    turns = Counter()
+    running = set()
+    overlaps = 0
+
+    async def fake_agent(wa_id, texts):
+        nonlocal overlaps
+        if wa_id in running:
+            overlaps += 1
+        running.add(wa_id)
+        turns[wa_id] += 1
+        await asyncio.sleep(AGENT_SECONDS)
+        running.discard(wa_id)
+
+    queue = ConversationQueue(fake_agent)
+    queue.start()
+
+    async def sender(i):
+        await asyncio.sleep(random.random())
+        for n in range(BURST):
+            queue.submit(f"2126{i:08d}", f"message {n}")
+            await asyncio.sleep(GAP * random.uniform(0.5, 1.5))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(sender(i) for i in range(SENDERS)))
+    await queue.stop(timeout=60)
+    elapsed = time.perf_counter() - started
+
+    messages = SENDERS * BURST
+    print(f"{SENDERS} senders x {BURST} messages, debounce {DEBOUNCE_SECONDS}s")
+    print(f"before  {messages} agent turns")
+    print(
+        f"after   {sum(turns.values())} agent turns "
+        f"({sum(turns.values()) / messages:.0%} of messages), "
+        f"{overlaps} concurrent turns on one session, drained in {elapsed:.1f}s"
+    )
+    print(f"queue   {queue.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
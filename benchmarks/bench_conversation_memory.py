@@ -0,0 +1,125 @@
+"""
+Size of the agent's {chat_history} per turn over a long conversation, before
+and after the rolling session summary (app/agent/memory.py).
+
+Plays a 60-turn conversation in which every third bot reply is a listing or a
+blane description of a few kilobytes, like the tool outputs the agent relays.
+
+- before: the last 20 raw messages, as the agent formatted them.
+- after: the session summary + the messages after it, each capped at
+  HISTORY_MESSAGE_CHARS, with the summary updated after every turn.
+
+The summarizer is a stand-in that returns a summary of MEMORY_SUMMARY_CHARS,
+the most the real prompt asks for, so "after" is an upper bound. Sizes are in
+characters (roughly 4 per token).
+
+    python -m benchmarks.bench_conversation_memory
+"""
+
+import os
+import random
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.agent.context as context
+from app.agent.memory import MEMORY_SUMMARY_CHARS, ConversationMemory
+from app.chatbot.models import Base, Message, Session
+
+TURNS = 60
+SESSION_ID = "212600000001"
+
+
+class FixedSummarizer:
+    """Pretends to be the chat model: a full-length summary, instantly."""
+
+    def invoke(self, prompt):
+        return "- " + "x" * (MEMORY_SUMMARY_CHARS - 2)
+
+
+def bot_reply(rng, turn: int) -> str:
+    if turn % 3:
+        return f"Reply {turn}: " + "y" * rng.randint(80, 400)
+    # A 25-item listing or a full blane description.
+    return "\n".join(
+        f"{i}. Blane {turn}-{i} – " + "z" * rng.randint(60, 140) for i in range(1, 26)
+    )
+
+
+def before_size(messages: list) -> int:
+    last = messages[-20:]
+    return len(
+        "\n".join(f"{i+1}. {sender}: {msg}" for i, (sender, msg) in enumerate(last))
+    )
+
+
+def main():
+    workdir = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{workdir.name}/memory.db")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    context.SessionLocal = session_factory
+    memory = ConversationMemory(FixedSummarizer(), session_factory=session_factory)
+
+    rng = random.Random(3)
+    started = datetime(2025, 1, 1)
+    messages = []
+    before, after = [], []
+    with engine.begin() as connection:
+        connection.execute(insert(Session), [{"id": SESSION_ID}])
+    for turn in range(TURNS):
+        user = ("user", f"Question {turn}: " + "q" * rng.randint(10, 80))
+        messages.append(user)
+        # What the agent sees for this turn.
+        before.append(before_size(messages))
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Message),
+                [
+                    {
+                        "session_id": SESSION_ID,
+                        "sender": user[0],
+                        "content": user[1],
+                        "timestamp": started + timedelta(seconds=turn * 10),
+                    }
+                ],
+            )
+        after.append(len(context.load_session_context(SESSION_ID).formatted_history()))
+
+        reply = ("bot", bot_reply(rng, turn))
+        messages.append(reply)
+        with engine.begin() as connection:
+            connection.execute(
+                insert(Message),
+                [
+                    {
+                        "session_id": SESSION_ID,
+                        "sender": reply[0],
+                        "content": reply[1],
+                        "timestamp": started + timedelta(seconds=turn * 10 + 5),
+                    }
+                ],
+            )
+        memory.update(SESSION_ID)
+
+    print(f"{TURNS} turns, chat_history characters per turn")
+    for label, sizes in (("before", before), ("after", after)):
+        tail = sizes[TURNS // 2 :]
+        print(
+            f"  {label:6}  mean {statistics.mean(sizes):8,.0f}"
+            f"  turns {TURNS // 2}-{TURNS}: mean {statistics.mean(tail):8,.0f}"
+            f"  max {max(sizes):8,}"
+        )
+    print(f"  summary updates: {memory.updates}")
+
+    engine.dispose()
+    workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Wall time of the "my bookings" and availability tools, before and after
+fanning their API requests out together (tools.http_client.run_concurrently),
+against a simulated API that answers every request in API_LATENCY seconds.
+
+- list_reservations: the token check, reservations and orders used to go
+  out one after the other; now reservations and orders go out together and
+  the token comes from api_get's own login.
+- get_available_time_slots: the blane details and then its time slots by
+  slug; now the slots request goes out with the details when the catalog
+  already knows the slug. Measured with the detail cache cold, as on the
+  first slot lookup of a conversation.
+- "this weekend": three get_available_time_slots calls, one per date, vs a
+  single get_available_time_slots_range call fetching the dates together
+  (availability cache cold).
+
+"before" replays the old sequential calls against the same fake API.
+
+    python -m benchmarks.bench_fanout
+"""
+
+import os
+import statistics
+import time
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+import tools.blanes as blanes
+from tools.availability import availability_cache
+from tools.blane_cache import blane_cache
+from tools.catalog import catalog
+
+API_LATENCY = 0.120
+RUNS = 10
+WEEKEND = ["2025-03-07", "2025-03-08", "2025-03-09"]
+BLANE = {
+    "id": 7,
+    "name": "Spa Hammam Anfa",
+    "slug": "spa-hammam-anfa",
+    "type": "reservation",
+    "type_time": "time",
+}
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def fake_api_get(url, **kwargs):
+    time.sleep(API_LATENCY)
+    if "available-time-slots" in url:
+        slots = [{"time": "10:00", "available": True, "remainingCapacity": 3}]
+        return FakeResponse({"type": "time", "data": slots})
+    if "/reservations" in url or "/orders" in url:
+        return FakeResponse({"data": [{"NUM_RES": "RES-1", "status": "confirmed"}]})
+    return FakeResponse({"data": BLANE})
+
+
+def list_reservations_before(email: str):
+    blanes.get_token()
+    res = fake_api_get(f"{blanes.BASEURLBACK}/reservations?email={email}")
+    orders = fake_api_get(f"{blanes.BASEURLBACK}/orders?email={email}")
+    return blanes._merge_reservations(res, orders)
+
+
+def time_slots_before(blane_id: int, date: str):
+    blanes.get_token()
+    blane = blane_cache.get(blane_id)
+    url = f"{blanes.BASEURLFRONT}/blanes/{blane['slug']}/available-time-slots"
+    response = fake_api_get(url, params={"date": date})
+    return blanes._format_time_slots(blane, date, response.json())
+
+
+def weekend_before(blane_id: int, dates: list):
+    # The agent called the tool once per date, one call after another.
+    return [time_slots_before(blane_id, date) for date in dates]
+
+
+def timed(fn, *args, cold_cache=False) -> list:
+    timings = []
+    for _ in range(RUNS):
+        if cold_cache:
+            blane_cache._entries.clear()
+            availability_cache._entries.clear()
+        started = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    blanes.api_get = fake_api_get
+    blane_cache._fetch = lambda blane_id: fake_api_get("/blanes").json()["data"]
+    # The token is cached in production; keep the login out of the numbers.
+    blanes.get_token = lambda: "token"
+    catalog._fetch_all = lambda: [BLANE]
+    catalog.ensure_loaded()
+
+    cases = (
+        (
+            "list_reservations",
+            lambda: timed(list_reservations_before, "a@b.c"),
+            lambda: timed(blanes.list_reservations.func, "a@b.c"),
+        ),
+        (
+            "get_available_time_slots",
+            lambda: timed(time_slots_before, 7, "2025-03-01", cold_cache=True),
+            lambda: timed(
+                blanes.get_available_time_slots.func, 7, "2025-03-01", cold_cache=True
+            ),
+        ),
+        (
+            "this weekend (3 dates)",
+            lambda: timed(weekend_before, 7, WEEKEND, cold_cache=True),
+            lambda: timed(
+                blanes.get_available_time_slots_range.func,
+                7,
+                WEEKEND[0],
+                WEEKEND[-1],
+                cold_cache=True,
+            ),
+        ),
+    )
+    print(f"simulated API latency {API_LATENCY * 1000:.0f} ms per request")
+    for label, before, after in cases:
+        print(label)
+        for name, ms in (("before", before()), ("after", after())):
+            print(f"  {name:6}  p50 {statistics.median(ms):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
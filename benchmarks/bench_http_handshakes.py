@@ -0,0 +1,117 @@
+"""
+Counts TCP connections (one TLS handshake each against the real API) opened
+during a simulated agent turn, before and after the shared HTTP client.
+
+A turn is modelled as TOOL_CALLS tool invocations, each doing one API GET:
+- before: every tool logged in with `requests.post` and then called the
+  module-level `httpx.get`, so each request opened a fresh connection.
+- after: the token comes from the token manager and every request goes
+  through the pooled keep-alive client in tools/http_client.py.
+
+Runs against a local HTTP server, so it needs no network access:
+
+    python -m benchmarks.bench_http_handshakes
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import requests
+
+from tools.http_client import get_client
+from tools.token_manager import TokenManager
+
+TOOL_CALLS = 4
+TURNS = 20
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def get_request(self):
+        conn = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return conn
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = b'{"data": {"user_token": "bench-token", "id": 1}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def turn_before(base: str):
+    for _ in range(TOOL_CALLS):
+        token = requests.post(f"{base}/api/login", json={}).json()["data"]["user_token"]
+        httpx.get(
+            f"{base}/api/back/v1/blanes/1",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+
+def turn_after(base: str, tokens: TokenManager):
+    client = get_client()
+    for _ in range(TOOL_CALLS):
+        token = tokens.get_token()
+        client.get(
+            f"{base}/api/back/v1/blanes/1",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+
+def measure(server, label, turn):
+    server.connections = 0
+    started = time.perf_counter()
+    for _ in range(TURNS):
+        turn()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<7} {server.connections / TURNS:6.1f} connections/turn "
+        f"{elapsed / TURNS * 1000:8.2f} ms/turn"
+    )
+
+
+def main():
+    server = CountingServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    tokens = TokenManager()
+    tokens._login = (
+        lambda: get_client().post(f"{base}/api/login").json()["data"]["user_token"]
+    )
+
+    print(f"{TURNS} turns x {TOOL_CALLS} tool calls")
+    measure(server, "before", lambda: turn_before(base))
+    measure(server, "after", lambda: turn_after(base, tokens))
+
+    tokens.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
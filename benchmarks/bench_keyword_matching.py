@@ -0,0 +1,136 @@
+"""
+Throughput of the keyword checks before and after compiling the tables into
+single regexes (tools/keywords.py), over the blane descriptions in
+descriptions.txt.
+
+- category filter: `_matches_category` for every blane x category, as
+  list_blanes_by_location_and_category runs it over the catalog when a
+  category has no API id ("spa", "resto"). Before, each call rebuilt the
+  keyword dict and ran one substring scan per keyword; "compiled, folded per
+  check" is the compiled regex folding name and description on every call;
+  "after" matches the `search_text` the catalog folds once at load.
+- relevance: `check_message_relevance` on short user messages. Before, four
+  `sum(1 for keyword in ... if keyword in message)` scans.
+
+Also counts how many results differ: the new matcher is whole-word, so
+substring false positives ("spa" in "espace", "hi" in "this") go away.
+
+    python -m benchmarks.bench_keyword_matching
+"""
+
+import os
+import time
+from pathlib import Path
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from tools.blanes import (
+    BLANE_KEYWORDS,
+    CATEGORY_KEYWORDS,
+    GREETING_KEYWORDS,
+    IRRELEVANT_KEYWORDS,
+    LOCATION_KEYWORDS,
+    RELEVANCE_MATCHER,
+    _category_pattern,
+    _matches_category,
+)
+from tools.catalog import _compact
+from tools.text_normalize import fold
+
+CATEGORIES = ["restaurant", "spa", "activity"]
+MESSAGES = [
+    "hi",
+    "salam, je cherche un spa à casablanca",
+    "show me restaurants in anfa",
+    "what's the weather tomorrow?",
+    "I want to book a massage for 2 people this saturday",
+    "this is my email: someone@example.com",
+    "do you have something for kids birthday near maarif?",
+    "bitcoin price",
+]
+ROUNDS = 200
+
+
+def _plain(keywords):
+    return [k.rstrip("*") for k in keywords]
+
+
+def matches_category_before(name, description, category):
+    # The old function built its keyword dict on every call.
+    category_keywords = {k: _plain(v) for k, v in CATEGORY_KEYWORDS.items()}
+    text = f"{name} {description or ''}".lower()
+    for keyword in category_keywords.get(category, [category]):
+        if keyword in text:
+            return True
+    return False
+
+
+def matches_category_fold_per_check(name, description, category):
+    pattern = _category_pattern(category)
+    return (
+        pattern.search(fold(name)) is not None
+        or pattern.search(fold(description or "")) is not None
+    )
+
+
+def relevance_before(message):
+    message = message.lower().strip()
+    return (
+        sum(1 for k in _plain(BLANE_KEYWORDS) if k in message),
+        sum(1 for k in _plain(LOCATION_KEYWORDS) if k in message),
+        sum(1 for k in _plain(GREETING_KEYWORDS) if k in message),
+        sum(1 for k in _plain(IRRELEVANT_KEYWORDS) if k in message),
+    )
+
+
+def relevance_after(message):
+    scores = RELEVANCE_MATCHER.scan(message)
+    return (
+        scores["blane"],
+        scores["location"],
+        scores["greeting"],
+        scores["irrelevant"],
+    )
+
+
+def timed(fn, items, rounds=1):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        results = [fn(*item) for item in items]
+    return time.perf_counter() - started, results
+
+
+def main():
+    text = Path(__file__).resolve().parent.parent / "descriptions.txt"
+    blanes = [p.strip() for p in text.read_text().split("\n\n") if p.strip()]
+    pairs = [(b.splitlines()[0], b, c) for b in blanes for c in CATEGORIES]
+
+    # Catalog entries, folded once at load as the catalog does.
+    entries = [
+        (_compact({"name": name, "description": text}), category)
+        for name, text, category in pairs
+    ]
+
+    before_s, before = timed(matches_category_before, pairs)
+    per_check_s, _ = timed(matches_category_fold_per_check, pairs)
+    after_s, after = timed(_matches_category, entries)
+    print(f"category filter over {len(blanes)} descriptions x {len(CATEGORIES)}")
+    print(f"before  {len(pairs) / before_s:10,.0f} checks/s")
+    print(f"compiled, folded per check {len(pairs) / per_check_s:10,.0f} checks/s")
+    print(f"after   {len(pairs) / after_s:10,.0f} checks/s")
+    print(f"        {sum(x != y for x, y in zip(before, after))} results changed")
+
+    items = [(m,) for m in MESSAGES]
+    before_s, before = timed(relevance_before, items, ROUNDS)
+    after_s, after = timed(relevance_after, items, ROUNDS)
+    total = len(items) * ROUNDS
+    print(f"relevance scoring of {len(MESSAGES)} messages")
+    print(f"before  {total / before_s:10,.0f} messages/s")
+    print(f"after   {total / after_s:10,.0f} messages/s")
+    for message, old, new in zip(MESSAGES, before, after):
+        if (old[2] > 0) != (new[2] > 0):
+            print(f"        greeting {old[2] > 0} -> {new[2] > 0}: {message!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+History-fetch latency on a messages table with 1M rows, before and after the
+(session_id, timestamp DESC, id DESC) index from migration 0002.
+
+Seeds 20,000 sessions with 50 messages each, interleaved in time like real
+traffic, then times the two reads every turn or page makes:
+
+- recent: the agent's context query (app.agent.context), last 20 messages.
+- full history: /chat/history/{session_id}, all messages in order.
+
+"before" is `alembic upgrade head` with that index dropped (what `create_all`
+used to build: no index on session_id), "after" rebuilds it from the model.
+
+Runs against a throwaway SQLite file by default; point BENCH_DATABASE_URL at
+an empty PostgreSQL database to measure there.
+
+    python -m benchmarks.bench_message_history
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, insert, select
+
+from app.agent.context import HISTORY_LIMIT, _recent_messages
+from app.chatbot.models import Message, Session
+from app.database import ALEMBIC_INI
+
+SESSIONS = 20_000
+MESSAGES_PER_SESSION = 50
+QUERIES = 300
+BATCH = 50_000
+
+HISTORY_INDEX = next(
+    i for i in Message.__table__.indexes if i.name == "ix_messages_session_id_timestamp"
+)
+
+
+def upgrade(connection, revision: str):
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+    connection.commit()
+
+
+def seed(connection):
+    rng = random.Random(1)
+    session_ids = [f"2126{n:08d}" for n in range(SESSIONS)]
+    connection.execute(
+        insert(Session), [{"id": s, "client_email": None} for s in session_ids]
+    )
+    started = datetime(2025, 1, 1)
+    total = SESSIONS * MESSAGES_PER_SESSION
+    rows = []
+    for n in range(total):
+        rows.append(
+            {
+                "session_id": rng.choice(session_ids),
+                "sender": "user" if n % 2 else "bot",
+                "content": f"message {n} " + "x" * rng.randint(20, 200),
+                "timestamp": started + timedelta(seconds=n * 3),
+            }
+        )
+        if len(rows) == BATCH:
+            connection.execute(insert(Message), rows)
+            rows = []
+    if rows:
+        connection.execute(insert(Message), rows)
+    connection.commit()
+    return session_ids
+
+
+def recent_query(session_id: str):
+    recent = _recent_messages(session_id, HISTORY_LIMIT)
+    return select(recent.c.sender, recent.c.content).order_by(
+        recent.c.timestamp, recent.c.id
+    )
+
+
+def history_query(session_id: str):
+    return (
+        select(Message.sender, Message.content, Message.timestamp)
+        .where(Message.session_id == session_id)
+        .order_by(Message.timestamp)
+    )
+
+
+def measure(connection, session_ids: list) -> dict:
+    sample = random.Random(2).sample(session_ids, QUERIES)
+    results = {}
+    for label, build in (("recent", recent_query), ("full history", history_query)):
+        timings = []
+        for session_id in sample:
+            started = time.perf_counter()
+            connection.execute(build(session_id)).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[label] = (
+            statistics.median(timings),
+            timings[int(len(timings) * 0.99)],
+        )
+    return results
+
+
+def main():
+    url = os.getenv("BENCH_DATABASE_URL")
+    workdir = None
+    if not url:
+        workdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{workdir.name}/messages.db"
+    engine = create_engine(url)
+
+    with engine.connect() as connection:
+        upgrade(connection, "head")
+        HISTORY_INDEX.drop(connection)
+        connection.commit()
+        started = time.perf_counter()
+        session_ids = seed(connection)
+        print(
+            f"seeded {SESSIONS * MESSAGES_PER_SESSION:,} messages in "
+            f"{time.perf_counter() - started:.1f} s"
+        )
+
+        before = measure(connection, session_ids)
+        started = time.perf_counter()
+        HISTORY_INDEX.create(connection)
+        connection.commit()
+        print(f"built the index in {time.perf_counter() - started:.1f} s")
+        after = measure(connection, session_ids)
+
+    for label in before:
+        print(label)
+        for name, (p50, p99) in (("before", before[label]), ("after", after[label])):
+            print(f"  {name:6}  p50 {p50:8.2f} ms  p99 {p99:8.2f} ms")
+
+    engine.dispose()
+    if workdir:
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
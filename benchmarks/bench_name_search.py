@@ -0,0 +1,164 @@
+"""
+find_blanes_by_name_or_link scoring before and after the rapidfuzz name index
+(tools/name_search.py), on fixture catalogs of unique names built from the
+blane names in descriptions.txt.
+
+- before: fuzzywuzzy WRatio + partial_ratio against name and slug, four calls
+  per blane in a Python loop over catalog.all().
+- full scan: the same loop scoring every blane with `name_search.name_score`
+  (the same scorers, from rapidfuzz). This is the reference for the index.
+- after: NameIndex.search, which scores every blane in batch with
+  `process.cdist`.
+
+Agreement is reported as identical top-10 lists and as how many of the
+strong matches (score >= 90) come back. Against the full scan both should be
+complete. rapidfuzz's scores differ slightly from fuzzywuzzy's: its
+partial_ratio finds the optimal alignment, where python-Levenshtein's
+heuristic sometimes doesn't, and ties among equal scores are broken
+differently than before.
+
+    python -m benchmarks.bench_name_search
+"""
+
+import itertools
+import random
+import statistics
+import time
+from pathlib import Path
+
+from fuzzywuzzy import fuzz
+
+from tools.name_search import NameIndex, name_score, normalize_name, normalize_slug
+
+SIZES = (1_000, 10_000)
+DISTRICTS = [
+    "Casablanca", "Rabat", "Marrakech", "Anfa", "Maarif", "Gauthier", "Agdal",
+    "Gueliz", "Hivernage", "Tanger", "Fes", "Agadir", "Ain Diab", "Bourgogne",
+]  # fmt: skip
+LIMIT = 10
+THRESHOLD = 60
+
+
+def fixture_catalog(size: int) -> list:
+    text = Path(__file__).resolve().parent.parent / "descriptions.txt"
+    paragraphs = [p.strip() for p in text.read_text().split("\n\n") if p.strip()]
+    names = sorted({p.splitlines()[0][:60].strip() for p in paragraphs})
+    # Every name is distinct: the real names first, then each with a district.
+    variants = [f"{n} {d}" for d, n in itertools.product(DISTRICTS, names)]
+    random.Random(42).shuffle(variants)
+    pool = list(dict.fromkeys(names + variants))
+    if size > len(pool):
+        raise ValueError(f"at most {len(pool):,} unique fixture names")
+    blanes = []
+    for i, name in enumerate(pool[:size]):
+        slug = "-".join(name.lower().split()) + f"-{i}"
+        blanes.append(
+            {
+                "id": i + 1,
+                "name": name,
+                "slug": slug,
+                "created_at": f"2025-01-01 00:{i // 60 % 60:02d}:{i % 60:02d}",
+            }
+        )
+    blanes.sort(key=lambda b: (b["created_at"], b["id"]), reverse=True)
+    return blanes
+
+
+def queries_for(blanes: list) -> list:
+    rng = random.Random(7)
+    queries = []
+    for blane in rng.sample(blanes, 10):
+        name = blane["name"]
+        words = name.split()
+        queries.append(name)
+        queries.append(" ".join(words[:2]))
+        # One typo
+        i = rng.randrange(len(name))
+        queries.append(name[:i] + name[i + 1 :])
+    # A link, reduced to its last path segment as the tool does
+    queries += ["spa", "hammam", "dj", blanes[3]["slug"].replace("-", " ")]
+    return queries
+
+
+def search_before(blanes: list, query: str) -> list:
+    query_norm = query.lower()
+    scored = []
+    for blane in blanes:
+        name = (blane.get("name") or "").lower()
+        slug = (blane.get("slug") or "").lower().replace("-", " ").replace("_", " ")
+        s1 = fuzz.WRatio(query_norm, name) if name else 0
+        s2 = fuzz.partial_ratio(query_norm, name) if name else 0
+        s3 = fuzz.WRatio(query_norm, slug) if slug else 0
+        s4 = fuzz.partial_ratio(query_norm, slug) if slug else 0
+        score = max(s1, s2, s3, s4)
+        if score >= THRESHOLD:
+            scored.append((score, blane))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [(b["id"], score) for score, b in scored[:LIMIT]]
+
+
+def search_full_scan(blanes: list, query: str) -> list:
+    query_norm = normalize_name(query)
+    scored = []
+    for blane in blanes:
+        score = name_score(
+            query_norm, normalize_name(blane["name"]), normalize_slug(blane["slug"])
+        )
+        if score >= THRESHOLD:
+            scored.append((score, blane))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [(b["id"], score) for score, b in scored[:LIMIT]]
+
+
+def agreement(expected: list, actual: list) -> tuple:
+    """Identical result lists, and recall of the expected matches scoring >= 90."""
+    same = sum(x == y for x, y in zip(expected, actual))
+    strong = [(q, i) for q, x in enumerate(expected) for i, s in x if s >= 90]
+    found = {(q, i) for q, y in enumerate(actual) for i, _ in y}
+    return same, sum(hit in found for hit in strong), len(strong)
+
+
+def timed(fn, queries):
+    timings, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(fn(query))
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, results
+
+
+def main():
+    for size in SIZES:
+        blanes = fixture_catalog(size)
+        queries = queries_for(blanes)
+        index = NameIndex()
+        index.rebuild(blanes)
+
+        before_ms, before = timed(lambda q: search_before(blanes, q), queries)
+        scan_ms, full_scan = timed(lambda q: search_full_scan(blanes, q), queries)
+        after_ms, after = timed(
+            lambda q: index.search(q, limit=LIMIT, score_threshold=THRESHOLD),
+            queries,
+        )
+
+        print(f"{size:,} blanes, {len(queries)} queries")
+        for label, ms in (
+            ("before", before_ms),
+            ("full scan", scan_ms),
+            ("after", after_ms),
+        ):
+            ms = sorted(ms)
+            print(
+                f"  {label:9}  p50 {statistics.median(ms):8.2f} ms"
+                f"  p99 {ms[int(len(ms) * 0.99)]:8.2f} ms"
+            )
+        for label, expected in (("full scan", full_scan), ("before", before)):
+            same, found, strong = agreement(expected, after)
+            print(
+                f"  vs {label:9}: identical top-{LIMIT} {same}/{len(queries)},"
+                f" matches scoring >= 90 returned {found}/{strong}"
+            )
+
+
+if __name__ == "__main__":
+    main()
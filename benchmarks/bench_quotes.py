@@ -0,0 +1,156 @@
+"""
+The confirm step of a booking (preview_reservation, then create_reservation
+once the user says yes) with the preview's quote (tools/pricing.py), against
+a simulated API answering in API_LATENCY seconds.
+
+create_reservation always refetches the blane (bypassing the detail cache)
+and only books on the recap's quote id if the fresh blane, quantity and city
+still give that quote. Prints:
+
+- the API reads and wall time of create, the booking POST included, without
+  and with the quote id (the same: the quote saves no read);
+- what happens when the price changes between preview and confirm: without
+  a quote id the new price is charged silently, with one the booking is
+  refused until the user sees a new recap;
+- what each path charges for quantity 0, which the two tools used to price
+  differently (preview clamped it to 1, create didn't).
+
+    python -m benchmarks.bench_quotes
+"""
+
+import os
+import re
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import tools.blanes as blanes
+from app.chatbot.models import Base, Session
+from tools.blane_cache import blane_cache
+from tools.pricing import quote_book
+
+API_LATENCY = 0.120
+RUNS = 5
+SESSION_ID = "212600000001"
+BLANE = {
+    "id": 9,
+    "name": "Coffret Thé Marocain",
+    "type": "order",
+    "is_digital": False,
+    "city": "Casablanca",
+    "price_current": 180,
+    "livraison_in_city": 20,
+    "livraison_out_city": 45,
+    "partiel": True,
+    "partiel_field": 30,
+    "updated_at": "2025-02-01T10:00:00",
+}
+ORDER = {
+    "session_id": SESSION_ID,
+    "blane_id": 9,
+    "name": "Client",
+    "phone": "0600000000",
+    "city": "Rabat",
+    "quantity": 2,
+    "delivery_address": "12 rue Example",
+}
+reads = 0
+posted = []
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def fake_api_get(url, **kwargs):
+    global reads
+    reads += 1
+    time.sleep(API_LATENCY)
+    return FakeResponse({"data": BLANE})
+
+
+def fake_api_post(url, json=None, **kwargs):
+    time.sleep(API_LATENCY)
+    posted.append(json)
+    # Cash-like reply: no reference, so no payment initiation call.
+    return FakeResponse({"data": {}})
+
+
+def confirm(quote_id: str, **order) -> tuple:
+    global reads
+    reads = 0
+    started = time.perf_counter()
+    blanes.create_reservation.func(**{**ORDER, **order}, quote_id=quote_id)
+    return reads, (time.perf_counter() - started) * 1000
+
+
+def main():
+    workdir = tempfile.TemporaryDirectory()
+    engine = create_engine(f"sqlite:///{workdir.name}/quotes.db")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Session), [{"id": SESSION_ID, "client_email": "a@b.co"}]
+        )
+    blanes.SessionLocal = sessionmaker(bind=engine)
+    blanes.get_token = lambda: "token"
+    blanes.api_post = fake_api_post
+    blane_cache._fetch = lambda blane_id: fake_api_get("/blanes").json()["data"]
+
+    print(f"simulated API latency {API_LATENCY * 1000:.0f} ms per request")
+    for name, use_quote in (("no quote", False), ("quote", True)):
+        timings, api_reads = [], []
+        for _ in range(RUNS):
+            quote_book._entries.clear()
+            recap = blanes.preview_reservation.func(**ORDER)
+            quote_id = re.search(r"Quote: (\S+)", recap).group(1)
+            count, ms = confirm(quote_id if use_quote else "N/A")
+            timings.append(ms)
+            api_reads.append(count)
+        print(
+            f"  {name:8}  create: {statistics.median(api_reads):.0f} API reads"
+            f"  p50 {statistics.median(timings):6.1f} ms"
+        )
+
+    print("price raised 180 -> 200 MAD between preview and confirm")
+    for name, use_quote in (("no quote", False), ("quote", True)):
+        BLANE.update(price_current=180, updated_at="2025-02-01T10:00:00")
+        recap = blanes.preview_reservation.func(**ORDER)
+        total = re.search(r"Total: (\d+)", recap).group(1)
+        quote_id = re.search(r"Quote: (\S+)", recap).group(1)
+        BLANE.update(price_current=200, updated_at="2025-02-02T10:00:00")
+        posted.clear()
+        blanes.create_reservation.func(
+            **ORDER, quote_id=quote_id if use_quote else "N/A"
+        )
+        if posted:
+            charged = posted[-1]["total_price"] + posted[-1]["partiel_price"]
+            outcome = f"charged {charged:.0f} MAD"
+        else:
+            outcome = "refused, recap needed"
+        print(f"  {name:8}  recap total {total} MAD, create {outcome}")
+    BLANE.update(price_current=180, updated_at="2025-02-01T10:00:00")
+
+    recap = blanes.preview_reservation.func(**{**ORDER, "quantity": 0})
+    total = re.search(r"Total: (\d+)", recap).group(1)
+    confirm("N/A", quantity=0)
+    charged = posted[-1]["total_price"] + posted[-1]["partiel_price"]
+    print(f"quantity 0: preview total {total} MAD, create charges {charged:.0f} MAD")
+
+
+if __name__ == "__main__":
+    main()
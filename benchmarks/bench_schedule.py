@@ -0,0 +1,109 @@
+"""
+Validating a requested reservation date/time, before and after the
+per-blane schedule (tools/schedule.py).
+
+"before" replays what create_reservation did on every call: parse
+heure_debut/heure_fin trying each format, rebuild the slot list with a
+datetime loop, map the weekday to its French name and scan the lists.
+"after" is `blane_schedules.get(blane).check(...)`: a cache lookup and set
+membership tests.
+
+It also lists the slots the reservation prompt offered that create then
+refused: the prompt built its grid with `<=` closing time, create with `<`.
+
+    python -m benchmarks.bench_schedule
+"""
+
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+from tools.schedule import blane_schedules
+
+RUNS = 2000
+BLANE = {
+    "id": 7,
+    "type": "reservation",
+    "type_time": "time",
+    "heure_debut": "09:00:00",
+    "heure_fin": "22:00:00",
+    "intervale_reservation": 30,
+    "jours_creneaux": ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi"],
+    "start_date": "2025-01-01 00:00:00",
+    "expiration_date": "2099-12-31 00:00:00",
+}
+FRENCH_DAYS = {
+    "Monday": "Lundi",
+    "Tuesday": "Mardi",
+    "Wednesday": "Mercredi",
+    "Thursday": "Jeudi",
+    "Friday": "Vendredi",
+    "Saturday": "Samedi",
+    "Sunday": "Dimanche",
+}
+
+
+def slot_list(blane, inclusive: bool) -> list:
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%H:%M:%S"):
+        try:
+            heure_debut = datetime.strptime(blane["heure_debut"], fmt).time()
+            heure_fin = datetime.strptime(blane["heure_fin"], fmt).time()
+            break
+        except ValueError:
+            continue
+    current = datetime.combine(datetime.today(), heure_debut)
+    end_dt = datetime.combine(datetime.today(), heure_fin)
+    slots = []
+    while current <= end_dt if inclusive else current < end_dt:
+        slots.append(current.strftime("%H:%M"))
+        current += timedelta(minutes=int(blane["intervale_reservation"]))
+    return slots
+
+
+def check_before(blane, day: str, slot: str):
+    if datetime.strptime(day, "%Y-%m-%d").date() < datetime.today().date():
+        return "past"
+    user_day = FRENCH_DAYS[datetime.strptime(day, "%Y-%m-%d").strftime("%A")]
+    if user_day not in blane["jours_creneaux"]:
+        return "closed"
+    if slot not in slot_list(blane, inclusive=False):
+        return "invalid time"
+    return None
+
+
+def check_after(blane, day: str, slot: str):
+    return blane_schedules.get(blane).check(day, slot)
+
+
+def timed(fn, *args) -> float:
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main():
+    day = date.today() + timedelta(days=1)
+    while day.weekday() == 6:
+        day += timedelta(days=1)
+    day = day.isoformat()
+
+    offered = slot_list(BLANE, inclusive=True)
+    refused = [s for s in offered if check_before(BLANE, day, s)]
+    print(f"slots offered by the old prompt but refused by create: {refused}")
+    offered = blane_schedules.get(BLANE).slots
+    refused = [s for s in offered if check_after(BLANE, day, s)]
+    print(f"slots offered by the prompt but refused by create now: {refused}")
+
+    print(f"validating {day} 21:30 ({RUNS} runs)")
+    for name, fn in (("before", check_before), ("after", check_after)):
+        print(f"  {name:6}  p50 {timed(fn, BLANE, day, '21:30'):7.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
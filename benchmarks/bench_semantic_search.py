@@ -0,0 +1,115 @@
+"""
+Compares search_blanes_advanced's prompt before and after the local semantic
+index, on fixture catalogs built from the real blane descriptions in
+descriptions.txt.
+
+- before: every search dumped the whole catalog (id, title, description,
+  category, type) into one gpt-4o-mini prompt.
+- after: the hashed TF-IDF index in tools/semantic_search.py retrieves the
+  top SEARCH_CANDIDATES blanes locally and only those go to the reranker.
+
+Prompt size is estimated at 4 characters per token (no tokenizer download).
+
+    python -m benchmarks.bench_semantic_search
+"""
+
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from tools.semantic_search import SemanticIndex
+
+SIZES = (1_000, 10_000)
+QUERIES = [
+    "spa hammam massage",
+    "photoshoot",
+    "soin visage hydrafacial",
+    "happy hour bières",
+    "restaurant brunch",
+    "coiffure lissage cheveux",
+    "fitness salle de sport",
+    "anniversaire enfants",
+]
+SEARCH_CANDIDATES = 15
+DESCRIPTION_CHARS = 400
+
+
+def fixture_catalog(size: int) -> list:
+    text = Path(__file__).resolve().parent.parent / "descriptions.txt"
+    paragraphs = [p.strip() for p in text.read_text().split("\n\n") if p.strip()]
+    rng = random.Random(42)
+    blanes = []
+    for i in range(size):
+        body = "\n\n".join(rng.sample(paragraphs, 3))
+        blanes.append(
+            {
+                "id": i + 1,
+                "name": body.splitlines()[0][:60],
+                "description": body,
+                "category": "",
+                "type": rng.choice(["reservation", "order"]),
+            }
+        )
+    return blanes
+
+
+def prompt_entry(blane: dict, description_chars=None) -> dict:
+    description = blane["description"]
+    if description_chars:
+        description = description[:description_chars]
+    return {
+        "id": blane["id"],
+        "title": blane["name"],
+        "description": description,
+        "category": blane["category"],
+        "type": blane["type"],
+    }
+
+
+def main():
+    for size in SIZES:
+        blanes = fixture_catalog(size)
+        by_id = {b["id"]: b for b in blanes}
+
+        before_chars = len(json.dumps([prompt_entry(b) for b in blanes], indent=2))
+
+        index = SemanticIndex()
+        started = time.perf_counter()
+        index.rebuild(blanes)
+        build_s = time.perf_counter() - started
+
+        latencies = []
+        after_chars = []
+        for _ in range(10):
+            for query in QUERIES:
+                started = time.perf_counter()
+                hits = index.search(query, k=SEARCH_CANDIDATES)
+                latencies.append((time.perf_counter() - started) * 1000)
+                entries = [prompt_entry(by_id[i], DESCRIPTION_CHARS) for i, _ in hits]
+                after_chars.append(len(json.dumps(entries, indent=2)))
+
+        started = time.perf_counter()
+        index.upsert(blanes[:20])
+        upsert_ms = (time.perf_counter() - started) * 1000
+
+        latencies.sort()
+        print(f"--- {size} blanes ---")
+        print(
+            f"index   build {build_s:.2f} s, incremental update of 20 blanes "
+            f"{upsert_ms:.1f} ms"
+        )
+        print(
+            f"search  p50 {statistics.median(latencies):.2f} ms   "
+            f"p99 {latencies[int(len(latencies) * 0.99)]:.2f} ms"
+        )
+        print(f"before  ~{before_chars // 4:,} prompt tokens per search")
+        print(
+            f"after   ~{int(statistics.mean(after_chars)) // 4:,} prompt tokens "
+            f"per search ({SEARCH_CANDIDATES} candidates)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Estimated tokens the agent gets back from the heaviest tools, before and
+after output budgeting (tools/output_budget.py), on fixture API data.
+
+- list_reservations: a client with 24 reservations and 6 orders, shaped like
+  the /reservations and /orders responses (every column, nested blane).
+- check_reservation_info: 12 NocoDB booking rows with their ~35 columns.
+- get_blane_info: a long description (the first 3,000 characters of
+  descriptions.txt, several paragraphs of real blane copy).
+
+"before" is the raw output as the tools returned it, "after" the projected,
+capped output the agent now sees. Tokens are estimated at 4 chars per token.
+
+    python -m benchmarks.bench_tool_outputs
+"""
+
+import json
+import os
+from pathlib import Path
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+import tools.blanes as blanes
+from tools.booking_tools import RESERVATION_INFO_FIELDS
+from tools.output_budget import cap_list, estimate_tokens, more_marker, project
+
+
+def fixture_reservations(count: int, prefix: str) -> list:
+    return [
+        {
+            "id": i,
+            f"NUM_{prefix}": f"{prefix}-{i:06d}",
+            "blane_id": 100 + i,
+            "blane": {
+                "id": 100 + i,
+                "name": f"Spa Hammam Anfa {i}",
+                "description": "Un moment de détente au cœur d'Anfa. " * 40,
+                "price_current": 350,
+                "conditions": "Sur réservation uniquement. " * 10,
+            },
+            "customer": {"name": "Client", "email": "client@example.com"},
+            "date": "2025-03-01",
+            "end_date": None,
+            "time": "10:00",
+            "quantity": 2,
+            "number_persons": 2,
+            "payment_method": "cash",
+            "status": "confirmed",
+            "total_price": 700,
+            "partiel_price": 0,
+            "comments": "",
+            "created_at": f"2025-02-{i % 28 + 1:02d}T10:00:00",
+            "updated_at": f"2025-02-{i % 28 + 1:02d}T10:00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def fixture_booking_rows(count: int) -> list:
+    columns = [
+        "ID Réservation", "Réservation Statut", "Pret?", "Reservation Type",
+        "jour de booking", "Créneau de début", "Créneau de fin", "Nom Client",
+        "Tel Whatsapp Client", "Client Conf MSG 1 Time", "MSG 1",
+        "Client Conf MSG 2 Time", "MSG 2", "MSG 3", "Retailer Conf MSG 1 Time",
+        "C MSG 1", "Retailer Conf MSG 2 Time", "C MSG 2", "C MSG 3",
+        "Retailer WA Convo ID", "WA Convo ID", "Rappel Client et Retailer",
+        "Google Reviews MSG", "Google Reviews Rating", "Nom du commerce",
+        "Tel Whatsapp du commerce", "Qté bookée", "Prix final total TTC",
+        "Commentaires", "Offer", "Paiement", "Email Client",
+        "Prix final Total avec frais de livraison", "Ville du Commerce",
+        "Ville du client",
+    ]  # fmt: skip
+    return [
+        {column: f"{column} value {i} " + "x" * 30 for column in columns}
+        for i in range(count)
+    ]
+
+
+def booking_rows_before(rows: list) -> str:
+    return "\n".join(
+        " | ".join(f"{key}: {value}" for key, value in row.items()) for row in rows
+    )
+
+
+def booking_rows_after(rows: list) -> str:
+    rows, more = cap_list(rows)
+    lines = [
+        " | ".join(f"{k}: {v}" for k, v in project(r, RESERVATION_INFO_FIELDS).items())
+        for r in rows
+    ]
+    return "\n".join(lines + ([more_marker(more)] if more else []))
+
+
+def long_description() -> str:
+    text = Path(__file__).resolve().parent.parent / "descriptions.txt"
+    return text.read_text().replace("\r", "")[:3000]
+
+
+def main():
+    reservations = {
+        "reservations": fixture_reservations(24, "RES"),
+        "orders": fixture_reservations(6, "ORD"),
+    }
+    before = json.dumps(reservations, ensure_ascii=False)
+    after = blanes._compact_reservations(json.loads(before))
+
+    rows = fixture_booking_rows(12)
+
+    blane = {
+        "name": "Spa Hammam Anfa",
+        "city": "Casablanca",
+        "description": long_description(),
+        "price_current": 350,
+        "type": "reservation",
+        "type_time": "time",
+    }
+    blane_after = blanes._format_blane_info(blane)
+    blane_before = blane_after.replace(
+        blanes.truncate_text(blane["description"]), blane["description"]
+    )
+
+    print("estimated tokens per call")
+    for label, raw, budgeted in (
+        ("list_reservations", before, after),
+        ("check_reservation_info", booking_rows_before(rows), booking_rows_after(rows)),
+        ("get_blane_info", blane_before, blane_after),
+    ):
+        print(
+            f"  {label:22}  before {estimate_tokens(raw):6,}"
+            f"  after {estimate_tokens(budgeted):6,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
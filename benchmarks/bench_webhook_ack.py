@@ -0,0 +1,152 @@
+"""
+Measures how long Meta waits for the webhook's 200 while the agent is busy,
+before and after moving the turn onto the worker queue.
+
+MESSAGES webhooks arrive every ARRIVAL_GAP seconds, and each agent turn takes
+AGENT_SECONDS (a stand-in for the DB writes + LLM call):
+- before: the handler ran the blocking turn inline on the event loop, so each
+  acknowledgement waited for every turn queued ahead of it.
+- after: `receive_message` only validates and enqueues; the turn runs on
+  `message_queue` workers.
+
+The app is served by uvicorn on its own thread and event loop, like in
+production. The agent, the WhatsApp send and the session summary are
+stubbed, so it needs no DB, API or LLM:
+
+    python -m benchmarks.bench_webhook_ack
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import threading
+import time
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+from app.routers import wati_webhook
+
+MESSAGES = 40
+ARRIVAL_GAP = 0.02
+AGENT_SECONDS = 0.5
+
+
+def fake_turn(wa_id: str, messages: list) -> str:
+    time.sleep(AGENT_SECONDS)
+    return f"reply to {len(messages)} messages"
+
+
+def fake_start_turn(wa_id: str, messages: list):
+    return [text for _, text in messages], None
+
+
+async def fake_aget_response(incoming_text: str, session_id: str, context=None):
+    await asyncio.sleep(AGENT_SECONDS)
+    return f"reply to {incoming_text}"
+
+
+def fake_save_reply(wa_id: str, formatted_response: str):
+    pass
+
+
+def fake_send(recipient_number: str, message: str):
+    return True
+
+
+def payload(i: int) -> dict:
+    message = {"from": f"2126000{i:05d}", "id": f"wamid.{i}", "text": {"body": "hi"}}
+    return {"entry": [{"changes": [{"value": {"messages": [message]}}]}]}
+
+
+def before_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/meta-webhook")
+    async def receive_message(request: Request):
+        data = await request.json()
+        message = data["entry"][0]["changes"][0]["value"]["messages"][0]
+        fake_turn(message["from"], [(message["id"], message["text"]["body"])])
+        return {"status": "ok"}
+
+    return app
+
+
+def after_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(wati_webhook.router)
+
+    @app.on_event("startup")
+    async def start_workers():
+        wati_webhook.message_queue.start()
+
+    @app.on_event("shutdown")
+    async def stop_workers():
+        await wati_webhook.message_queue.stop(timeout=60)
+
+    return app
+
+
+def serve(app: FastAPI):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, port=port, log_level="warning", lifespan="on")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def run(base: str) -> list:
+    async with httpx.AsyncClient(base_url=base, timeout=120) as c:
+
+        async def post(i):
+            await asyncio.sleep(i * ARRIVAL_GAP)
+            started = time.perf_counter()
+            response = await c.post("/meta-webhook", json=payload(i))
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        return await asyncio.gather(*(post(i) for i in range(MESSAGES)))
+
+
+def report(label: str, latencies: list):
+    ms = sorted(x * 1000 for x in latencies)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(
+        f"{label:<7} ack p50 {statistics.median(ms):8.1f} ms   "
+        f"p99 {p99:8.1f} ms   max {ms[-1]:8.1f} ms"
+    )
+
+
+async def main():
+    wati_webhook.start_turn = fake_start_turn
+    wati_webhook.agent.aget_response = fake_aget_response
+    wati_webhook.save_reply = fake_save_reply
+    wati_webhook.send_whatsapp_message = fake_send
+    wati_webhook.conversation_memory.schedule_update = lambda wa_id: None
+
+    print(
+        f"{MESSAGES} webhooks, one every {ARRIVAL_GAP * 1000:.0f} ms, "
+        f"{AGENT_SECONDS * 1000:.0f} ms blocking agent turn each"
+    )
+    for label, app in (("before", before_app()), ("after", after_app())):
+        server, thread, base = serve(app)
+        report(label, await run(base))
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+
+    print(f"worker queue after drain: {wati_webhook.message_queue.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""
+Sending bot replies to WhatsApp, before and after the outbound sender
+(app/services/whatsapp_sender.py), against a local stand-in for the Graph
+API that takes GRAPH_LATENCY seconds per request and answers 429 to every
+FLAKY_EVERY-th one.
+
+- before: `send_whatsapp_message` opened a new AsyncClient per message (one
+  TCP+TLS handshake each), the conversation worker awaited the POST, and a
+  429 or 5xx was logged and the reply lost.
+- after: the worker only queues the reply; the sender posts it over its
+  pooled client and retries 429s with jittered backoff.
+
+Reports, for REPLIES replies from CONCURRENT conversations: how long a
+conversation worker is held per reply, connections opened and replies
+delivered. Needs no network access:
+
+    python -m benchmarks.bench_whatsapp_sender
+"""
+
+import asyncio
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+import httpx
+
+import app.services.whatsapp_sender as sender_module
+from app.services.whatsapp_sender import WhatsAppSender
+
+REPLIES = 120
+CONCURRENT = 8
+GRAPH_LATENCY = 0.08
+FLAKY_EVERY = 10
+
+
+class GraphServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = 0
+        self.requests = 0
+        self.delivered = 0
+        self._lock = threading.Lock()
+
+    def get_request(self):
+        conn = super().get_request()
+        with self._lock:
+            self.connections += 1
+        return conn
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(GRAPH_LATENCY)
+        with self.server._lock:
+            self.server.requests += 1
+            throttled = self.server.requests % FLAKY_EVERY == 0
+            if not throttled:
+                self.server.delivered += 1
+        status, body = (
+            (429, b'{"error": {"code": 130429}}')
+            if throttled
+            else (
+                200,
+                b'{"messages": [{"id": "wamid.1"}]}',
+            )
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+async def send_before(url: str, recipient: str, message: str):
+    payload = {
+        "messaging_product": "whatsapp",
+        "to": recipient,
+        "type": "text",
+        "text": {"body": message},
+    }
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        await client.post(url, json=payload, headers={"Authorization": "Bearer x"})
+
+
+async def conversations(send) -> list:
+    """Worker time per reply, CONCURRENT conversations replying in turn."""
+    held = []
+
+    async def conversation(c):
+        for i in range(REPLIES // CONCURRENT):
+            started = time.perf_counter()
+            await send(f"2126000{c:05d}", f"reply {i}")
+            held.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(conversation(c) for c in range(CONCURRENT)))
+    return held
+
+
+def reset(server):
+    server.connections = server.requests = server.delivered = 0
+
+
+async def main():
+    server = GraphServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/v19.0"
+    url = f"{base}/PHONE/messages"
+    # Short backoff so the benchmark doesn't wait out production delays.
+    sender_module.WHATSAPP_RETRY_BASE = 0.05
+
+    print(
+        f"{REPLIES} replies from {CONCURRENT} conversations, "
+        f"{GRAPH_LATENCY * 1000:.0f} ms Graph API, 1 in {FLAKY_EVERY} throttled"
+    )
+
+    reset(server)
+    held = await conversations(lambda to, text: send_before(url, to, text))
+    before = (held, server.connections, server.delivered)
+
+    reset(server)
+    sender = WhatsAppSender(token="x", phone_number_id="PHONE", base_url=base)
+
+    async def send_after(to, text):
+        sender.send(to, text)
+
+    held = await conversations(send_after)
+    await sender.stop(timeout=60)
+    after = (held, server.connections, server.delivered)
+
+    for label, (held, connections, delivered) in (
+        ("before", before),
+        ("after", after),
+    ):
+        print(
+            f"{label:<7} worker held p50 {statistics.median(held):7.2f} ms   "
+            f"{connections:4d} connections   {delivered}/{REPLIES} delivered"
+        )
+    print(f"sender stats: {sender.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
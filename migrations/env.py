@@ -0,0 +1,68 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+
+from app.chatbot import models
+
+config = context.config
+
+# The app calls migrations from its own process (app.database.run_migrations)
+# and keeps its logging setup; only the alembic CLI configures logging here.
+if config.config_file_name is not None and config.attributes.get(
+    "configure_logger", True
+):
+    fileConfig(config.config_file_name)
+
+target_metadata = models.Base.metadata
+
+MIGRATION_LOCK_ID = 72417001
+
+
+def run_migrations_offline():
+    """Emits the migration SQL instead of running it (alembic upgrade --sql)."""
+    from app.database import SQLALCHEMY_DATABASE_URL
+
+    context.configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    from app.database import engine
+
+    with engine.connect() as connection:
+        _run(connection)
+
+
+def _run(connection):
+    # Several app workers start at once; only one migrates at a time. A
+    # session-level lock, since CONCURRENTLY index builds commit mid-way.
+    locked = connection.dialect.name == "postgresql"
+    if locked:
+        connection.execute(text(f"SELECT pg_advisory_lock({MIGRATION_LOCK_ID})"))
+        connection.commit()
+    try:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        if locked:
+            connection.execute(text(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_ID})"))
+            connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
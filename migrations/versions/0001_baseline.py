@@ -0,0 +1,64 @@
+"""baseline: sessions, messages and processed_messages
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases created by the old `create_all` call at import already have these
+tables; they are left as they are and only missing tables are created.
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set()
+    if not context.is_offline_mode():
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "sessions" not in existing:
+        op.create_table(
+            "sessions",
+            sa.Column("id", sa.String(64), primary_key=True),
+            sa.Column("client_email", sa.String(255), nullable=True),
+            sa.Column("client_id", sa.Integer(), nullable=True),
+            sa.Column("whatsapp_number", sa.String(30), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_sessions_id", "sessions", ["id"])
+
+    if "messages" not in existing:
+        op.create_table(
+            "messages",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("session_id", sa.String(64), sa.ForeignKey("sessions.id")),
+            sa.Column("sender", sa.String(10)),
+            sa.Column("content", sa.Text()),
+            sa.Column("timestamp", sa.DateTime()),
+        )
+        op.create_index("ix_messages_id", "messages", ["id"])
+
+    if "processed_messages" not in existing:
+        op.create_table(
+            "processed_messages",
+            sa.Column("wa_message_id", sa.String(128), primary_key=True),
+            sa.Column("wa_id", sa.String(30), nullable=True),
+            sa.Column("received_at", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("processed_messages")
+    op.drop_table("messages")
+    op.drop_table("sessions")
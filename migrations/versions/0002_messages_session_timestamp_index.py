@@ -0,0 +1,52 @@
+"""index messages by (session_id, timestamp desc)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Every turn reads a session's latest messages (and /chat/history all of them
+in order). Without an index that is a scan of the whole table plus a sort.
+The index matches the ORDER BY timestamp DESC, id DESC of those queries, so
+they become an index range scan that stops after the rows it needs.
+
+On PostgreSQL the index is built CONCURRENTLY so the messages table stays
+writable while it builds.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_messages_session_id_timestamp"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = [
+        sa.text("session_id"),
+        sa.text('"timestamp" DESC'),
+        sa.text("id DESC"),
+    ]
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                INDEX_NAME,
+                "messages",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+    else:
+        op.create_index(INDEX_NAME, "messages", columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX_NAME, table_name="messages", if_exists=True)
@@ -0,0 +1,35 @@
+"""session_summaries: rolling conversation memory
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "session_summaries",
+        sa.Column(
+            "session_id", sa.String(64), sa.ForeignKey("sessions.id"), primary_key=True
+        ),
+        sa.Column("summary", sa.Text(), nullable=False, server_default=""),
+        sa.Column("summarized_until", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("session_summaries")
@@ -21,7 +21,14 @@
 from sqlalchemy import text
 from app.database import engine
 
-tables = ["sessions", "messages"]
+# alembic_version too, so the next start migrates the empty database again.
+tables = [
+    "session_summaries",
+    "sessions",
+    "messages",
+    "processed_messages",
+    "alembic_version",
+]
 
 with engine.begin() as conn:
     for table in tables:
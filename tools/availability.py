@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Time slots change when anyone books, so they're only reused for a short
+# while: long enough for "what about Saturday? and Sunday?" in one chat.
+AVAILABILITY_CACHE_TTL = int(os.getenv("AVAILABILITY_CACHE_TTL", 60))
+AVAILABILITY_CACHE_MAX_SIZE = int(os.getenv("AVAILABILITY_CACHE_MAX_SIZE", 2048))
+# Most dates one range lookup fetches.
+AVAILABILITY_MAX_DAYS = int(os.getenv("AVAILABILITY_MAX_DAYS", 14))
+
+
+class AvailabilityCache:
+    """
+    TTL + LRU cache of `/available-time-slots` results per (blane_id, date).
+
+    `create_reservation` invalidates the dates it books into, so the next
+    lookup after our own booking shows the new remaining capacity. Bookings
+    made elsewhere show up within `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: int = AVAILABILITY_CACHE_TTL,
+        max_size: int = AVAILABILITY_CACHE_MAX_SIZE,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # (blane_id, date) -> (result, fetched_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, blane_id, date: str):
+        """The cached result, or None if missing or expired."""
+        key = (int(blane_id), date)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, blane_id, date: str, result: dict):
+        key = (int(blane_id), date)
+        with self._lock:
+            self._entries[key] = (result, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, blane_id, date: str = None):
+        """Drops one date of a blane, or all its dates if `date` is None."""
+        blane_id = int(blane_id)
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if key[0] == blane_id and (date is None or key[1] == date)
+            ]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+availability_cache = AvailabilityCache()
@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.catalog import catalog
+from tools.http_client import aapi_get, api_get
+
+BASEURLBACK = "https://api.dabablane.com/api/back/v1"
+
+# Entries younger than TTL are served as-is; entries up to TTL + STALE_TTL old
+# are served immediately while a background refetch updates them.
+BLANE_CACHE_TTL = int(os.getenv("BLANE_CACHE_TTL", 120))
+BLANE_CACHE_STALE_TTL = int(os.getenv("BLANE_CACHE_STALE_TTL", 600))
+BLANE_CACHE_MAX_SIZE = int(os.getenv("BLANE_CACHE_MAX_SIZE", 512))
+
+_MISS = object()
+
+
+class BlaneDetailCache:
+    """
+    TTL + LRU cache of `/blanes/{id}` responses with stale-while-revalidate.
+
+    A booking conversation reads the same blane from several tools in a few
+    minutes (info, prompt, preview, slots); they all share one fetch. Callers
+    that must see current price and stock (create_reservation) pass
+    `force_refresh=True`.
+    """
+
+    def __init__(
+        self,
+        ttl: int = BLANE_CACHE_TTL,
+        stale_ttl: int = BLANE_CACHE_STALE_TTL,
+        max_size: int = BLANE_CACHE_MAX_SIZE,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # blane_id -> (blane, fetched_at)
+        self._lock = threading.Lock()
+        self._revalidating = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="blane-revalidate"
+        )
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.forced = 0
+        self.revalidations = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def _fetch(self, blane_id):
+        response = api_get(f"{BASEURLBACK}/blanes/{blane_id}")
+        response.raise_for_status()
+        return response.json().get("data") or None
+
+    def _store(self, blane_id, blane):
+        with self._lock:
+            if not blane:
+                self._entries.pop(blane_id, None)
+                return
+            self._entries[blane_id] = (blane, time.monotonic())
+            self._entries.move_to_end(blane_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _revalidate(self, blane_id):
+        try:
+            self._store(blane_id, self._fetch(blane_id))
+            self.revalidations += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ Error revalidating blane {blane_id}: {e}")
+        finally:
+            with self._lock:
+                self._revalidating.discard(blane_id)
+
+    def _lookup(self, blane_id):
+        """Returns the cached blane, or _MISS if it must be fetched now."""
+        with self._lock:
+            entry = self._entries.get(blane_id)
+            if entry:
+                blane, fetched_at = entry
+                age = time.monotonic() - fetched_at
+                if age < self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(blane_id)
+                    return blane
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(blane_id)
+                    if blane_id not in self._revalidating:
+                        self._revalidating.add(blane_id)
+                        self._executor.submit(self._revalidate, blane_id)
+                    return blane
+            self.misses += 1
+        return _MISS
+
+    def get(self, blane_id, force_refresh: bool = False):
+        """
+        Returns the blane details dict (None if the API has no such blane).
+        HTTP errors from a synchronous fetch propagate to the caller.
+        """
+        blane_id = int(blane_id)
+        if force_refresh:
+            self.forced += 1
+        else:
+            blane = self._lookup(blane_id)
+            if blane is not _MISS:
+                return blane
+
+        try:
+            blane = self._fetch(blane_id)
+        except Exception:
+            self.errors += 1
+            raise
+        self._store(blane_id, blane)
+        return blane
+
+    async def aget(self, blane_id, force_refresh: bool = False):
+        """Async counterpart of `get`, sharing the same entries."""
+        blane_id = int(blane_id)
+        if force_refresh:
+            self.forced += 1
+        else:
+            blane = self._lookup(blane_id)
+            if blane is not _MISS:
+                return blane
+
+        try:
+            response = await aapi_get(f"{BASEURLBACK}/blanes/{blane_id}")
+            response.raise_for_status()
+            blane = response.json().get("data") or None
+        except Exception:
+            self.errors += 1
+            raise
+        self._store(blane_id, blane)
+        return blane
+
+    def invalidate(self, blane_id=None):
+        """Drops one blane (or everything when blane_id is None)."""
+        with self._lock:
+            if blane_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(blane_id), None)
+
+    def sync_with_catalog(self, source, changed_ids):
+        """
+        Catalog listener: drops cached details the catalog saw change, so a
+        catalog refresh never leaves an older price or schedule in here.
+        """
+        if changed_ids is not None:
+            for blane_id in changed_ids:
+                self.invalidate(blane_id)
+            return
+
+        with self._lock:
+            cached = [
+                (blane_id, blane.get("updated_at"))
+                for blane_id, (blane, _) in self._entries.items()
+            ]
+        for blane_id, updated_at in cached:
+            current = source.get(blane_id)
+            if not current or current.get("updated_at") != updated_at:
+                self.invalidate(blane_id)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "forced_refreshes": self.forced,
+            "revalidations": self.revalidations,
+            "errors": self.errors,
+            "evictions": self.evictions,
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / lookups, 3) if lookups else None
+            ),
+        }
+
+
+blane_cache = BlaneDetailCache()
+catalog.add_listener(blane_cache.sync_with_catalog)
@@ -1,31 +1,60 @@
+import asyncio
+import os
 from langchain.tools import tool
 from urllib.parse import urlparse, unquote
-from fuzzywuzzy import fuzz
 import httpx
-import requests
-from datetime import datetime
+from functools import lru_cache
+from datetime import datetime, timedelta
 from app.chatbot.models import Session
 from app.database import SessionLocal
 from enum import Enum
+from tools.availability import AVAILABILITY_MAX_DAYS, availability_cache
+from tools.blane_cache import blane_cache
+from tools.catalog import catalog
+from tools.cursors import listing_cursors
+from tools.http_client import (
+    aapi_get,
+    api_get,
+    api_post,
+    arun_concurrently,
+    run_concurrently,
+)
+from tools.keywords import KeywordMatcher, single_keyword_matcher
+from tools.locations import LocationIndex, normalize_location_text
+from tools.name_search import name_index
+from tools.output_budget import cap_list, more_marker, project, truncate_text
+from tools.pricing import quote_book
+from tools.schedule import blane_schedules
+from tools.semantic_search import semantic_index
+from tools.text_normalize import fold
+from tools.token_manager import LoginError, token_manager
 
 BASEURLFRONT = "https://api.dabablane.com/api/front/v1"
 BASEURL = "https://api.dabablane.com/api"
 BASEURLBACK = "https://api.dabablane.com/api/back/v1"
 
+# search_blanes_advanced: how many blanes the local index hands to the LLM
+# reranker, and what is shown when reranking is disabled or fails.
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", 15))
+SEARCH_RERANK = os.getenv("SEARCH_RERANK", "true").lower() != "false"
+SEARCH_MIN_SIMILARITY = 0.1
+SEARCH_FALLBACK_RESULTS = 10
+RERANK_DESCRIPTION_CHARS = 400
+
 
 def get_token():
+    """
+    Returns the cached Dabablane API token (logs in only when it is missing or
+    expired). Returns None if the login fails.
+    """
+    return token_manager.get_token()
 
-    url = f"https://api.dabablane.com/api/login"
-    headers = {"Content-Type": "application/json"}
-    payload = {"email": "admin@dabablane.com", "password": "admin"}
-    response = requests.post(url, headers=headers, json=payload)
-    print(response)
-    token = None
-    if response.status_code == 200:
-        token = response.json()["data"]["user_token"]
-        return token
-    else:
-        return "Try again later."
+
+async def aget_token():
+    """Async `get_token`: only logs in (in a thread) on a cache miss."""
+    return token_manager.cached_token() or await asyncio.to_thread(
+        token_manager.get_token
+    )
 
 
 def format_date(date_str):
@@ -101,13 +130,10 @@ class PaginationSentiment(Enum):
 @tool("list_categories")
 def list_categories() -> str:
     """ """
-    token = get_token()
-    if not token:
-        return "❌ Failed to retrieve token. Please try again later."
+    # api_get authenticates through the token manager.
     url = f"{BASEURLBACK}/categories"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
     try:
-        response = httpx.get(url, headers=headers)
+        response = api_get(url)
         response.raise_for_status()
         data = response.json()
 
@@ -126,57 +152,22 @@ def list_categories() -> str:
 
 def get_all_blanes_simple() -> list:
     """
-    Retrieves ALL blanes from the API and returns them as a simple list of dictionaries.
+    Retrieves ALL blanes from the in-memory catalog and returns them as a simple list of dictionaries.
     This version is more suitable for programmatic use.
 
     Returns:
         list: List of dictionaries containing blane data, or empty list on error
     """
-    token = get_token()
-    if not token:
+    if not catalog.ensure_loaded():
         return []
+    return catalog.all()
 
-    url = f"{BASEURLBACK}/getBlanesByCategory"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-    all_blanes = []
-    current_page = 1
 
+def _relevance(result: dict) -> float:
     try:
-        while True:
-            params = {
-                "status": "active",
-                "sort_by": "created_at",
-                "sort_order": "desc",
-                "per_page": 10,
-                "page": current_page,
-            }
-
-            response = httpx.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            page_blanes = data.get("data", [])
-            meta = data.get("meta", {})
-            total_blanes = meta.get("total", 0)
-
-            if not page_blanes:
-                break
-
-            all_blanes.extend(page_blanes)
-            current_page += 1
-
-            if len(all_blanes) >= total_blanes:
-                break
-
-            if current_page > 1000:  # Safety limit
-                break
-
-    except Exception as e:
-        print(f"Error fetching all blanes: {str(e)}")
-        return []
-
-    return all_blanes
+        return float(result.get("relevance_score", 0))
+    except (TypeError, ValueError):
+        return 0.0
 
 
 @tool("search_blanes_advanced")
@@ -235,34 +226,57 @@ def search_blanes_advanced(
     if not 0.0 <= min_relevance <= 1.0:
         min_relevance = 0.5
 
-    # Get all blanes
-    all_blanes_data = get_all_blanes_simple()
-    if not all_blanes_data:
+    # Local top-k retrieval; only these candidates ever reach the LLM.
+    if not catalog.ensure_loaded():
         return "❌ Failed to retrieve blanes data"
+    candidates = []
+    for blane_id, similarity in semantic_index.search(keywords, k=SEARCH_CANDIDATES):
+        blane = catalog.get(blane_id)
+        if blane:
+            candidates.append((blane, similarity))
+
+    if not candidates:
+        return f"❌ No blanes found for keywords: '{keywords}'"
+
+    # Fallback when reranking is off or fails: retrieval order and scores.
+    # Cosine similarities aren't on the LLM's relevance scale (strong matches
+    # score ~0.2-0.4), so only SEARCH_MIN_SIMILARITY applies here;
+    # min_relevance is for the reranker's scores.
+    relevant_blanes = [
+        {
+            "id": blane["id"],
+            "title": blane.get("name", "Unknown"),
+            "relevance_score": similarity,
+            "reason": "Close match on name and description",
+        }
+        for blane, similarity in candidates
+        if similarity >= SEARCH_MIN_SIMILARITY
+    ][:SEARCH_FALLBACK_RESULTS]
 
     # Prepare data for AI analysis
-    blanes_info = []
-    for blane in all_blanes_data:
-        blane_entry = {
+    blanes_info = [
+        {
             "id": blane.get("id", "Unknown"),
             "title": blane.get("name", "Unknown"),
-            "description": blane.get("description", ""),
+            "description": (blane.get("description") or "")[:RERANK_DESCRIPTION_CHARS],
             "category": blane.get("category", ""),
             "type": blane.get("type", ""),
         }
-        blanes_info.append(blane_entry)
+        for blane, _ in candidates
+    ]
 
     try:
-        # Initialize OpenAI model (same as BookingToolAgent)
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        if SEARCH_RERANK:
+            # Initialize OpenAI model (same as BookingToolAgent)
+            llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 
-        # Create advanced AI prompt
-        ai_prompt = f"""You are an expert at semantic matching of services with user search intent.
+            # Create advanced AI prompt
+            ai_prompt = f"""You are an expert at semantic matching of services with user search intent.
 
                         TASK: Find blanes highly relevant to: "{keywords}" with minimum relevance of {min_relevance}
 
-                        BLANES DATA:
-                        {json.dumps(blanes_info, indent=2)}
+                        CANDIDATE BLANES (pre-selected by similarity search, best first):
+                        {json.dumps(blanes_info, indent=2, ensure_ascii=False)}
 
                         ANALYSIS CRITERIA:
                         1. Direct keyword matches in title/description (high score)
@@ -284,29 +298,30 @@ def search_blanes_advanced(
 
                         If no matches meet the threshold, return []"""
 
-        # Get AI response
-        response = llm.invoke(ai_prompt)
-        ai_content = response.content.strip()
+            # Get AI response
+            response = llm.invoke(ai_prompt)
+            ai_content = response.content.strip()
 
-        # Parse JSON response
-        try:
-            if ai_content.startswith("```json"):
-                ai_content = (
-                    ai_content.replace("```json", "").replace("```", "").strip()
-                )
-            elif ai_content.startswith("```"):
-                ai_content = ai_content.replace("```", "").strip()
+            # Parse JSON response
+            try:
+                if ai_content.startswith("```json"):
+                    ai_content = (
+                        ai_content.replace("```json", "").replace("```", "").strip()
+                    )
+                elif ai_content.startswith("```"):
+                    ai_content = ai_content.replace("```", "").strip()
 
-            relevant_blanes = json.loads(ai_content)
+                reranked = json.loads(ai_content)
 
-            if not isinstance(relevant_blanes, list):
-                raise ValueError("AI response is not a list")
+                if not isinstance(reranked, list):
+                    raise ValueError("AI response is not a list")
+                relevant_blanes = [
+                    b for b in reranked if _relevance(b) >= min_relevance
+                ]
 
-        except (json.JSONDecodeError, ValueError) as e:
-            # Fallback to rule-based matching
-            print(f"AI parsing failed: {e}, using fallback")
-            # relevant_blanes = analyze_blanes_with_ai("", keywords, blanes_info)
-            # relevant_blanes = [b for b in relevant_blanes if b.get('relevance_score', 0) >= min_relevance]
+            except (json.JSONDecodeError, ValueError) as e:
+                # Fall back to the similarity ranking
+                print(f"AI parsing failed: {e}, using similarity ranking")
 
         if not relevant_blanes:
             return f"❌ No blanes found with relevance >= {min_relevance} for keywords: '{keywords}'"
@@ -338,8 +353,77 @@ def search_blanes_advanced(
         return f"❌ Error in advanced search: {str(e)}"
 
 
+def _format_listing_page(cursor, start: int, ids: list) -> str:
+    """One page of a listing cursor, numbered from `start`."""
+    blanes = [b for b in map(catalog.get, ids) if b]
+    total = len(cursor.ids)
+    end = start + len(ids) - 1
+
+    if cursor.summary:
+        output = ["Here are some options:"]
+        output.append(f"📋 Filtered Results: {cursor.summary}")
+        output.append(f"📊 Showing items {start}-{end} of {total} matches")
+    else:
+        output = ["Here are some options:"]
+        output.append(f"📋 Blanes List (Items {start}-{end} of {total} total)")
+    output.append("")
+
+    # Blanes with their position in the listing (title + price if available)
+    for i, blane in enumerate(blanes, start=start):
+        name = blane.get("name", "Unknown")
+        price = blane.get("price_current")
+        blane_id = blane.get("id")
+        if price:
+            output.append(f"{i}. {name} — {price} Dhs (blane_id: {blane_id})")
+        else:
+            output.append(f"{i}. {name} (blane_id: {blane_id})")
+
+    # Navigation hints. The cursor token lets "show more" skip the search.
+    output.append("")
+    if end < total:
+        next_start = end + 1
+        next_end = min(next_start + cursor.page_size - 1, total)
+        if cursor.summary:
+            output.append(f"💡 More results available (Items {next_start}-{next_end})")
+        else:
+            output.append(
+                f"💡 Voulez-vous voir les suivants? (Items {next_start}-{next_end})"
+            )
+        output.append(f"🔖 cursor: {cursor.token}")
+    elif cursor.summary:
+        output.append("That's all for these filters.")
+        output.append("Want to try different search criteria or see details?")
+    else:
+        output.append(
+            "\nThat’s all in this district. Want me to suggest blanes in another district?"
+        )
+    return "\n".join(output)
+
+
+def _show_listing_page(
+    cursor_token: str, session_id: str, start: int = None, offset: int = None
+) -> str:
+    """
+    Next page (or the page at `start`) of a listing this session stored. No
+    API calls.
+    """
+    cursor = listing_cursors.get(cursor_token, session_id)
+    if cursor is None:
+        return "❌ This list has expired. Please run the search again."
+    if not cursor.ids:
+        return "❌ No blanes found for these filters."
+    if start is not None and start > len(cursor.ids):
+        return f"❌ Start position {start} exceeds total results ({len(cursor.ids)}). Try a lower start position."
+    if start is None and cursor.position >= len(cursor.ids):
+        return "❌ Vous êtes déjà à la fin de la liste. (You're already at the end of the list.)"
+    first, ids = listing_cursors.page(cursor, start, offset)
+    return _format_listing_page(cursor, first, ids)
+
+
 @tool("list_blanes")
-def list_blanes(start: int = 1, offset: int = 10) -> str:
+def list_blanes(
+    start: int = 1, offset: int = 10, session_id: str = "", cursor: str = ""
+) -> str:
     """
     Lists all Blanes without any constraints.
     If you have any constraints like category(like restaurant, spa, activity, etc), city, district, sub-district, etc. you can use the tool list_blanes_by_location_and_category to get the blanes.
@@ -347,168 +431,225 @@ def list_blanes(start: int = 1, offset: int = 10) -> str:
     Args:
         start: Starting position (default: 1, minimum: 1)
         offset: Number of items to show (default: 10, maximum: 25)
+        session_id: Current session ID, so "show more" can reuse this list
+        cursor: Cursor shown under a previous page, to continue that list
 
     Returns a readable list with range info.
     """
     # Validate parameters
+    start = max(1, int(start))
+    offset = max(1, min(25, int(offset)))
 
-    if start < 1:
-        start = 1
-    if offset < 1:
-        offset = 10
-    if offset > 25:
-        offset = 25
+    if cursor:
+        return _show_listing_page(
+            cursor, session_id, start if start > 1 else None, offset
+        )
 
-    token = get_token()
-    if not token:
-        return "❌ Failed to retrieve token. Please try again later."
+    if not catalog.ensure_loaded():
+        return "❌ Error fetching blanes. Please try again later."
 
-    # Calculate which API page we need and how many items to fetch
-    # Since API uses 1-based pagination with per_page
-    api_page = ((start - 1) // 10) + 1  # Which API page contains our start position
-    items_needed = offset
+    ids = [blane["id"] for blane in catalog.all()]
+    if start > len(ids):
+        return f"❌ Start position {start} is beyond available blanes. Total blanes: {len(ids)}"
 
-    # We might need multiple API pages if offset spans across pages
-    url = f"{BASEURLBACK}/blanes"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    listing = listing_cursors.open(session_id, ("all",), ids, page_size=offset)
+    first, page_ids = listing_cursors.page(listing, start)
+    return _format_listing_page(listing, first, page_ids)
 
-    all_fetched_blanes = []
-    total_blanes = 0
 
-    try:
-        # Fetch enough pages to get our desired range
-        current_api_page = api_page
-        items_collected = 0
-
-        while items_collected < items_needed:
-            params = {
-                "status": "active",
-                "sort_by": "created_at",
-                "sort_order": "desc",
-                "per_page": 10,
-                "page": current_api_page,
-            }
+@tool("handle_user_pagination_response")
+def handle_user_pagination_response(
+    user_sentiment: PaginationSentiment,
+    cursor: str = "",
+    offset: int = 10,
+    session_id: str = "",
+) -> str:
+    """
+    Handle user response for pagination navigation.
 
-            response = httpx.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            data = response.json()
+    Args:
+        user_sentiment: PaginationSentiment.POSITIVE or PaginationSentiment.NEGATIVE
+        cursor: The cursor shown under the last page of blanes
+        offset: Number of items to show (default: 10, max: 25)
+        session_id: Current session ID, the one the list was made for
 
-            page_blanes = data.get("data", [])
-            meta = data.get("meta", {})
-            total_blanes = meta.get("total", 0)
+    Returns:
+        Next set of blanes if positive, or appropriate message if negative
+    """
+    if user_sentiment == PaginationSentiment.POSITIVE:
+        if not cursor:
+            return "❌ No list to continue. Please run the search again."
+        return _show_listing_page(
+            cursor, session_id, offset=max(1, min(25, int(offset)))
+        )
 
-            if start + offset > total_blanes:
-                offset = total_blanes - start + 1
+    elif user_sentiment == PaginationSentiment.NEGATIVE:
+        return "👍 D'accord! Y a-t-il autre chose que je puisse vous aider? (Alright! Is there anything else I can help you with?)"
 
-            if not page_blanes:
-                break
+    else:
+        return "❓ Je n'ai pas compris votre réponse. Dites 'oui' pour voir plus ou 'non' pour arrêter. (I didn't understand your response. Say 'yes' to see more or 'no' to stop.)"
 
-            all_fetched_blanes.extend(page_blanes)
-            items_collected += len(page_blanes)
-            current_api_page += 1
 
-            # Stop if we've reached the end of available data
-            if len(all_fetched_blanes) >= total_blanes:
-                break
+def _slot_blane_error(blane, blane_id, type_time: str):
+    """Returns an error message if `blane` can't be booked by `type_time`."""
+    if not blane:
+        return f"❌ Blane with ID {blane_id} not found."
+    if blane.get("type") != "reservation" or blane.get("type_time") != type_time:
+        if type_time == "date":
+            return "❌ Unsupported reservation type returned by the API. Try get_available_time_slots instead."
+        return "❌ Unsupported reservation type returned by the API."
+    if not blane.get("slug"):
+        return "❌ Could not find slug for this blane."
+    return None
 
-        # Calculate the actual start position in our fetched data
-        start_in_fetched = (
-            (start - 1) % 10 if api_page == ((start - 1) // 10) + 1 else 0
-        )
 
-        # Get the exact slice we need
-        if start > total_blanes:
-            return f"❌ Start position {start} is beyond available blanes. Total blanes: {total_blanes}"
+def _known_slug(blane_id):
+    """The blane's slug from the catalog, if it's loaded (never loads it)."""
+    known = catalog.get(int(blane_id)) if catalog.loaded_at else None
+    return (known or {}).get("slug")
 
-        # Adjust for the actual position in the complete dataset
-        actual_start_index = start - ((api_page - 1) * 10) - 1
-        if actual_start_index < 0:
-            actual_start_index = 0
 
-        end_index = min(actual_start_index + offset, len(all_fetched_blanes))
-        selected_blanes = all_fetched_blanes[actual_start_index:end_index]
+def _blane_and_availability(blane_id, type_time: str, fetch):
+    """
+    Returns (blane, error, response) where response is `fetch(slug)`. When
+    the catalog knows the slug, the availability request goes out together
+    with the blane details instead of after them; it is redone with the
+    details' slug if they disagree.
+    """
+    slug = _known_slug(blane_id)
+    if slug:
+        blane, response = run_concurrently(
+            lambda: blane_cache.get(blane_id), lambda: fetch(slug)
+        )
+        if isinstance(blane, Exception):
+            raise blane
+    else:
+        blane, response = blane_cache.get(blane_id), None
+
+    error = _slot_blane_error(blane, blane_id, type_time)
+    if error:
+        return blane, error, None
+    if response is None or blane["slug"] != slug:
+        response = fetch(blane["slug"])
+    elif isinstance(response, Exception):
+        raise response
+    return blane, None, response
+
+
+async def _ablane_and_availability(blane_id, type_time: str, fetch):
+    """Async `_blane_and_availability`; `fetch(slug)` returns a coroutine."""
+    slug = _known_slug(blane_id)
+    if slug:
+        blane, response = await arun_concurrently(
+            blane_cache.aget(blane_id), fetch(slug)
+        )
+        if isinstance(blane, Exception):
+            raise blane
+    else:
+        blane, response = await blane_cache.aget(blane_id), None
+
+    error = _slot_blane_error(blane, blane_id, type_time)
+    if error:
+        return blane, error, None
+    if response is None or blane["slug"] != slug:
+        response = await fetch(blane["slug"])
+    elif isinstance(response, Exception):
+        raise response
+    return blane, None, response
+
+
+def _time_slots(blane_id, slug: str, date: str) -> dict:
+    """A blane's `/available-time-slots` result for one date (cached)."""
+    result = availability_cache.get(blane_id, date)
+    if result is None:
+        response = api_get(
+            f"{BASEURLFRONT}/blanes/{slug}/available-time-slots",
+            params={"date": date},
+        )
+        response.raise_for_status()
+        result = response.json()
+        availability_cache.put(blane_id, date, result)
+    return result
 
-        if not selected_blanes:
-            return f"❌ No blanes found in range {start} to {start + offset - 1}"
 
-    except httpx.HTTPStatusError as e:
-        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
-    except Exception as e:
-        return f"❌ Error fetching blanes: {str(e)}"
+async def _atime_slots(blane_id, slug: str, date: str) -> dict:
+    result = availability_cache.get(blane_id, date)
+    if result is None:
+        response = await aapi_get(
+            f"{BASEURLFRONT}/blanes/{slug}/available-time-slots",
+            params={"date": date},
+        )
+        response.raise_for_status()
+        result = response.json()
+        availability_cache.put(blane_id, date, result)
+    return result
 
-    # Build output
-    output = ["Here are some options:"]
 
-    # Calculate actual end position
-    actual_end = min(start + len(selected_blanes) - 1, total_blanes)
+def _dates_between(start_date: str, end_date: str):
+    """ISO dates from start to end inclusive, or an error message."""
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date or start_date, "%Y-%m-%d").date()
+    except ValueError:
+        return "❌ Invalid date format. Use YYYY-MM-DD."
+    if end < start:
+        return "❌ End date is before start date."
+    days = (end - start).days + 1
+    if days > AVAILABILITY_MAX_DAYS:
+        return f"❌ Please ask for at most {AVAILABILITY_MAX_DAYS} days at a time."
+    return [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def _format_time_slot_range(blane: dict, dates: list, results: list) -> str:
+    output = [f"🗓 Available Time Slots for '{blane['name']}':"]
+    for date, result in zip(dates, results):
+        day = datetime.strptime(date, "%Y-%m-%d").strftime("%a %Y-%m-%d")
+        if isinstance(result, Exception) or result.get("type") != "time":
+            output.append(f"- {day}: ❌ couldn't check this date")
+            continue
+        slots = [
+            f"{slot['time']} ({slot['remainingCapacity']})"
+            for slot in result.get("data", [])
+            if slot["available"]
+        ]
+        output.append(f"- {day}: {', '.join(slots) if slots else 'no slots'}")
+    output.append("(spots left in brackets)")
+    return "\n".join(output)
 
-    # Add header with range info
-    output.append(
-        f"📋 Blanes List (Items {start}-{actual_end} of {total_blanes} total)"
-    )
-    output.append("")
 
-    # Add blanes with their actual position numbers (title + price if available)
-    for i, blane in enumerate(selected_blanes, start=start):
-        name = blane.get("name", "Unknown")
-        price = blane.get("price_current")
-        id = blane.get("id")
-        if price:
-            output.append(f"{i}. {name} — {price} Dhs (blane_id: {id})")
-        else:
-            output.append(f"{i}. {name} (blane_id: {id})")
-        # output.append(f"{i}. {blane['name']} — MAD. {blane['price_current']} (ID: {blane['id']}) - BlaneType: {blane['type']} - TimeType: {blane['type_time']}")
+def _format_time_slots(blane: dict, date: str, result: dict) -> str:
+    if result.get("type") != "time":
+        return "❌ Unsupported reservation type returned by the API. Try get_available_periods instead."
 
-    # Add navigation hints
-    output.append("")
-    if actual_end < total_blanes:
-        next_start = actual_end + 1
-        output.append(
-            f"💡 Voulez-vous voir les suivants? (Items {next_start}-{min(next_start + offset - 1, total_blanes)})"
-        )
-        # output.append(f"\nWant more?\nButtons: [Show 10 more] [See details]")
-    else:
-        output.append(
-            "\nThat’s all in this district. Want me to suggest blanes in another district?"
-        )
-    return "\n".join(output)
+    time_slots = result.get("data", [])
+    available_slots = [
+        f"- {slot['time']} → {slot['remainingCapacity']} spots"
+        for slot in time_slots
+        if slot["available"]
+    ]
 
+    if not available_slots:
+        return f"No available time slots for '{blane['name']}' on {date}."
 
-@tool("handle_user_pagination_response")
-def handle_user_pagination_response(
-    user_sentiment: PaginationSentiment,
-    current_start: int,
-    current_offset: int,
-    total_blanes: int,
-) -> str:
-    """
-    Handle user response for pagination navigation.
+    output = [f"🗓 Available Time Slots for '{blane['name']}' on {date}:"]
+    output.extend(available_slots)
+    return "\n".join(output)
 
-    Args:
-        user_sentiment: PaginationSentiment.POSITIVE or PaginationSentiment.NEGATIVE
-        current_start: Current start position from session
-        current_offset: Current offset from session
-        total_blanes: Total number of blanes
 
-    Returns:
-        Next set of blanes if positive, or appropriate message if negative
-    """
-    if user_sentiment == PaginationSentiment.POSITIVE:
-        # Calculate next start position
-        next_start = current_start + current_offset
+def _format_periods(blane: dict, detailed_blane: dict) -> str:
+    available_periods = detailed_blane.get("available_periods", [])
+    available_periods = [p for p in available_periods if p.get("available")]
 
-        if next_start <= total_blanes:
-            # Update session with new start position
-            # set_session('current_start', next_start)
-            return blanes_list(next_start, current_offset)
-        else:
-            return "❌ Vous êtes déjà à la fin de la liste. (You're already at the end of the list.)"
+    if not available_periods:
+        return f"No available periods found for '{blane['name']}'."
 
-    elif user_sentiment == PaginationSentiment.NEGATIVE:
-        return "👍 D'accord! Y a-t-il autre chose que je puisse vous aider? (Alright! Is there anything else I can help you with?)"
+    output = [f"📅 Available Periods for '{blane['name']}':"]
+    for period in available_periods:
+        output.append(
+            f"- {period['period_name']} → {period['remainingCapacity']} spots"
+        )
 
-    else:
-        return "❓ Je n'ai pas compris votre réponse. Dites 'oui' pour voir plus ou 'non' pour arrêter. (I didn't understand your response. Say 'yes' to see more or 'no' to stop.)"
+    return "\n".join(output)
 
 
 @tool("get_available_time_slots")
@@ -525,49 +666,100 @@ def get_available_time_slots(blane_id: int, date: str) -> str:
     if not token:
         return "❌ Failed to retrieve token. Please try again later."
 
-    # Step 1: Get blane details directly
-    url = f"{BASEURLBACK}/blanes/{blane_id}"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    try:
+        # Blane details (shared detail cache) and its time slots by slug
+        blane, error, result = _blane_and_availability(
+            blane_id, "time", lambda slug: _time_slots(blane_id, slug, date)
+        )
+        if error:
+            return error
+        return _format_time_slots(blane, date, result)
+
+    except httpx.HTTPStatusError as e:
+        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
+
+
+async def _aget_available_time_slots(blane_id: int, date: str) -> str:
+    token = await aget_token()
+    if not token:
+        return "❌ Failed to retrieve token. Please try again later."
 
     try:
-        response = httpx.get(url, headers=headers)
-        response.raise_for_status()
-        blane = response.json().get("data", {})
+        blane, error, result = await _ablane_and_availability(
+            blane_id, "time", lambda slug: _atime_slots(blane_id, slug, date)
+        )
+        if error:
+            return error
+        return _format_time_slots(blane, date, result)
+
+    except httpx.HTTPStatusError as e:
+        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
 
-        if not blane:
-            return f"❌ Blane with ID {blane_id} not found."
 
-        if blane.get("type") != "reservation" or blane.get("type_time") != "time":
-            return "❌ Unsupported reservation type returned by the API."
+get_available_time_slots.coroutine = _aget_available_time_slots
 
-        slug = blane.get("slug")
-        if not slug:
-            return "❌ Could not find slug for this blane."
 
-        # Step 2: Get available time slots using slug
-        slots_url = f"{BASEURLFRONT}/blanes/{slug}/available-time-slots"
-        slot_params = {"date": date}
+@tool("get_available_time_slots_range")
+def get_available_time_slots_range(
+    blane_id: int, start_date: str, end_date: str
+) -> str:
+    """
+    Retrieves available time slots for a specific blane on every date from
+    start_date to end_date (inclusive, at most 14 days) in one call.
+    Use this instead of calling get_available_time_slots once per date, e.g.
+    for "this weekend" or "next week".
 
-        slots_response = httpx.get(slots_url, headers=headers, params=slot_params)
-        slots_response.raise_for_status()
-        result = slots_response.json()
+    Parameters:
+    - blane_id: The ID of the blane (integer)
+    - start_date: First date to check (format: YYYY-MM-DD)
+    - end_date: Last date to check (format: YYYY-MM-DD)
+    """
+    dates = _dates_between(start_date, end_date)
+    if isinstance(dates, str):
+        return dates
 
-        if result.get("type") != "time":
-            return "❌ Unsupported reservation type returned by the API. Try get_available_periods instead."
+    try:
+        blane = blane_cache.get(blane_id)
+        error = _slot_blane_error(blane, blane_id, "time")
+        if error:
+            return error
+
+        # All dates at once; dates checked in the last minute come from cache.
+        results = run_concurrently(
+            *(
+                (lambda date=date: _time_slots(blane_id, blane["slug"], date))
+                for date in dates
+            )
+        )
+        return _format_time_slot_range(blane, dates, results)
 
-        time_slots = result.get("data", [])
-        available_slots = [
-            f"- {slot['time']} → {slot['remainingCapacity']} spots"
-            for slot in time_slots
-            if slot["available"]
-        ]
+    except httpx.HTTPStatusError as e:
+        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
+    except Exception as e:
+        return f"❌ Error: {str(e)}"
 
-        if not available_slots:
-            return f"No available time slots for '{blane['name']}' on {date}."
 
-        output = [f"🗓 Available Time Slots for '{blane['name']}' on {date}:"]
-        output.extend(available_slots)
-        return "\n".join(output)
+async def _aget_available_time_slots_range(
+    blane_id: int, start_date: str, end_date: str
+) -> str:
+    dates = _dates_between(start_date, end_date)
+    if isinstance(dates, str):
+        return dates
+
+    try:
+        blane = await blane_cache.aget(blane_id)
+        error = _slot_blane_error(blane, blane_id, "time")
+        if error:
+            return error
+
+        results = await arun_concurrently(
+            *(_atime_slots(blane_id, blane["slug"], date) for date in dates)
+        )
+        return _format_time_slot_range(blane, dates, results)
 
     except httpx.HTTPStatusError as e:
         return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
@@ -575,6 +767,9 @@ def get_available_time_slots(blane_id: int, date: str) -> str:
         return f"❌ Error: {str(e)}"
 
 
+get_available_time_slots_range.coroutine = _aget_available_time_slots_range
+
+
 @tool("get_available_periods")
 def get_available_periods(blane_id: int) -> str:
     """
@@ -588,44 +783,35 @@ def get_available_periods(blane_id: int) -> str:
     if not token:
         return "❌ Failed to retrieve token. Please try again later."
 
-    # Step 1: Get blane info by ID
-    url = f"{BASEURLBACK}/blanes/{blane_id}"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     try:
-        response = httpx.get(url, headers=headers)
-        response.raise_for_status()
-        blane = response.json().get("data", {})
-
-        if not blane:
-            return f"❌ Blane with ID {blane_id} not found."
-
-        if blane.get("type") != "reservation" or blane.get("type_time") != "date":
-            return "❌ Unsupported reservation type returned by the API. Try get_available_time_slots instead."
-
-        slug = blane.get("slug")
-        if not slug:
-            return "❌ Could not find slug for this blane."
-
-        # Step 2: Get detailed info including available periods using slug
-        front_url = f"{BASEURLFRONT}/blanes/{slug}"
-        front_response = httpx.get(front_url, headers=headers)
+        # Blane info (shared detail cache) and its periods by slug
+        blane, error, front_response = _blane_and_availability(
+            blane_id, "date", lambda slug: api_get(f"{BASEURLFRONT}/blanes/{slug}")
+        )
+        if error:
+            return error
         front_response.raise_for_status()
-        detailed_blane = front_response.json().get("data", {})
+        return _format_periods(blane, front_response.json().get("data", {}))
 
-        available_periods = detailed_blane.get("available_periods", [])
-        available_periods = [p for p in available_periods if p.get("available")]
+    except httpx.HTTPStatusError as e:
+        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
+    except Exception as e:
+        return f"❌ Error fetching periods: {str(e)}"
 
-        if not available_periods:
-            return f"No available periods found for '{blane['name']}'."
 
-        output = [f"📅 Available Periods for '{blane['name']}':"]
-        for period in available_periods:
-            output.append(
-                f"- {period['period_name']} → {period['remainingCapacity']} spots"
-            )
+async def _aget_available_periods(blane_id: int) -> str:
+    token = await aget_token()
+    if not token:
+        return "❌ Failed to retrieve token. Please try again later."
 
-        return "\n".join(output)
+    try:
+        blane, error, front_response = await _ablane_and_availability(
+            blane_id, "date", lambda slug: aapi_get(f"{BASEURLFRONT}/blanes/{slug}")
+        )
+        if error:
+            return error
+        front_response.raise_for_status()
+        return _format_periods(blane, front_response.json().get("data", {}))
 
     except httpx.HTTPStatusError as e:
         return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
@@ -633,6 +819,87 @@ def get_available_periods(blane_id: int) -> str:
         return f"❌ Error fetching periods: {str(e)}"
 
 
+get_available_periods.coroutine = _aget_available_periods
+
+
+def _format_blane_info(blane: dict) -> str:
+    msg = f"📋 *Blane Details*\n\n"
+    msg += f"🏷 *Name:* {blane.get('name')}\n"
+    msg += f"🏙 *City:* {blane.get('city')}\n"
+    msg += f"🏪 *Vendor:* {blane.get('commerce_name', 'N/A')}\n"
+
+    description = truncate_text(blane.get("description"))
+    msg += f"\n💬 *Description:*\n{description}\n"
+    msg += f"\n💰 *Price:* {blane.get('price_current')} MAD"
+    if blane.get("price_old"):
+        msg += f"\n~~Old Price: {blane.get('price_old')} MAD~~"
+
+    # General Type
+    main_type = blane.get("type")
+    msg += f"\n\n📍 *Type:* {main_type.capitalize()}"
+
+    # Sub Type
+    if main_type == "reservation":
+        subtype = "Hour-Based" if blane.get("type_time") == "time" else "Daily-Based"
+        msg += f"\n📆 *Reservation Type:* {subtype}"
+    elif main_type == "order":
+        product_type = (
+            "Digital Product" if blane.get("is_digital") else "Physical Product"
+        )
+        msg += f"\n🛍 *Product Type:* {product_type}"
+
+    # Time Slot Info
+    if blane.get("type_time") == "time":
+        msg += f"\n🕒 *Slot Duration:* {blane.get('intervale_reservation')} minutes"
+        msg += f"\n🕓 *Opens:* {format_time(blane.get('heure_debut'))}"
+        msg += f"\n🕔 *Closes:* {format_time(blane.get('heure_fin'))}"
+
+    # Reservation Info
+    if main_type == "reservation":
+        msg += f"\n📅 *Available From:* {format_date(blane.get('start_date'))}"
+        msg += f"\n📅 *Expires On:* {format_date(blane.get('expiration_date'))}"
+        jours = blane.get("jours_creneaux")
+        if isinstance(jours, list) and jours:
+            msg += f"\n📆 *Days Open:* {', '.join(jours)}"
+
+        msg += f"\n👥 *Max Per Slot:* {blane.get('max_reservation_par_creneau')}"
+        msg += f"\n👤 *Persons per Deal:* {blane.get('nombre_personnes')}"
+        msg += f"\n🔢 *Total Reservation Limit:* {blane.get('nombre_max_reservation')}"
+
+    # Order Info
+    elif main_type == "order":
+        msg += f"\n📦 *Stock Available:* {blane.get('stock')}"
+        msg += f"\n🛒 *Max Orders per Transaction:* {blane.get('max_orders')}"
+        if not blane.get("is_digital"):
+            if blane.get("livraison_in_city"):
+                msg += (
+                    f"\n🚚 *Delivery (Same City):* {blane.get('livraison_in_city')} MAD"
+                )
+            if blane.get("livraison_out_city"):
+                msg += f"\n🚛 *Delivery (Other City):* {blane.get('livraison_out_city')} MAD"
+
+    # Payment Info
+    msg += f"\n\n💳 *Payment Options:*"
+    msg += f"\n- 💵 Cash: {'✅' if blane.get('cash') else '❌'}"
+    msg += f"\n- 💳 Online Full: {'✅' if blane.get('online') else '❌'}"
+    partiel = blane.get("partiel")
+    partiel_percent = blane.get("partiel_field")
+    msg += f"\n- 💳 Online Partial: {'✅' if partiel else '❌'}"
+    if partiel and partiel_percent:
+        msg += f" ({partiel_percent}%)"
+
+    # Optional
+    if blane.get("advantages"):
+        msg += f"\n\n🎁 *Advantages:* {blane['advantages']}"
+    if blane.get("conditions"):
+        msg += f"\n📌 *Conditions:* {blane['conditions']}"
+    if blane.get("rating") is not None:
+        msg += f"\n⭐ *Rating:* {float(blane['rating']):.1f}"
+
+    msg += "\n\nDo you want me to book this for you, or see other blanes?\nButtons: [Book this] [See others]"
+    return msg
+
+
 @tool("blanes_info")
 def get_blane_info(blane_id: int):
     """
@@ -643,95 +910,33 @@ def get_blane_info(blane_id: int):
     if not token:
         return "❌ Failed to retrieve token. Please try again later."
 
-    url = f"{BASEURLBACK}/blanes/{blane_id}"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     try:
-        response = httpx.get(url, headers=headers)
-        response.raise_for_status()
-        blane = response.json().get("data", [])
-        print(blane)
-
-        msg = f"📋 *Blane Details*\n\n"
-        msg += f"🏷 *Name:* {blane.get('name')}\n"
-        msg += f"🏙 *City:* {blane.get('city')}\n"
-        msg += f"🏪 *Vendor:* {blane.get('commerce_name', 'N/A')}\n"
-
-        msg += f"\n💬 *Description:*\n{blane.get('description')}\n"
-        msg += f"\n💰 *Price:* {blane.get('price_current')} MAD"
-        if blane.get("price_old"):
-            msg += f"\n~~Old Price: {blane.get('price_old')} MAD~~"
-
-        # General Type
-        main_type = blane.get("type")
-        msg += f"\n\n📍 *Type:* {main_type.capitalize()}"
-
-        # Sub Type
-        if main_type == "reservation":
-            subtype = (
-                "Hour-Based" if blane.get("type_time") == "time" else "Daily-Based"
-            )
-            msg += f"\n📆 *Reservation Type:* {subtype}"
-        elif main_type == "order":
-            product_type = (
-                "Digital Product" if blane.get("is_digital") else "Physical Product"
-            )
-            msg += f"\n🛍 *Product Type:* {product_type}"
-
-        # Time Slot Info
-        if blane.get("type_time") == "time":
-            msg += f"\n🕒 *Slot Duration:* {blane.get('intervale_reservation')} minutes"
-            msg += f"\n🕓 *Opens:* {format_time(blane.get('heure_debut'))}"
-            msg += f"\n🕔 *Closes:* {format_time(blane.get('heure_fin'))}"
-
-        # Reservation Info
-        if main_type == "reservation":
-            msg += f"\n📅 *Available From:* {format_date(blane.get('start_date'))}"
-            msg += f"\n📅 *Expires On:* {format_date(blane.get('expiration_date'))}"
-            jours = blane.get("jours_creneaux")
-            if isinstance(jours, list) and jours:
-                msg += f"\n📆 *Days Open:* {', '.join(jours)}"
-
-            msg += f"\n👥 *Max Per Slot:* {blane.get('max_reservation_par_creneau')}"
-            msg += f"\n👤 *Persons per Deal:* {blane.get('nombre_personnes')}"
-            msg += (
-                f"\n🔢 *Total Reservation Limit:* {blane.get('nombre_max_reservation')}"
-            )
+        blane = blane_cache.get(blane_id)
+    except httpx.HTTPStatusError as e:
+        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
+
+    if not blane:
+        return f"❌ Blane with ID {blane_id} not found."
+    return _format_blane_info(blane)
 
-        # Order Info
-        elif main_type == "order":
-            msg += f"\n📦 *Stock Available:* {blane.get('stock')}"
-            msg += f"\n🛒 *Max Orders per Transaction:* {blane.get('max_orders')}"
-            if not blane.get("is_digital"):
-                if blane.get("livraison_in_city"):
-                    msg += f"\n🚚 *Delivery (Same City):* {blane.get('livraison_in_city')} MAD"
-                if blane.get("livraison_out_city"):
-                    msg += f"\n🚛 *Delivery (Other City):* {blane.get('livraison_out_city')} MAD"
-
-        # Payment Info
-        msg += f"\n\n💳 *Payment Options:*"
-        msg += f"\n- 💵 Cash: {'✅' if blane.get('cash') else '❌'}"
-        msg += f"\n- 💳 Online Full: {'✅' if blane.get('online') else '❌'}"
-        partiel = blane.get("partiel")
-        partiel_percent = blane.get("partiel_field")
-        msg += f"\n- 💳 Online Partial: {'✅' if partiel else '❌'}"
-        if partiel and partiel_percent:
-            msg += f" ({partiel_percent}%)"
-
-        # Optional
-        if blane.get("advantages"):
-            msg += f"\n\n🎁 *Advantages:* {blane['advantages']}"
-        if blane.get("conditions"):
-            msg += f"\n📌 *Conditions:* {blane['conditions']}"
-        if blane.get("rating") is not None:
-            msg += f"\n⭐ *Rating:* {float(blane['rating']):.1f}"
-
-        msg += "\n\nDo you want me to book this for you, or see other blanes?\nButtons: [Book this] [See others]"
-        return msg
 
+async def _aget_blane_info(blane_id: int):
+    token = await aget_token()
+    if not token:
+        return "❌ Failed to retrieve token. Please try again later."
+
+    try:
+        blane = await blane_cache.aget(blane_id)
     except httpx.HTTPStatusError as e:
         return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
 
+    if not blane:
+        return f"❌ Blane with ID {blane_id} not found."
+    return _format_blane_info(blane)
+
+
+get_blane_info.coroutine = _aget_blane_info
+
 
 @tool("before_create_reservation")
 def prepare_reservation_prompt(blane_id: int) -> str:
@@ -739,20 +944,14 @@ def prepare_reservation_prompt(blane_id: int) -> str:
     This tool will prepare a reservation prompt for a specific blane. Run this tool before `create_reservation`.
     Returns a dynamic WhatsApp-style prompt with date/time or general info needed to make a reservation for a blane.
     """
-    from datetime import datetime, timedelta
     import httpx
 
     token = get_token()
     if not token:
         return "❌ Failed to retrieve token."
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     try:
-        res = httpx.get(f"{BASEURLBACK}/blanes/{blane_id}", headers=headers)
-        res.raise_for_status()
-        # blane = next((b for b in res.json()["data"] if b["id"] == blane_id), None)
-        blane = res.json()["data"]
+        blane = blane_cache.get(blane_id)
         if not blane:
             return f"❌ Blane with ID {blane_id} not found."
     except Exception as e:
@@ -768,33 +967,10 @@ def prepare_reservation_prompt(blane_id: int) -> str:
     end = format_date(blane.get("expiration_date", ""))
     date_range = f"{start} to {end}" if start and end else "Unknown"
 
-    # Generate time slots if applicable
+    # The same slot grid create_reservation validates against
     slots = ""
     if is_reservation and type_time == "time":
-        try:
-            heure_debut_str = blane["heure_debut"]
-            heure_fin_str = blane["heure_fin"]
-            interval = int(blane["intervale_reservation"])
-
-            for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%H:%M:%S"):
-                try:
-                    heure_debut = datetime.strptime(heure_debut_str, fmt).time()
-                    heure_fin = datetime.strptime(heure_fin_str, fmt).time()
-                    break
-                except ValueError:
-                    continue
-            else:
-                return "❌ Could not parse blane time format."
-
-            current = datetime.combine(datetime.today(), heure_debut)
-            end_dt = datetime.combine(datetime.today(), heure_fin)
-            time_slots = []
-            while current <= end_dt:
-                time_slots.append(current.strftime("%H:%M"))
-                current += timedelta(minutes=interval)
-            slots = ", ".join(time_slots)
-        except Exception:
-            slots = "Invalid time format"
+        slots = blane_schedules.get(blane).slots_text()
 
     # Build prompt dynamically
     msg = f"To proceed with your reservation for the blane *{name}*, I need the following details:\n\n"
@@ -838,24 +1014,21 @@ def create_reservation(
     number_persons: int = 1,
     delivery_address: str = "N/A",
     comments: str = "N/A",
+    quote_id: str = "N/A",
 ) -> str:
     """
     Handles reservation or order creation. Must run `before_create_reservation` first.
+    Pass the `quote_id` shown by `preview_reservation` to book at the previewed price.
     """
-    from datetime import datetime, timedelta
     import httpx
 
     token = get_token()
     if not token:
         return "❌ Failed to retrieve token."
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-    # Fetch blane details
+    # Fetch blane details, bypassing the cache so price and stock are current
     try:
-        res = httpx.get(f"{BASEURLBACK}/blanes/{blane_id}", headers=headers)
-        res.raise_for_status()
-        blane = res.json()["data"]
+        blane = blane_cache.get(blane_id, force_refresh=True)
         if not blane:
             return f"❌ Blane with ID {blane_id} not found."
     except Exception as e:
@@ -894,98 +1067,22 @@ def create_reservation(
         # Continue with the rest of your reservation logic...
         blane_type = blane.get("type")
         type_time = blane.get("type_time")
-        base_price = float(blane.get("price_current", 0))
-        total_price = base_price * quantity
 
-        # 🔸 Handle Delivery Cost (for orders)
-        if blane_type == "order" and not blane.get("is_digital"):
-            if blane.get("city") != city:
-                total_price += float(blane.get("livraison_out_city", 0))
-            else:
-                total_price += float(blane.get("livraison_in_city", 0))
-
-        # 🔸 Determine supported payment options from blane
-        supports_online = bool(blane.get("online"))
-        supports_partiel = bool(blane.get("partiel"))
-        supports_cash = bool(blane.get("cash"))
-
-        # 🔸 Choose payment route: prefer partial if available, else full online, else cash
-        payment_route = "cash"
-        if supports_partiel:
-            payment_route = "partiel"
-        elif supports_online:
-            payment_route = "online"
-        elif supports_cash:
-            payment_route = "cash"
-
-        # 🔸 Handle Partial Payments amount
-        partiel_price = 0
-        if payment_route == "partiel" and blane.get("partiel_field"):
-            percent = float(blane["partiel_field"])
-            partiel_price = round((percent / 100) * total_price)
-
-        # 🔸 Validate reservation date
-        today = datetime.today().date()
-        if date != "N/A":
-            try:
-                date_obj = datetime.strptime(date, "%Y-%m-%d").date()
-                if date_obj < today:
-                    return f"❌ Reservation date {date} must not be in the past."
-            except Exception:
-                return f"❌ Invalid date format. Use YYYY-MM-DD."
+        # 🔸 Price, delivery and payment route. The preview's quote only
+        # holds if the fresh blane and the inputs still give the same one.
+        if quote_id and quote_id != "N/A":
+            quote = quote_book.redeem(quote_id, blane, quantity, city)
+            if quote is None:
+                return "❌ The price or booking details changed since the recap. Please run preview_reservation again and confirm the new total."
+        else:
+            quote = quote_book.quote(blane, quantity, city)
+        payment_route = quote.payment_route
 
-        # 🔸 Reservation Logic
+        # 🔸 Validate date / time against the blane's schedule
         if blane_type == "reservation":
-            jours_open = blane.get("jours_creneaux", [])
-            user_day = datetime.strptime(date, "%Y-%m-%d").strftime("%A")
-            user_day_fr = {
-                "Monday": "Lundi",
-                "Tuesday": "Mardi",
-                "Wednesday": "Mercredi",
-                "Thursday": "Jeudi",
-                "Friday": "Vendredi",
-                "Saturday": "Samedi",
-                "Sunday": "Dimanche",
-            }.get(user_day, "")
-
-            if jours_open and user_day_fr not in jours_open:
-                return f"🚫 This blane is closed on {user_day}."
-
-            if type_time == "time":
-                heure_debut = parse_time_only(blane["heure_debut"])
-                heure_fin = parse_time_only(blane["heure_fin"])
-                try:
-                    slot_time = datetime.strptime(time, "%H:%M").time()
-                except:
-                    return "❌ Invalid time format. Use HH:MM."
-
-                # Check time is in valid slots
-                current = datetime.combine(datetime.today(), heure_debut)
-                end_dt = datetime.combine(datetime.today(), heure_fin)
-                interval = int(blane["intervale_reservation"])
-                valid_slots = []
-
-                while current < end_dt:  # ✅ Fixed: use < instead of <=
-                    valid_slots.append(current.strftime("%H:%M"))
-                    current += timedelta(minutes=interval)
-
-                if time not in valid_slots:
-                    return f"🕓 Invalid time. Choose from: {', '.join(valid_slots)}"
-
-            elif type_time == "date":
-                try:
-                    start = parse_datetime(blane.get("start_date"))
-                    end = parse_datetime(blane.get("expiration_date"))
-                    user_date = datetime.strptime(date, "%Y-%m-%d")
-                    user_end_date = datetime.strptime(end_date, "%Y-%m-%d")
-                    if not (start.date() <= user_date.date() <= end.date()):
-                        return f"❌ Start date must be within {start.date()} to {end.date()}"
-                    if not (start.date() <= user_end_date.date() <= end.date()):
-                        return (
-                            f"❌ End date must be within {start.date()} to {end.date()}"
-                        )
-                except:
-                    return "❌ Invalid start or end date format."
+            error = blane_schedules.get(blane).check(date, time, end_date)
+            if error:
+                return error
 
             payload = {
                 "blane_id": blane_id,
@@ -996,12 +1093,12 @@ def create_reservation(
                 "date": date,
                 "end_date": end_date if type_time == "date" else None,
                 "time": time if type_time == "time" else None,
-                "quantity": quantity,
+                "quantity": quote.quantity,
                 "number_persons": number_persons,
                 "payment_method": payment_route,
                 "status": "pending",
-                "total_price": total_price - partiel_price,
-                "partiel_price": partiel_price,
+                "total_price": quote.due_later,
+                "partiel_price": quote.partiel_price,
                 "comments": comments,
             }
 
@@ -1017,11 +1114,11 @@ def create_reservation(
                 "phone": phone,
                 "city": city,
                 "delivery_address": delivery_address,
-                "quantity": quantity,
+                "quantity": quote.quantity,
                 "payment_method": payment_route,
                 "status": "pending",
-                "total_price": total_price - partiel_price,
-                "partiel_price": partiel_price,
+                "total_price": quote.due_later,
+                "partiel_price": quote.partiel_price,
                 "comments": comments,
             }
 
@@ -1036,7 +1133,13 @@ def create_reservation(
             elif blane_type == "order":
                 API = f"{BASEURLFRONT}/orders"
 
-            res = httpx.post(f"{API}", headers=headers, json=payload)
+            res = api_post(f"{API}", json=payload)
+            if blane_type == "reservation":
+                # Booked (or refused for lack of space): either way the
+                # cached slots for that date are out of date now.
+                availability_cache.invalidate(
+                    blane_id, date if type_time == "time" else None
+                )
             res.raise_for_status()
             data = res.json()
 
@@ -1054,9 +1157,7 @@ def create_reservation(
                 if reference:
                     try:
                         pay_url = f"{BASEURLFRONT}/payment/cmi/initiate"
-                        pay_res = httpx.post(
-                            pay_url, headers=headers, json={"number": reference}
-                        )
+                        pay_res = api_post(pay_url, json={"number": reference})
                         pay_res.raise_for_status()
                         pay_data = pay_res.json()
                         if pay_data.get("status") and pay_data.get("payment_url"):
@@ -1097,21 +1198,17 @@ def preview_reservation(
     """
     Prepare a booking recap with dynamic price calculation (including delivery and partial payments) WITHOUT creating it.
     Shows a confirmation prompt with Buttons: [Confirm] [Edit] [Cancel].
+    The recap's quote id goes to `create_reservation` to book at this price.
     """
-    from datetime import datetime, timedelta
     import httpx
 
     token = get_token()
     if not token:
         return "❌ Failed to retrieve token. Please try again later."
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     # Fetch blane
     try:
-        res = httpx.get(f"{BASEURLBACK}/blanes/{blane_id}", headers=headers)
-        res.raise_for_status()
-        blane = res.json().get("data", {})
+        blane = blane_cache.get(blane_id)
         if not blane:
             return f"❌ Blane with ID {blane_id} not found."
     except Exception as e:
@@ -1120,67 +1217,21 @@ def preview_reservation(
     blane_type = blane.get("type")
     type_time = blane.get("type_time")
 
-    # Pricing
-    try:
-        base_price = float(blane.get("price_current", 0))
-    except Exception:
-        base_price = 0.0
-    total_price = base_price * max(1, int(quantity))
-
-    # Delivery for physical orders
-    delivery_cost = 0.0
-    if blane_type == "order" and not blane.get("is_digital"):
-        if blane.get("city") != city:
-            delivery_cost = float(blane.get("livraison_out_city", 0))
-        else:
-            delivery_cost = float(blane.get("livraison_in_city", 0))
-        total_price += delivery_cost
-
-    # Payment route
-    supports_online = bool(blane.get("online"))
-    supports_partiel = bool(blane.get("partiel"))
-    supports_cash = bool(blane.get("cash"))
-
-    payment_route = "cash"
-    if supports_partiel:
-        payment_route = "partiel"
-    elif supports_online:
-        payment_route = "online"
-    elif supports_cash:
-        payment_route = "cash"
-
-    # Partial amount
-    partiel_percent = None
-    partiel_price = 0
-    if payment_route == "partiel" and blane.get("partiel_field"):
-        try:
-            partiel_percent = float(blane.get("partiel_field"))
-            partiel_price = round((partiel_percent / 100) * total_price)
-        except Exception:
-            partiel_percent = None
-            partiel_price = 0
-
-    # Validate date/time inputs for reservation
-    try:
-        if blane_type == "reservation":
-            if type_time == "time":
-                # validate date
-                if date and date != "N/A":
-                    _ = datetime.strptime(date, "%Y-%m-%d")
-                else:
-                    return "❌ Please provide a date (YYYY-MM-DD)."
-                # validate time
-                if time and time != "N/A":
-                    _ = datetime.strptime(time, "%H:%M")
-                else:
-                    return "❌ Please provide a time (HH:MM)."
-            elif type_time == "date":
-                if not (date and end_date and date != "N/A" and end_date != "N/A"):
-                    return "❌ Please provide start and end dates (YYYY-MM-DD)."
-                _ = datetime.strptime(date, "%Y-%m-%d")
-                _ = datetime.strptime(end_date, "%Y-%m-%d")
-    except Exception:
-        return "❌ Invalid date or time format."
+    # Validate date/time inputs for reservation, as create_reservation will
+    if blane_type == "reservation":
+        if type_time == "time":
+            if not date or date == "N/A":
+                return "❌ Please provide a date (YYYY-MM-DD)."
+            if not time or time == "N/A":
+                return "❌ Please provide a time (HH:MM)."
+        elif type_time == "date":
+            if not (date and end_date and date != "N/A" and end_date != "N/A"):
+                return "❌ Please provide start and end dates (YYYY-MM-DD)."
+        error = blane_schedules.get(blane).check(date, time, end_date)
+        if error:
+            return error
+
+    quote = quote_book.quote(blane, quantity, city)
 
     # Build recap
     blane_name = blane.get("name", "Unknown")
@@ -1203,29 +1254,30 @@ def preview_reservation(
                 f"- End Date: {end_date}",
             ]
         lines += [
-            f"- Quantity: {quantity}",
+            f"- Quantity: {quote.quantity}",
             f"- Persons: {number_persons}",
         ]
     else:
         lines += [
-            f"- Quantity: {quantity}",
+            f"- Quantity: {quote.quantity}",
         ]
         if delivery_address and delivery_address != "N/A":
             lines.append(f"- Delivery Address: {delivery_address}")
 
     lines += [
         f"- City: {city}",
-        f"- Payment: {'Partial' if payment_route=='partiel' else ('Online' if payment_route=='online' else 'Cash')}",
+        f"- Payment: {quote.payment_label}",
     ]
 
     if blane_type == "order" and not blane.get("is_digital"):
-        lines.append(f"- Delivery Cost: {int(delivery_cost)} MAD")
+        lines.append(f"- Delivery Cost: {int(quote.delivery_cost)} MAD")
 
-    lines.append(f"- Total: {int(total_price)} MAD")
-    if payment_route == "partiel" and partiel_price:
-        lines.append(f"- Due now (partial): {int(partiel_price)} MAD")
-    elif payment_route == "online":
-        lines.append(f"- Due now: {int(total_price)} MAD")
+    lines.append(f"- Total: {int(quote.total_price)} MAD")
+    if quote.payment_route == "partiel" and quote.partiel_price:
+        lines.append(f"- Due now (partial): {int(quote.partiel_price)} MAD")
+    elif quote.payment_route == "online":
+        lines.append(f"- Due now: {int(quote.total_price)} MAD")
+    lines.append(f"- Quote: {quote.quote_id}")
 
     lines += [
         "",
@@ -1236,6 +1288,78 @@ def preview_reservation(
     return "\n".join(lines)
 
 
+# What the agent needs of each reservation / order; the API returns every
+# column plus the nested blane and customer.
+RESERVATION_FIELDS = {
+    "reference": "NUM_RES",
+    "blane_id": "blane_id",
+    "blane": "blane.name",
+    "date": "date",
+    "end_date": "end_date",
+    "time": "time",
+    "quantity": "quantity",
+    "persons": "number_persons",
+    "status": "status",
+    "payment": "payment_method",
+    "total_price": "total_price",
+    "paid_online": "partiel_price",
+}
+ORDER_FIELDS = {
+    "reference": "NUM_ORD",
+    "blane_id": "blane_id",
+    "blane": "blane.name",
+    "quantity": "quantity",
+    "status": "status",
+    "payment": "payment_method",
+    "total_price": "total_price",
+    "delivery_address": "delivery_address",
+    "created_at": "created_at",
+}
+
+
+def _compact_reservations(result: dict) -> dict:
+    """Latest reservations and orders first, projected and capped."""
+    for key, fields in (("reservations", RESERVATION_FIELDS), ("orders", ORDER_FIELDS)):
+        items = sorted(
+            result.get(key) or [],
+            key=lambda r: str(r.get("created_at") or ""),
+            reverse=True,
+        )
+        items, more = cap_list(items)
+        result[key] = [project(item, fields) for item in items]
+        if more:
+            result[f"{key}_more"] = more_marker(more)
+        if f"{key}_error" in result:
+            result[f"{key}_error"] = truncate_text(result[f"{key}_error"], 50)
+    return result
+
+
+def _merge_reservations(res_response, orders_response):
+    """
+    The compact reservations + orders summary from the two responses (either
+    may be an exception from `run_concurrently`), or an error message if
+    neither could be read.
+    """
+    responses = (("reservations", res_response), ("orders", orders_response))
+    if any(isinstance(response, LoginError) for _, response in responses):
+        return "❌ Failed to retrieve token."
+    result = {"reservations": [], "orders": []}
+    for key, response in responses:
+        if isinstance(response, Exception):
+            result[f"{key}_error"] = str(response) or type(response).__name__
+        elif response.status_code == 200:
+            try:
+                result[key] = response.json().get("data", [])
+            except ValueError:
+                result[f"{key}_error"] = "Invalid response from the server"
+        else:
+            result[f"{key}_error"] = response.text
+    if "reservations_error" in result and "orders_error" in result:
+        error = truncate_text(result["reservations_error"], 50)
+        return f"❌ Failed to retrieve reservations: {error}"
+    return _compact_reservations(result)
+
+
 @tool("list_reservations")
 def list_reservations(email: str) -> str:
     """
@@ -1243,31 +1367,23 @@ def list_reservations(email: str) -> str:
     Requires user's email.
     """
 
-    token = get_token()
-    if not token:
-        return {"error": "❌ Failed to retrieve token."}
+    # Reservations and orders are independent: fetch them together.
+    res_response, orders_response = run_concurrently(
+        lambda: api_get(f"{BASEURLBACK}/reservations", params={"email": email}),
+        lambda: api_get(f"{BASEURLBACK}/orders", params={"email": email}),
+    )
+    return _merge_reservations(res_response, orders_response)
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
-    result = {"reservations": [], "orders": []}
+async def _alist_reservations(email: str) -> str:
+    res_response, orders_response = await arun_concurrently(
+        aapi_get(f"{BASEURLBACK}/reservations", params={"email": email}),
+        aapi_get(f"{BASEURLBACK}/orders", params={"email": email}),
+    )
+    return _merge_reservations(res_response, orders_response)
 
-    # Fetch Reservations
-    res_url = f"{BASEURLBACK}/reservations?email={email}"
-    res_response = requests.get(res_url, headers=headers)
-    if res_response.status_code == 200:
-        result["reservations"] = res_response.json().get("data", [])
-    else:
-        result["reservations_error"] = res_response.text
 
-    # Fetch Orders
-    orders_url = f"{BASEURLBACK}/orders?email={email}"
-    orders_response = requests.get(orders_url, headers=headers)
-    if orders_response.status_code == 200:
-        result["orders"] = orders_response.json().get("data", [])
-    else:
-        result["orders_error"] = orders_response.text
-
-    return result
+list_reservations.coroutine = _alist_reservations
 
 
 district_map = {
@@ -1311,210 +1427,217 @@ district_map = {
     ],
 }
 
+# Other spellings of the sub-districts above (matched accent-insensitively,
+# hyphens and apostrophes read as spaces).
+LOCATION_ALIASES = {
+    "centre ville": ["centreville", "downtown", "city center", "city centre"],
+    "médina": ["ancienne médina", "old medina"],
+    "maârif": ["maarif", "mâarif"],
+    "ain diab": ["aïn diab", "ain dyab", "ayn diab"],
+    "triangle d'or": ["triangle dor", "golden triangle"],
+    "aïn chock": ["ain chok", "ain chouk"],
+    "sidi maârouf": ["sidi marouf", "sidi maarouf"],
+    "aïn sebaâ": ["ain seba", "ain sbaa", "ain sebaa"],
+    "hay mohammadi": ["hay mohamadi"],
+    "ben m'sick": ["ben msik", "ben msick", "benmsick"],
+    "belvédère": ["belvedere"],
+    "dar bouazza": ["dar bouaaza"],
+    "mohammedia": ["mohamedia"],
+}
 
-def _matches_category(name: str, description: str, category: str) -> bool:
-    """
-    Improved category matching with better keyword organization and fuzzy matching.
-    """
-    if not category:
-        return True
+location_index = LocationIndex(district_map, LOCATION_ALIASES)
+catalog.add_listener(location_index.sync_with_catalog)
 
-    category_lower = category.strip().lower()
-    text_to_search = f"{name} {description or ''}".lower()
-
-    # Enhanced keyword mapping with more comprehensive terms
-    category_keywords = {
-        "restaurant": [
-            # Core restaurant terms
-            "restaurant",
-            "resto",
-            "food",
-            "cuisine",
-            "kitchen",
-            "dining",
-            # Meal types
-            "café",
-            "brunch",
-            "goûters",
-            "déjeunez",
-            "dinner",
-            "lunch",
-            "breakfast",
-            # Food items
-            "pizzeria",
-            "pizzas",
-            "pâte",
-            "sauce",
-            "tomate",
-            "ingrédients",
-            # Experience terms
-            "gastronomie",
-            "ambiance",
-            "gnaoua",
-            "artisanat",
-            "créativité",
-            # Drink terms
-            "drinks",
-            "bar",
-            "cocktail",
-            "beverage",
-            # Specific restaurant names/types
-            "bazenne",
-            "cappero",
-        ],
-        "spa": [
-            # Core spa services
-            "spa",
-            "massage",
-            "hammam",
-            "soin",
-            "wellness",
-            "détente",
-            "relaxation",
-            # Beauty services
-            "beauté",
-            "esthétique",
-            "institut",
-            "salon",
-            "coiffure",
-            # Hair services
-            "cheveux",
-            "brushing",
-            "coupe",
-            "lissant",
-            # Nail services
-            "manucure",
-            "pédicure",
-            "vernis",
-            # Facial services
-            "visage",
-            "facial",
-            "hydra",
-            "gommage",
-            # Treatment types
-            "relaxant",
-            "hydratant",
-            "réparateur",
-            "hydromassage",
-            # Facilities
-            "transats",
-            "pool",
-            "piscine",
-            # Specific spa brands/names
-            "fish",
-            "musc",
-            "taha",
-            "nashi",
-            "nelya",
-            "jasmin",
-        ],
-        "activity": [
-            # Core activity terms
-            "activité",
-            "activities",
-            "activity",
-            "fun",
-            "entertainment",
-            # Adventure activities
-            "escape",
-            "paintball",
-            "accrobranche",
-            "quad",
-            "aventures",
-            # Water activities
-            "toboggans",
-            "piscines",
-            "aquatiques",
-            "natation",
-            "eau",
-            "tubing",
-            "slide",
-            # Gaming
-            "laser game",
-            "jeux",
-            "bowling",
-            "cinema",
-            "cinéma",
-            # Sports
-            "sports",
-            "sportives",
-            "équipe",
-            "team building",
-            # Kids activities
-            "enfants",
-            "summer camp",
-            "éducatif",
-            "plein air",
-            # Tech activities
-            "robotique",
-            "lego",
-            "codage",
-            "intelligence artificielle",
-            # Creative activities
-            "créatives",
-            "culturelles",
-            "projets innovants",
-            # Business activities
-            "corporate",
-            "présentation",
-            "team",
-            "building",
-            # Event spaces
-            "villa",
-            "terrain",
-            "décor",
-        ],
-    }
 
-    # Get keywords for the category, fallback to the category itself
-    keywords = category_keywords.get(category_lower, [category_lower])
+# Category keyword tables for _matches_category. Matching is whole-word and
+# accent-insensitive (see tools/keywords.py); "word*" matches any word
+# starting with "word".
+CATEGORY_KEYWORDS = {
+    "restaurant": [
+        # Core restaurant terms
+        "restaurant",
+        "resto",
+        "food",
+        "cuisine",
+        "kitchen",
+        "dining",
+        # Meal types
+        "café",
+        "brunch",
+        "goûters",
+        "déjeunez",
+        "dinner",
+        "lunch",
+        "breakfast",
+        # Food items
+        "pizzeria",
+        "pizzas",
+        "pâte",
+        "sauce",
+        "tomate",
+        "ingrédients",
+        # Experience terms
+        "gastronomie",
+        "ambiance",
+        "gnaoua",
+        "artisanat",
+        "créativité",
+        # Drink terms
+        "drinks",
+        "bar",
+        "cocktail",
+        "beverage",
+        # Specific restaurant names/types
+        "bazenne",
+        "cappero",
+        # Looser terms
+        "manger",
+        "plat",
+        "menu",
+        "chef",
+    ],
+    "spa": [
+        # Core spa services
+        "spa",
+        "massage",
+        "hammam",
+        "soin",
+        "wellness",
+        "détente",
+        "relaxation",
+        # Beauty services
+        "beauté",
+        "esthétique",
+        "institut",
+        "salon",
+        "coiffure",
+        # Hair services
+        "cheveux",
+        "brushing",
+        "coupe",
+        "lissant",
+        # Nail services
+        "manucure",
+        "pédicure",
+        "vernis",
+        # Facial services
+        "visage",
+        "facial",
+        "hydra*",
+        "gommage",
+        # Treatment types
+        "relaxant",
+        "hydratant",
+        "réparateur",
+        "hydromassage",
+        # Facilities
+        "transats",
+        "pool",
+        "piscine",
+        # Specific spa brands/names
+        "fish",
+        "musc",
+        "taha",
+        "nashi",
+        "nelya",
+        "jasmin",
+        # Looser terms
+        "bien-être",
+        "soins",
+        "thérapie",
+    ],
+    "activity": [
+        # Core activity terms
+        "activité",
+        "activities",
+        "activity",
+        "fun",
+        "entertainment",
+        # Adventure activities
+        "escape",
+        "paintball",
+        "accrobranche",
+        "quad",
+        "aventures",
+        # Water activities
+        "toboggans",
+        "piscines",
+        "aquatiques",
+        "natation",
+        "eau",
+        "tubing",
+        "slide",
+        # Gaming
+        "laser game",
+        "jeux",
+        "bowling",
+        "cinema",
+        "cinéma",
+        # Sports
+        "sports",
+        "sportives",
+        "équipe",
+        "team building",
+        # Kids activities
+        "enfants",
+        "summer camp",
+        "éducatif",
+        "plein air",
+        # Tech activities
+        "robotique",
+        "lego",
+        "codage",
+        "intelligence artificielle",
+        # Creative activities
+        "créatives",
+        "culturelles",
+        "projets innovants",
+        # Business activities
+        "corporate",
+        "présentation",
+        "team",
+        "building",
+        # Event spaces
+        "villa",
+        "terrain",
+        "décor",
+        # Looser terms
+        "loisir",
+        "divertissement",
+        "adventure",
+    ],
+}
+
+CATEGORY_ALIASES = {"resto": "restaurant", "activite": "activity"}
 
-    # Check for exact matches and partial matches
-    for keyword in keywords:
-        if keyword in text_to_search:
-            return True
+CATEGORY_MATCHER = KeywordMatcher(CATEGORY_KEYWORDS)
 
-    # Additional fuzzy matching for common variations
-    if category_lower in ["restaurant", "resto"]:
-        return any(
-            term in text_to_search for term in ["manger", "plat", "menu", "chef"]
-        )
-    elif category_lower == "spa":
-        return any(
-            term in text_to_search for term in ["bien-être", "soins", "thérapie"]
-        )
-    elif category_lower in ["activity", "activité"]:
-        return any(
-            term in text_to_search for term in ["loisir", "divertissement", "adventure"]
-        )
 
-    return False
+@lru_cache(maxsize=256)
+def _category_pattern(category: str):
+    """Compiled keyword regex for a category name (aliases resolved)."""
+    category_key = fold(category).strip()
+    category_key = CATEGORY_ALIASES.get(category_key, category_key)
+    if category_key in CATEGORY_KEYWORDS:
+        return CATEGORY_MATCHER.pattern(category_key)
+    return single_keyword_matcher(category_key).pattern(category_key)
 
 
-def _normalize_location_text(text: str) -> str:
+def _matches_category(blane: dict, category: str) -> bool:
     """
-    Normalize location text for better matching.
+    Whether a blane's name/description matches a category, using the keyword
+    table compiled once at import (falls back to the category word itself).
+    Catalog entries carry their folded text (`search_text`).
     """
-    if not text:
-        return ""
-
-    # Convert to lowercase and strip
-    normalized = text.lower().strip()
-
-    # Handle common variations and abbreviations
-    location_variations = {
-        "ain": "aïn",
-        "centre-ville": "centre ville",
-        "sidi belyout (centre ville, médina)": [
-            "sidi belyout",
-            "centre ville",
-            "médina",
-        ],
-        "ain diab (corniche)": ["ain diab", "corniche", "aïn diab"],
-        "roches noires (belvédère)": ["roches noires", "belvédère"],
-    }
-
-    return normalized
+    if not category:
+        return True
+    pattern = _category_pattern(category)
+    if pattern is None:
+        return False
+    text = blane.get("search_text")
+    if text is None:
+        text = fold(f"{blane.get('name') or ''} {blane.get('description') or ''}")
+    return pattern.search(text) is not None
 
 
 @tool("introduction_message")
@@ -1575,174 +1698,200 @@ def introduction_message() -> str:
     return message
 
 
-@tool("check_message_relevance")
-def check_message_relevance(user_message: str) -> str:
-    """
-    MANDATORY FIRST TOOL: Check if user message is relevant to blanes/dabablane business.
-    This tool MUST be called before any other tool for every user interaction.
-    For greeting messages like hi, hey, hello, bonjour, call `introduction_message` instead.
+# Blane/business related keywords
+BLANE_KEYWORDS = [
+    "blane",
+    "blanes",
+    "dabablane",
+    "reservation",
+    "booking",
+    "book*",
+    "reserv*",
+    "restaurant",
+    "spa",
+    "activity",
+    "massage",
+    "food",
+    "eat",
+    "dine",
+    "activities",
+    "entertainment",
+    "wellness",
+    "relax*",
+    "casablanca",
+    "morocco",
+    "maroc",
+    "price",
+    "cost",
+    "available",
+    "time slot",
+    "appointment",
+    "order",
+    "delivery",
+    "table",
+    "treatment",
+    "service",
+    "deal",
+    "offer",
+    "discount",
+    "photo shoot",
+    "photograph*",
+    "studio",
+    "event",
+    "venue",
+    "location",
+]
+
+# Location keywords
+LOCATION_KEYWORDS = [
+    "anfa",
+    "hay hassani",
+    "ain chock",
+    "mers sultan",
+    "sidi bernoussi",
+    "moulay rachid",
+    "casablanca",
+    "morocco",
+    "maroc",
+    "near me",
+    "my area",
+    "district",
+    "neighbourhood",
+    "location",
+    "where",
+    "corniche",
+    "centre ville",
+    "medina",
+    "maârif",
+    "gauthier",
+]
+
+# Greeting keywords
+GREETING_KEYWORDS = [
+    "hello",
+    "hi",
+    "hey",
+    "bonjour",
+    "salut",
+    "salam",
+    "good morning",
+    "good afternoon",
+    "good evening",
+    "how are you",
+    "start",
+    "begin",
+]
+
+# Irrelevant keywords (clearly off-topic)
+IRRELEVANT_KEYWORDS = [
+    "weather",
+    "politics",
+    "news",
+    "stock market",
+    "crypto",
+    "bitcoin",
+    "programming",
+    "code",
+    "technical support",
+    "computer",
+    "software",
+    "medicine",
+    "health advice",
+    "legal advice",
+    "homework",
+    "study",
+    "recipe",
+    "cooking tutorial",
+    "travel outside morocco",
+]
+
+# Phrases that suggest the user wants something we might have
+INTENT_KEYWORDS = [
+    "suggest",
+    "looking for",
+    "want",
+    "help",
+    "show me",
+    "find",
+    "search",
+]
+
+RELEVANCE_MATCHER = KeywordMatcher(
+    {
+        "blane": BLANE_KEYWORDS,
+        "location": LOCATION_KEYWORDS,
+        "greeting": GREETING_KEYWORDS,
+        "irrelevant": IRRELEVANT_KEYWORDS,
+        "intent": INTENT_KEYWORDS,
+    }
+)
 
-    Args:
-        user_message: User's input message
 
-    Returns:
-        "relevant" if message is about blanes/booking/reservations
-        "greeting" if it's a greeting message
-        "irrelevant" with redirect message if not related to blanes
+def classify_message(user_message: str) -> tuple:
+    """
+    Rule-based relevance check behind `check_message_relevance`. Returns the
+    verdict ("relevant", "greeting" or "irrelevant: <redirect message>") and
+    the keyword counts per class, which the fast-path router also uses.
     """
-
     if not user_message or not user_message.strip():
         return (
-            "irrelevant: Please provide a valid message about blanes or reservations."
+            "irrelevant: Please provide a valid message about blanes or reservations.",
+            {},
         )
 
     message_lower = user_message.lower().strip()
 
-    # Blane/business related keywords
-    blane_keywords = [
-        "blane",
-        "blanes",
-        "dabablane",
-        "reservation",
-        "booking",
-        "book",
-        "reserve",
-        "restaurant",
-        "spa",
-        "activity",
-        "massage",
-        "food",
-        "eat",
-        "dine",
-        "activities",
-        "entertainment",
-        "wellness",
-        "relax",
-        "casablanca",
-        "morocco",
-        "maroc",
-        "price",
-        "cost",
-        "available",
-        "time slot",
-        "appointment",
-        "order",
-        "delivery",
-        "table",
-        "treatment",
-        "service",
-        "deal",
-        "offer",
-        "discount",
-        "photo shoot",
-        "photography",
-        "studio",
-        "event",
-        "venue",
-        "location",
-    ]
-
-    # Location keywords
-    location_keywords = [
-        "anfa",
-        "hay hassani",
-        "ain chock",
-        "mers sultan",
-        "sidi bernoussi",
-        "moulay rachid",
-        "casablanca",
-        "morocco",
-        "maroc",
-        "near me",
-        "my area",
-        "district",
-        "neighbourhood",
-        "location",
-        "where",
-        "corniche",
-        "centre ville",
-        "medina",
-        "maârif",
-        "gauthier",
-    ]
-
-    # Greeting keywords
-    greeting_keywords = [
-        "hello",
-        "hi",
-        "hey",
-        "bonjour",
-        "salut",
-        "salam",
-        "good morning",
-        "good afternoon",
-        "good evening",
-        "how are you",
-        "start",
-        "begin",
-    ]
-
-    # Irrelevant keywords (clearly off-topic)
-    irrelevant_keywords = [
-        "weather",
-        "politics",
-        "news",
-        "stock market",
-        "crypto",
-        "bitcoin",
-        "programming",
-        "code",
-        "technical support",
-        "computer",
-        "software",
-        "medicine",
-        "health advice",
-        "legal advice",
-        "homework",
-        "study",
-        "recipe",
-        "cooking tutorial",
-        "travel outside morocco",
-    ]
-
-    # Calculate relevance scores
-    blane_score = sum(1 for keyword in blane_keywords if keyword in message_lower)
-    location_score = sum(1 for keyword in location_keywords if keyword in message_lower)
-    greeting_score = sum(1 for keyword in greeting_keywords if keyword in message_lower)
-    irrelevant_score = sum(
-        1 for keyword in irrelevant_keywords if keyword in message_lower
-    )
+    # One pass over the message for every keyword class
+    scores = RELEVANCE_MATCHER.scan(message_lower)
+    blane_score = scores["blane"]
+    location_score = scores["location"]
+    greeting_score = scores["greeting"]
+    irrelevant_score = scores["irrelevant"]
 
     # Determine category and relevance
     total_positive = blane_score + location_score + greeting_score
 
     if irrelevant_score > 0 and total_positive == 0:
-        return "irrelevant: I'm Dabablane AI, specialized in helping with blane reservations, bookings, and finding activities, restaurants, and spa services in Casablanca. How can I help you with that?"
+        return (
+            "irrelevant: I'm Dabablane AI, specialized in helping with blane reservations, bookings, and finding activities, restaurants, and spa services in Casablanca. How can I help you with that?",
+            scores,
+        )
 
     if greeting_score > 0:
-        return "greeting"
+        return "greeting", scores
 
     if blane_score > 0 or location_score > 0 or total_positive > 0:
-        return "relevant"
+        return "relevant", scores
 
     # Try to find any possible connection to blanes
-    possible_blane_connection = any(
-        [
-            "suggest" in message_lower,
-            "looking for" in message_lower,
-            "want" in message_lower,
-            "help" in message_lower,
-            "show me" in message_lower,
-            "find" in message_lower,
-            "search" in message_lower,
-        ]
+    if scores["intent"]:
+        return "relevant", scores
+
+    # Default to irrelevant
+    return (
+        "irrelevant: I'm Dabablane AI, specialized in blane reservations and bookings. I can help you find restaurants, spas, activities, and more in Casablanca. What interests you?",
+        scores,
     )
 
-    if possible_blane_connection:
-        return "relevant"
 
-    # Default to irrelevant
-    return "irrelevant: I'm Dabablane AI, specialized in blane reservations and bookings. I can help you find restaurants, spas, activities, and more in Casablanca. What interests you?"
+@tool("check_message_relevance")
+def check_message_relevance(user_message: str) -> str:
+    """
+    MANDATORY FIRST TOOL: Check if user message is relevant to blanes/dabablane business.
+    This tool MUST be called before any other tool for every user interaction.
+    For greeting messages like hi, hey, hello, bonjour, call `introduction_message` instead.
+
+    Args:
+        user_message: User's input message
+
+    Returns:
+        "relevant" if message is about blanes/booking/reservations
+        "greeting" if it's a greeting message
+        "irrelevant" with redirect message if not related to blanes
+    """
+    verdict, _ = classify_message(user_message)
+    return verdict
+
     # import re
 
     # if not user_message or not user_message.strip():
@@ -1899,15 +2048,9 @@ def list_categories_func() -> str:
     Returns:
         dict: Dictionary mapping category IDs to category names
     """
-    token = get_token()
-    if not token:
-        return "❌ Failed to retrieve token. Please try again later."
-
     url = f"{BASEURLBACK}/categories"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     try:
-        response = httpx.get(url, headers=headers)
+        response = api_get(url)
         response.raise_for_status()
         data = response.json()
 
@@ -1932,6 +2075,8 @@ def list_blanes_by_location_and_category(
     city: str = "",
     start: int = 1,
     offset: int = 10,
+    session_id: str = "",
+    cursor: str = "",
 ) -> str:
     """
     Retrieve blanes by location and/or category with improved filtering logic.
@@ -1943,21 +2088,26 @@ def list_blanes_by_location_and_category(
         city: City name
         start: Starting position (default: 1)
         offset: Number of items to show (default: 10, max: 25)
+        session_id: Current session ID, so "show more" can reuse this list
+        cursor: Cursor shown under a previous page, to continue that list
     """
     # Validate and normalize parameters
     start = max(1, int(start))
     offset = max(1, min(25, int(offset)))
 
+    if cursor:
+        return _show_listing_page(
+            cursor, session_id, start if start > 1 else None, offset
+        )
+
     token = get_token()
     if not token:
         return "❌ Failed to retrieve token. Please try again later."
 
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
     # Normalize input filters
-    district_norm = _normalize_location_text(district)
-    sub_district_norm = _normalize_location_text(sub_district)
-    city_norm = _normalize_location_text(city)
+    district_norm = normalize_location_text(district)
+    sub_district_norm = normalize_location_text(sub_district)
+    city_norm = city.strip()
     category_norm = ""
     if category:
         category_norm = category.lower().strip()
@@ -1968,6 +2118,7 @@ def list_blanes_by_location_and_category(
 
     # Get category ID if category is specified
     category_id = None
+    keyword_category = ""
     if category_norm:
         try:
             categories = list_categories_func()
@@ -1989,116 +2140,70 @@ def list_blanes_by_location_and_category(
                             break
 
                 if not category_id:
-                    available_categories = list(categories.values())
-                    return f"❌ Category '{category}' not found. Available categories: {', '.join(available_categories)}"
+                    # No API category by that name ("spa", "resto"): filter
+                    # on the category's keywords in the blanes' text instead.
+                    keyword_category = category_norm
         except Exception as e:
             return f"❌ Error fetching categories: {str(e)}"
 
-    try:
-        all_blanes = []
-
-        # Use category-specific endpoint if category is specified
-        if category_id:
-            # Calculate pagination for API call
-            api_page = ((start - 1) // 100) + 1
-
-            params = {
-                "paginationSize": 100,
-                "page": api_page,
-                "sort_order": "asc",
-                "category_id": category_id,
-            }
-
-            response = httpx.get(
-                f"{BASEURLBACK}/getBlanesByCategory", headers=headers, params=params
-            )
-            response.raise_for_status()
-            category_blanes = response.json().get("data", [])
-
-            # If we need more results, fetch additional pages
-            total_needed = start + offset - 1
-            current_page = api_page
-            while len(category_blanes) < total_needed:
-                current_page += 1
-                params["page"] = current_page
-                response = httpx.get(
-                    f"{BASEURLBACK}/getBlanesByCategory", headers=headers, params=params
-                )
-                response.raise_for_status()
-                next_batch = response.json().get("data", [])
-                if not next_batch:  # No more results
-                    break
-                category_blanes.extend(next_batch)
-
-            all_blanes = category_blanes
-        else:
-            # Use general endpoint for non-category searches
-            params = {
-                "status": "active",
-                "sort_by": "created_at",
-                "sort_order": "desc",
-                "pagination_size": 500,
-            }
-            response = httpx.get(
-                f"{BASEURLBACK}/blanes", headers=headers, params=params
-            )
-            response.raise_for_status()
-            all_blanes = response.json().get("data", [])
-
-    except Exception as e:
-        return f"❌ Error fetching blanes: {str(e)}"
-
-    # Debug output (remove in production)
-    for blane in all_blanes[:5]:  # Just show first 5 for debugging
-        print(f"Debug - Blane ID: {blane.get('id')}")
+    if not catalog.ensure_loaded():
+        return "❌ Error fetching blanes. Please try again later."
 
-    # Get all sub-districts for the specified district
-    district_subs = []
-    if district_norm:
-        district_subs = [
-            _normalize_location_text(sub) for sub in district_map.get(district_norm, [])
+    # Category and city are answered by the catalog indexes
+    if category_id:
+        all_blanes = catalog.filter(
+            category_id=category_id, city=city_norm, descending=False
+        )
+    else:
+        all_blanes = catalog.filter(city=city_norm)
+        if keyword_category:
+            all_blanes = [
+                b for b in all_blanes if _matches_category(b, keyword_category)
+            ]
+            if not all_blanes:
+                available_categories = list(categories.values())
+                return f"❌ Category '{category}' not found. Available categories: {', '.join(available_categories)}"
+
+    # Location filter: the location index already knows which sub-districts
+    # each blane mentions. Sub-districts outside district_map are looked up
+    # in the remaining blanes' text.
+    matched_blanes = [(0, blane) for blane in all_blanes]
+    if sub_district_norm or district_norm:
+        sub_ids = set()
+        if sub_district_norm:
+            sub_key = location_index.resolve_sub_district(sub_district_norm)
+            if sub_key:
+                sub_ids = location_index.blanes_in_sub_district(sub_key)
+            else:
+                pattern = single_keyword_matcher(sub_district_norm)
+                sub_ids = {
+                    blane["id"]
+                    for blane in all_blanes
+                    if pattern.matches(
+                        normalize_location_text(
+                            f"{blane.get('name', '')} {blane.get('description') or ''}"
+                        ),
+                        sub_district_norm,
+                        folded=True,
+                    )
+                }
+
+        district_ids = set()
+        district_key = location_index.resolve_district(district_norm)
+        if district_key:
+            district_ids = location_index.blanes_in_district(district_key)
+
+        # Catalog entries are shared, so the score is kept next to the blane
+        # instead of on it.
+        matched_blanes = [
+            (3 if blane["id"] in sub_ids else 1, blane)
+            for blane in all_blanes
+            if blane["id"] in sub_ids or blane["id"] in district_ids
         ]
 
-    # Filter blanes based on location criteria (category already filtered by API)
-    matched_blanes = []
-
-    for blane in all_blanes:
-        name = blane.get("name", "")
-        description = blane.get("description") or ""
-        blane_city = _normalize_location_text(blane.get("city", ""))
-
-        # Create searchable text
-        searchable_text = _normalize_location_text(f"{name} {description}")
-
-        # Apply city filter
-        passes_city_filter = not city_norm or city_norm in blane_city
-
-        # Apply location filter (district/sub-district)
-        passes_location_filter = True
-        location_score = 0
-
-        if sub_district_norm or district_norm:
-            passes_location_filter = False
-
-            # Check for sub-district match (highest priority)
-            if sub_district_norm and sub_district_norm in searchable_text:
-                passes_location_filter = True
-                location_score = 3
-            # Check for other sub-districts in the same district (medium priority)
-            elif district_norm:
-                for sub in district_subs:
-                    if sub and sub in searchable_text:
-                        passes_location_filter = True
-                        location_score = 2 if sub == sub_district_norm else 1
-                        break
-
-        # Include blanes that pass all remaining filters
-        if passes_city_filter and passes_location_filter:
-            blane["_location_score"] = location_score
-            matched_blanes.append(blane)
-
     # Sort by location score (prioritize exact sub-district matches)
-    matched_blanes.sort(key=lambda x: x.get("_location_score", 0), reverse=True)
+    matched_blanes.sort(key=lambda x: x[0], reverse=True)
+    matched_blanes = [blane for _, blane in matched_blanes]
 
     total_matches = len(matched_blanes)
 
@@ -2118,17 +2223,10 @@ def list_blanes_by_location_and_category(
         )
         return f"❌ No blanes found for {filters_text}. Try different search criteria."
 
-    # Apply pagination
-    end_pos = min(start + offset - 1, total_matches)
     if start > total_matches:
         return f"❌ Start position {start} exceeds total results ({total_matches}). Try a lower start position."
 
-    paginated_blanes = matched_blanes[start - 1 : end_pos]
-
-    # Build output
-    output_lines = ["Here are some options:"]
-
-    # Add filter summary
+    # Filter summary
     active_filters = []
     if city_norm:
         active_filters.append(f"City: {city}")
@@ -2138,39 +2236,25 @@ def list_blanes_by_location_and_category(
         active_filters.append(f"Sub-district: {sub_district}")
     if category_norm:
         active_filters.append(f"Category: {category}")
-
     filter_summary = " | ".join(active_filters) if active_filters else "All locations"
-    output_lines.append(f"📋 Filtered Results: {filter_summary}")
-    output_lines.append(
-        f"📊 Showing items {start}-{end_pos} of {total_matches} matches"
-    )
-    output_lines.append("")
 
-    # Add blanes
-    for idx, blane in enumerate(paginated_blanes, start=start):
-        name = blane.get("name", "Unknown")
-        price = blane.get("price_current")
-        blane_id = blane.get("id")
-
-        if price:
-            output_lines.append(f"{idx}. {name} — {price} Dhs (blane_id: {blane_id})")
-        else:
-            output_lines.append(f"{idx}. {name} (blane_id: {blane_id})")
-
-    # Add pagination info
-    output_lines.append("")
-    if end_pos < total_matches:
-        next_start = end_pos + 1
-        max_next_end = min(next_start + offset - 1, total_matches)
-        output_lines.append(
-            f"💡 More results available (Items {next_start}-{max_next_end})"
-        )
-        # output_lines.append("Buttons: [Show more] [See details] [Change filters]")
-    else:
-        output_lines.append("That's all for these filters.")
-        output_lines.append("Want to try different search criteria or see details?")
-
-    return "\n".join(output_lines)
+    # Later pages are sliced from this cursor instead of filtering again
+    filters = (
+        "location",
+        category_id,
+        fold(city_norm),
+        district_norm,
+        sub_district_norm,
+    )
+    listing = listing_cursors.open(
+        session_id,
+        filters,
+        [blane["id"] for blane in matched_blanes],
+        summary=filter_summary,
+        page_size=offset,
+    )
+    first, page_ids = listing_cursors.page(listing, start)
+    return _format_listing_page(listing, first, page_ids)
 
 
 @tool("find_blanes_by_name_or_link")
@@ -2212,68 +2296,18 @@ def find_blanes_by_name_or_link(
     if not user_text:
         return "❌ Please provide a valid blane name or link."
 
-    token = get_token()
-    if not token:
-        return "❌ Failed to retrieve token. Please try again later."
-
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-    # Fetch all active blanes with pagination
-    collected = []
-    page = 1
-    try:
-        while True:
-            params = {
-                "status": "active",
-                "sort_by": "created_at",
-                "sort_order": "desc",
-                "per_page": 100,
-                "page": page,
-            }
-            resp = httpx.get(
-                f"{BASEURLBACK}/getBlanesByCategory", headers=headers, params=params
-            )
-            resp.raise_for_status()
-            payload = resp.json()
-            data = payload.get("data", [])
-            meta = payload.get("meta", {})
-            if not data:
-                break
-            collected.extend(data)
-            total = meta.get("total")
-            last_page = meta.get("last_page")
-            if last_page and page >= last_page:
-                break
-            if total and len(collected) >= int(total):
-                break
-            page += 1
-    except httpx.HTTPStatusError as e:
-        return f"❌ HTTP Error {e.response.status_code}: {e.response.text}"
-    except Exception as e:
-        return f"❌ Error fetching blanes: {str(e)}"
-
-    if not collected:
+    if not catalog.ensure_loaded():
+        return "❌ Error fetching blanes. Please try again later."
+    if not len(catalog):
         return "❌ No blanes found."
 
-    # Fuzzy score per blane (compare against name and slug)
-    query_norm = user_text.lower()
-    scored = []
-    for blane in collected:
-        name = (blane.get("name") or "").lower()
-        slug = (blane.get("slug") or "").lower().replace("-", " ").replace("_", " ")
-        s1 = fuzz.WRatio(query_norm, name) if name else 0
-        s2 = fuzz.partial_ratio(query_norm, name) if name else 0
-        s3 = fuzz.WRatio(query_norm, slug) if slug else 0
-        s4 = fuzz.partial_ratio(query_norm, slug) if slug else 0
-        score = max(s1, s2, s3, s4)
-        if score >= score_threshold:
-            scored.append((score, blane))
-
-    if not scored:
-        return f"❌ No similar blanes found for '{user_text}'."
+    # Fuzzy score per blane (max over name and slug), from the name index
+    scored = name_index.search(user_text, limit=limit, score_threshold=score_threshold)
+    top = [catalog.get(blane_id) for blane_id, _ in scored]
+    top = [b for b in top if b]
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top = [b for _, b in scored[: max(1, int(limit))]]
+    if not top:
+        return f"❌ No similar blanes found for '{user_text}'."
 
     lines = []
     for idx, blane in enumerate(top, start=1):
@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 from typing import Optional
 from datetime import datetime, timezone
 
+from tools.output_budget import cap_list, more_marker, project
+
 load_dotenv()
 BASE_URL = os.getenv("NOCODB_BASE_URL")
 TOKEN = os.getenv("NOCODB_API_TOKEN")
@@ -273,6 +275,24 @@ def authenticate_email(session_id: str, client_email: str) -> str:
     return f"Authenticated {client_email} for session {session_id}"
 
 
+RESERVATION_INFO_FIELDS = [
+    "ID Réservation",
+    "Réservation Statut",
+    "Reservation Type",
+    "jour de booking",
+    "Créneau de début",
+    "Créneau de fin",
+    "Nom du commerce",
+    "Ville du Commerce",
+    "Qté bookée",
+    "Offer",
+    "Prix final total TTC",
+    "Prix final Total avec frais de livraison",
+    "Paiement",
+    "Commentaires",
+]
+
+
 @tool("check_reservation_info")
 def check_reservation_info(session_id: str, question: str) -> str:
     """
@@ -297,57 +317,18 @@ def check_reservation_info(session_id: str, question: str) -> str:
     if not reservations:
         return f"No reservations found for {client_email}."
 
+    # Newest first, at most TOOL_LIST_MAX_ITEMS, and only the columns that
+    # answer reservation questions (not the WhatsApp/message bookkeeping).
+    reservations = sorted(
+        reservations, key=lambda r: str(r.get("CreatedAt") or ""), reverse=True
+    )
+    reservations, more = cap_list(reservations)
     lines = []
     for r in reservations:
-        fields = {
-            "ID Réservation": "ID Réservation",
-            "Réservation Statut": "Réservation Statut",
-            "Pret?": "Pret?",
-            "Reservation Type": "Reservation Type",
-            "jour de booking": "jour de booking",
-            "Créneau de début": "Créneau de début",
-            "Créneau de fin": "Créneau de fin",
-            "Nom Client": "Nom Client",
-            "Tel Whatsapp Client": "Tel Whatsapp Client",
-            "Client Conf MSG 1 Time": "Client Conf MSG 1 Time",
-            "MSG 1": "MSG 1",
-            "Client Conf MSG 2 Time": "Client Conf MSG 2 Time",
-            "MSG 2": "MSG 2",
-            "MSG 3": "MSG 3",
-            "Retailer Conf MSG 1 Time": "Retailer Conf MSG 1 Time",
-            "C MSG 1": "C MSG 1",
-            "Retailer Conf MSG 2 Time": "Retailer Conf MSG 2 Time",
-            "C MSG 2": "C MSG 2",
-            "C MSG 3": "C MSG 3",
-            "Retailer WA Convo ID": "Retailer WA Convo ID",
-            "WA Convo ID": "WA Convo ID",
-            "Rappel Client et Retailer": "Rappel Client et Retailer",
-            "Google Reviews MSG": "Google Reviews MSG",
-            "Google Reviews Rating": "Google Reviews Rating",
-            "Nom du commerce": "Nom du commerce",
-            "Tel Whatsapp du commerce": "Tel Whatsapp du commerce",
-            "Qté bookée": "Qté bookée",
-            "Prix final total TTC": "Prix final total TTC",
-            "Commentaires": "Commentaires",
-            "Offer": "Offer",
-            "Paiement": "Paiement",
-            "Email Client": "Email Client",
-            "Prix final Total avec frais de livraison": "Prix final Total avec frais de livraison",
-            "Ville du Commerce": "Ville du Commerce",
-            "Ville du client": "Ville du client",
-        }
-
-        line_parts = []
-        for key, label in fields.items():
-            value = r.get(key)
-            if value is not None and value != "":
-                line_parts.append(f"{label}: {value}")
-
-        line = " | ".join(line_parts)
-
-        lines.append(line)
-
-        # lines.append(f"ID: {r.get('Reservation ID')} | Date: {r.get('Booking Day') or r.get('jour de booking')} | Status: {r.get('Reservation Status')}")
+        fields = project(r, RESERVATION_INFO_FIELDS)
+        lines.append(" | ".join(f"{label}: {value}" for label, value in fields.items()))
+    if more:
+        lines.append(more_marker(more))
     return "\n".join(lines)
 
     # # Normalize question
@@ -0,0 +1,315 @@
+import os
+import threading
+import time
+from collections import defaultdict
+
+from tools.http_client import api_get
+from tools.text_normalize import fold
+
+BASEURLBACK = "https://api.dabablane.com/api/back/v1"
+CATALOG_URL = f"{BASEURLBACK}/getBlanesByCategory"
+
+PAGE_SIZE = 100
+MAX_PAGES = 1000  # Safety limit
+
+# Seconds between incremental refreshes, and how many incremental refreshes
+# run before a full reload (the only way to notice deleted blanes).
+REFRESH_INTERVAL = int(os.getenv("CATALOG_REFRESH_INTERVAL", 300))
+FULL_RELOAD_EVERY = int(os.getenv("CATALOG_FULL_RELOAD_EVERY", 12))
+
+# Only the fields the listing/search tools read are kept in memory. Full blane
+# details still come from /blanes/{id}.
+CATALOG_FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "description",
+    "city",
+    "category_id",
+    "category",
+    "type",
+    "type_time",
+    "price_current",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+
+def _compact(blane: dict) -> dict:
+    compact = {field: blane.get(field) for field in CATALOG_FIELDS}
+    # Name + description folded once here, for the keyword filters
+    # (tools/keywords.py) that run over every blane of a listing.
+    compact["search_text"] = fold(
+        f"{compact.get('name') or ''} {compact.get('description') or ''}"
+    )
+    return compact
+
+
+def _normalize_key(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def _index_into(by_id, by_slug, by_category, by_city, blane: dict):
+    blane_id = blane["id"]
+    by_id[blane_id] = blane
+    if blane.get("slug"):
+        by_slug[_normalize_key(blane["slug"])] = blane_id
+    by_category[blane.get("category_id")].add(blane_id)
+    by_city[_normalize_key(blane.get("city"))].add(blane_id)
+
+
+class BlaneCatalog:
+    """
+    In-memory index of all active blanes.
+
+    Loads the whole catalog once, then keeps it current by re-fetching only the
+    pages sorted by `updated_at` that changed since the last refresh. Blanes are
+    indexed by id, slug, category_id and city so the tools can answer listings
+    and searches locally instead of paging the API on every call.
+    """
+
+    def __init__(self, refresh_interval: int = REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.by_id = {}
+        self.by_slug = {}
+        self.by_category = defaultdict(set)
+        self.by_city = defaultdict(set)
+        self.version = 0
+        self.loaded_at = None
+        self._watermark = None  # Highest `updated_at` seen so far
+        self._refreshes_since_full = 0
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()  # One first load at a time
+        self._stop = threading.Event()
+        self._refresher = None
+
+    # ----- Fetching -----
+
+    def _fetch_page(self, page: int, sort_by: str, status="active") -> tuple:
+        params = {
+            "sort_by": sort_by,
+            "sort_order": "desc",
+            "per_page": PAGE_SIZE,
+            "page": page,
+        }
+        if status:
+            params["status"] = status
+        response = api_get(CATALOG_URL, params=params)
+        response.raise_for_status()
+        payload = response.json()
+        return payload.get("data", []), payload.get("meta", {})
+
+    def _fetch_all(self) -> list:
+        collected = []
+        page = 1
+        while page <= MAX_PAGES:
+            data, meta = self._fetch_page(page, "created_at")
+            if not data:
+                break
+            collected.extend(data)
+            last_page = meta.get("last_page")
+            total = meta.get("total")
+            if last_page and page >= int(last_page):
+                break
+            if total and len(collected) >= int(total):
+                break
+            page += 1
+        return collected
+
+    def _fetch_changed(self) -> list:
+        """
+        Pages through blanes by `updated_at` desc (any status, so blanes that
+        were deactivated are seen too) and stops at the first blane older than
+        the watermark. Blanes stamped exactly at the watermark are fetched
+        again: another one may have been edited in the same second after the
+        last refresh. Each blane appears once, at its newest position.
+        """
+        changed = {}
+        page = 1
+        while page <= MAX_PAGES:
+            data, meta = self._fetch_page(page, "updated_at", status=None)
+            if not data:
+                break
+            for blane in data:
+                if (blane.get("updated_at") or "") < self._watermark:
+                    return list(changed.values())
+                changed.setdefault(blane.get("id"), blane)
+            last_page = meta.get("last_page")
+            if last_page and page >= int(last_page):
+                break
+            page += 1
+        return list(changed.values())
+
+    # ----- Index maintenance -----
+
+    def _index(self, blane: dict):
+        _index_into(self.by_id, self.by_slug, self.by_category, self.by_city, blane)
+
+    def _unindex(self, blane_id):
+        blane = self.by_id.pop(blane_id, None)
+        if not blane:
+            return
+        self.by_slug.pop(_normalize_key(blane.get("slug")), None)
+        self.by_category[blane.get("category_id")].discard(blane_id)
+        self.by_city[_normalize_key(blane.get("city"))].discard(blane_id)
+
+    def _advance_watermark(self, blanes):
+        stamps = [b.get("updated_at") for b in blanes if b.get("updated_at")]
+        if stamps:
+            self._watermark = max([self._watermark or ""] + stamps)
+
+    def load(self):
+        """
+        Full (re)load of all active blanes. The fetch and the new indexes are
+        built without the lock; readers see the old catalog until the swap.
+        """
+        blanes = [_compact(b) for b in self._fetch_all() if b.get("id") is not None]
+        indexes = ({}, {}, defaultdict(set), defaultdict(set))
+        for blane in blanes:
+            _index_into(*indexes, blane)
+        with self._lock:
+            self.by_id, self.by_slug, self.by_category, self.by_city = indexes
+            self._watermark = None
+            self._advance_watermark(blanes)
+            self._refreshes_since_full = 0
+            self.loaded_at = time.time()
+            self.version += 1
+        print(f"📚 Blane catalog loaded: {len(blanes)} active blanes")
+        self._notify(changed_ids=None)
+
+    def refresh(self):
+        """
+        Incremental refresh: applies only blanes updated since the watermark.
+        Falls back to a full load every FULL_RELOAD_EVERY refreshes.
+        """
+        if self._watermark is None or self._refreshes_since_full >= FULL_RELOAD_EVERY:
+            self.load()
+            return
+
+        fetched = [
+            _compact(b) for b in self._fetch_changed() if b.get("id") is not None
+        ]
+        with self._lock:
+            self._refreshes_since_full += 1
+            # The blanes at the watermark come back every time; only apply
+            # what actually differs from the index.
+            changed = [
+                b
+                for b in fetched
+                if self.by_id.get(b["id"]) != b
+                and (b.get("status") == "active" or b["id"] in self.by_id)
+            ]
+            if not changed:
+                return
+            for blane in changed:
+                self._unindex(blane["id"])
+                if blane.get("status") == "active":
+                    self._index(blane)
+            self._advance_watermark(changed)
+            self.version += 1
+        print(f"🔄 Blane catalog refreshed: {len(changed)} changed blanes")
+        self._notify(changed_ids={b["id"] for b in changed})
+
+    def ensure_loaded(self) -> bool:
+        """
+        Loads the catalog synchronously if it hasn't been loaded yet. Callers
+        racing the first load wait for it on a separate lock, so the catalog
+        lock is never held across the network fetch.
+        """
+        if self.loaded_at is None:
+            with self._load_lock:
+                if self.loaded_at is None:
+                    try:
+                        self.load()
+                    except Exception as e:
+                        print(f"❌ Error loading blane catalog: {e}")
+        return self.loaded_at is not None
+
+    # ----- Change listeners -----
+
+    def add_listener(self, callback):
+        """
+        Registers `callback(catalog, changed_ids)`, called after every load
+        (changed_ids=None) or incremental refresh (set of changed blane ids).
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, changed_ids):
+        for callback in self._listeners:
+            try:
+                callback(self, changed_ids)
+            except Exception as e:
+                print(f"❌ Catalog listener {callback.__name__} failed: {e}")
+
+    # ----- Background refresh -----
+
+    def start(self):
+        """
+        Starts the background thread that loads the catalog and then refreshes
+        it periodically. Tools that run before the first load finishes block in
+        `ensure_loaded()` until it is ready.
+        """
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="blane-catalog-refresh", daemon=True
+        )
+        self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        self.ensure_loaded()
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ Error refreshing blane catalog: {e}")
+
+    # ----- Queries -----
+
+    def get(self, blane_id):
+        return self.by_id.get(blane_id)
+
+    def get_by_slug(self, slug: str):
+        blane_id = self.by_slug.get(_normalize_key(slug))
+        return self.by_id.get(blane_id) if blane_id is not None else None
+
+    def all(self, sort_by: str = "created_at", descending: bool = True) -> list:
+        with self._lock:
+            blanes = list(self.by_id.values())
+        blanes.sort(key=lambda b: (b.get(sort_by) or "", b["id"]), reverse=descending)
+        return blanes
+
+    def filter(
+        self, category_id=None, city: str = "", sort_by="created_at", descending=True
+    ) -> list:
+        """Blanes matching a category id and/or city, via set intersection."""
+        with self._lock:
+            ids = None
+            if category_id is not None:
+                ids = set(self.by_category.get(category_id, ()))
+            if city:
+                # Accent-insensitive substring match on the city key, so
+                # "casa" finds "casablanca" and "fes" finds "fès".
+                wanted = fold(_normalize_key(city))
+                city_ids = set()
+                for key, members in self.by_city.items():
+                    if wanted in fold(key):
+                        city_ids |= members
+                ids = city_ids if ids is None else ids & city_ids
+            if ids is None:
+                ids = self.by_id.keys()
+            blanes = [self.by_id[i] for i in ids if i in self.by_id]
+        blanes.sort(key=lambda b: (b.get(sort_by) or "", b["id"]), reverse=descending)
+        return blanes
+
+    def __len__(self):
+        return len(self.by_id)
+
+
+catalog = BlaneCatalog()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+# How long a listing can be paged through after the search that produced it,
+# and how many listings are kept across all sessions.
+LISTING_CURSOR_TTL = int(os.getenv("LISTING_CURSOR_TTL", 1800))
+LISTING_CURSOR_MAX = int(os.getenv("LISTING_CURSOR_MAX", 5000))
+
+# Keys the token hash, so tokens can't be derived from a session id.
+_TOKEN_KEY = secrets.token_bytes(16)
+
+
+@dataclass
+class ListingCursor:
+    """The filtered, sorted blane ids of one listing, and how far it was read."""
+
+    token: str
+    session_id: str
+    filters: tuple
+    ids: list
+    summary: str = ""
+    position: int = 0  # Index of the next blane to show
+    page_size: int = 10
+    touched_at: float = field(default_factory=time.monotonic)
+
+
+def cursor_token(session_id: str, filters: tuple) -> str:
+    """
+    Opaque token for a session's listing with these filters. Without a
+    session id a random nonce is mixed in, so sessionless listings never
+    share a cursor.
+    """
+    nonce = "" if session_id else secrets.token_hex(8)
+    key = repr((session_id or "", filters, nonce)).encode()
+    return hashlib.blake2b(key, key=_TOKEN_KEY, digest_size=8).hexdigest()
+
+
+class ListingCursorStore:
+    """
+    TTL + LRU store of listing cursors.
+
+    The first page of a listing stores its result ids under a token derived
+    from the session and the filter tuple; "show more" then only slices that
+    list instead of filtering and sorting the catalog again. Running the same
+    search again in the same session replaces the cursor with fresh results.
+    A cursor is only handed back to the session that opened it.
+    """
+
+    def __init__(
+        self, ttl: int = LISTING_CURSOR_TTL, max_size: int = LISTING_CURSOR_MAX
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cursors = OrderedDict()
+        self._latest = {}  # session_id -> token of its last listing
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.pages = 0
+        self.expired = 0
+        self.rejected = 0
+
+    def open(
+        self,
+        session_id: str,
+        filters: tuple,
+        ids: list,
+        summary: str = "",
+        page_size: int = 10,
+    ) -> ListingCursor:
+        session_id = session_id or ""
+        token = cursor_token(session_id, filters)
+        cursor = ListingCursor(
+            token, session_id, filters, list(ids), summary, page_size=page_size
+        )
+        with self._lock:
+            self._cursors[token] = cursor
+            self._cursors.move_to_end(token)
+            if session_id:
+                self._latest[session_id] = token
+            while len(self._cursors) > self.max_size:
+                _, evicted = self._cursors.popitem(last=False)
+                if self._latest.get(evicted.session_id) == evicted.token:
+                    del self._latest[evicted.session_id]
+            self.opened += 1
+        return cursor
+
+    def get(self, token: str, session_id: str):
+        """
+        The live cursor for `token`, or None if unknown, expired or opened by
+        another session.
+        """
+        with self._lock:
+            cursor = self._cursors.get((token or "").strip())
+            if cursor is None:
+                return None
+            if cursor.session_id != (session_id or ""):
+                self.rejected += 1
+                return None
+            if time.monotonic() - cursor.touched_at > self.ttl:
+                del self._cursors[cursor.token]
+                if self._latest.get(cursor.session_id) == cursor.token:
+                    del self._latest[cursor.session_id]
+                self.expired += 1
+                return None
+            cursor.touched_at = time.monotonic()
+            self._cursors.move_to_end(cursor.token)
+            return cursor
+
+    def latest(self, session_id: str):
+        """The live cursor of the session's most recent listing, if any."""
+        with self._lock:
+            token = self._latest.get(session_id) if session_id else None
+        return self.get(token, session_id) if token else None
+
+    def page(self, cursor: ListingCursor, start: int = None, size: int = None):
+        """
+        Returns (1-based start, ids) for the next page, or from `start` if
+        given, and moves the cursor past it.
+        """
+        size = size or cursor.page_size
+        with self._lock:
+            begin = cursor.position if start is None else max(start - 1, 0)
+            ids = cursor.ids[begin : begin + size]
+            cursor.position = begin + len(ids)
+            cursor.page_size = size
+            if cursor.session_id:
+                self._latest[cursor.session_id] = cursor.token
+            self.pages += 1
+        return begin + 1, ids
+
+    def stats(self) -> dict:
+        return {
+            "open": len(self._cursors),
+            "opened": self.opened,
+            "pages": self.pages,
+            "expired": self.expired,
+            "rejected": self.rejected,
+        }
+
+
+listing_cursors = ListingCursorStore()
@@ -0,0 +1,193 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import httpx
+
+from tools.token_manager import LoginError, token_manager
+
+# HTTP/2 needs the optional `h2` package (pip install "httpx[http2]").
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+LIMITS = httpx.Limits(
+    max_connections=50,
+    max_keepalive_connections=20,
+    keepalive_expiry=60.0,
+)
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+# Per-endpoint timeouts, matched on the URL path. Catalog pages are large and
+# booking/payment calls are slow on the API side, so they get more headroom.
+ENDPOINT_TIMEOUTS = [
+    ("/login", httpx.Timeout(10.0, connect=5.0)),
+    ("/getBlanesByCategory", httpx.Timeout(30.0, connect=5.0)),
+    ("/available-time-slots", httpx.Timeout(15.0, connect=5.0)),
+    ("/payment/", httpx.Timeout(30.0, connect=5.0)),
+    ("/reservations", httpx.Timeout(30.0, connect=5.0)),
+    ("/orders", httpx.Timeout(30.0, connect=5.0)),
+]
+
+# Requests fanned out together (run_concurrently) share this deadline, in
+# seconds, on top of their own per-request timeouts.
+FANOUT_TIMEOUT = float(os.getenv("API_FANOUT_TIMEOUT", 30))
+FANOUT_WORKERS = 16
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_fanout_executor = ThreadPoolExecutor(
+    max_workers=FANOUT_WORKERS, thread_name_prefix="api-fanout"
+)
+
+
+def timeout_for(url: str) -> httpx.Timeout:
+    path = httpx.URL(url).path
+    for marker, timeout in ENDPOINT_TIMEOUTS:
+        if marker in path:
+            return timeout
+    return DEFAULT_TIMEOUT
+
+
+def get_client() -> httpx.Client:
+    """
+    Returns the process-wide sync client. Connections to api.dabablane.com are
+    kept alive and reused across tool calls instead of a new TCP+TLS handshake
+    per request. httpx.Client is thread-safe, so agent threads share it.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    limits=LIMITS, timeout=DEFAULT_TIMEOUT, http2=HTTP2_AVAILABLE
+                )
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the async client bound to the running event loop (one per loop,
+    since an AsyncClient's connections can't be shared across loops).
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=LIMITS, timeout=DEFAULT_TIMEOUT, http2=HTTP2_AVAILABLE
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def close_clients():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def aclose_clients():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _auth_headers(token) -> dict:
+    if not token:
+        # Without a token the request can only get a 401: don't send it.
+        raise LoginError("Dabablane login failed, request not sent")
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+
+def api_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Sends an authenticated request to the Dabablane API over the shared client.
+    On a 401 the cached token is dropped and the request is retried once with
+    a fresh login.
+    """
+    kwargs.setdefault("timeout", timeout_for(url))
+    client = get_client()
+    token = token_manager.get_token()
+    response = client.request(method, url, headers=_auth_headers(token), **kwargs)
+    if response.status_code == 401:
+        token_manager.invalidate(token)
+        token = token_manager.get_token()
+        response = client.request(method, url, headers=_auth_headers(token), **kwargs)
+    return response
+
+
+def api_get(url: str, **kwargs) -> httpx.Response:
+    return api_request("GET", url, **kwargs)
+
+
+def api_post(url: str, **kwargs) -> httpx.Response:
+    return api_request("POST", url, **kwargs)
+
+
+async def aapi_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Async counterpart of `api_request`."""
+    kwargs.setdefault("timeout", timeout_for(url))
+    client = get_async_client()
+    token = token_manager.cached_token() or await asyncio.to_thread(
+        token_manager.get_token
+    )
+    response = await client.request(method, url, headers=_auth_headers(token), **kwargs)
+    if response.status_code == 401:
+        token_manager.invalidate(token)
+        token = await asyncio.to_thread(token_manager.get_token)
+        response = await client.request(
+            method, url, headers=_auth_headers(token), **kwargs
+        )
+    return response
+
+
+async def aapi_get(url: str, **kwargs) -> httpx.Response:
+    return await aapi_request("GET", url, **kwargs)
+
+
+async def aapi_post(url: str, **kwargs) -> httpx.Response:
+    return await aapi_request("POST", url, **kwargs)
+
+
+def run_concurrently(*calls, timeout: float = FANOUT_TIMEOUT) -> list:
+    """
+    Runs independent zero-argument calls (typically `api_get`s) at the same
+    time on the shared client and returns their results in order. A call that
+    raised, or was still running at the shared deadline, has its exception
+    (TimeoutError) in its slot instead, so callers can use partial results.
+    Calls must not fan out themselves.
+    """
+    futures = [_fanout_executor.submit(call) for call in calls]
+    done, _ = wait(futures, timeout=timeout)
+    results = []
+    for future in futures:
+        if future not in done:
+            future.cancel()
+            results.append(TimeoutError(f"no response within {timeout:g} s"))
+        elif future.exception() is not None:
+            results.append(future.exception())
+        else:
+            results.append(future.result())
+    return results
+
+
+async def arun_concurrently(*awaitables, timeout: float = FANOUT_TIMEOUT) -> list:
+    """Async counterpart of `run_concurrently`, for coroutines."""
+    tasks = [asyncio.ensure_future(a) for a in awaitables]
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append(TimeoutError(f"no response within {timeout:g} s"))
+        elif task.exception() is not None:
+            results.append(task.exception())
+        else:
+            results.append(task.result())
+    return results
@@ -0,0 +1,115 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+from tools.text_normalize import fold
+
+# Plural/inflection endings accepted after a keyword ("pizza" -> "pizzas").
+# A keyword ending in "*" matches any word starting with it ("relax*").
+_SUFFIX = r"(?:s|x|es)?"
+_PREFIX_SUFFIX = r"\w*"
+
+
+def _trie_regex(words: list) -> str:
+    """
+    Regex alternation shaped as a trie ("spa|spaghetti|sport" becomes
+    "sp(?:a(?:ghetti)?|ort)"), so the engine never re-tries a shared prefix.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        ends = "" in node
+        branches = [re.escape(c) + build(child) for c, child in node.items() if c]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends:
+            return branches[0]
+        body = "(?:" + "|".join(sorted(branches, key=len, reverse=True)) + ")"
+        return body + "?" if ends else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Keyword tables compiled once into a single accent-insensitive regex.
+
+    `tables` maps a label to its keywords. Keywords match whole words (with
+    plural endings), so "hi" no longer fires on "this" or "chef" on "chefchaouen".
+    `scan()` finds the keywords of every label in one pass over the text;
+    `matches()` checks one label and stops at the first hit.
+    """
+
+    def __init__(self, tables: dict):
+        self._labels_of = {}  # folded keyword -> labels
+        self._prefixes = {}  # folded prefix keyword -> labels
+        self._label_patterns = {}
+        for label, keywords in tables.items():
+            words, prefixes = [], []
+            for keyword in keywords:
+                is_prefix = keyword.endswith("*")
+                folded = " ".join(fold(keyword.rstrip("*")).split())
+                (prefixes if is_prefix else words).append(folded)
+                target = self._prefixes if is_prefix else self._labels_of
+                target.setdefault(folded, set()).add(label)
+            self._label_patterns[label] = self._compile(words, prefixes)
+        self._pattern = self._compile(list(self._labels_of), list(self._prefixes))
+
+    @staticmethod
+    def _compile(words: list, prefixes: list):
+        parts = []
+        if words:
+            parts.append(_trie_regex(words) + _SUFFIX)
+        if prefixes:
+            parts.append(_trie_regex(prefixes) + _PREFIX_SUFFIX)
+        if not parts:
+            return None
+        # Multi-word keywords match across any run of whitespace.
+        body = "|".join(parts).replace(r"\ ", r"\s+")
+        return re.compile(rf"\b(?:{body})\b")
+
+    def _lookup(self, matched: str) -> set:
+        matched = " ".join(matched.split())
+        for end in ("", "s", "x", "es"):
+            if end and not matched.endswith(end):
+                continue
+            labels = self._labels_of.get(matched[: len(matched) - len(end)])
+            if labels:
+                return labels
+        for prefix, labels in self._prefixes.items():
+            if matched.startswith(prefix):
+                return labels
+        return set()
+
+    def scan(self, text: str, folded: bool = False) -> Counter:
+        """Number of distinct keywords found per label, in one pass."""
+        if self._pattern is None:
+            return Counter()
+        if not folded:
+            text = fold(text)
+        counts = Counter()
+        for matched in set(self._pattern.findall(text)):
+            for label in self._lookup(matched):
+                counts[label] += 1
+        return counts
+
+    def pattern(self, label):
+        """Compiled regex for one label's keywords (None if it has none)."""
+        return self._label_patterns.get(label)
+
+    def matches(self, text: str, label, folded: bool = False) -> bool:
+        pattern = self._label_patterns.get(label)
+        if pattern is None:
+            return False
+        return pattern.search(text if folded else fold(text)) is not None
+
+
+@lru_cache(maxsize=256)
+def single_keyword_matcher(keyword: str) -> KeywordMatcher:
+    """Matcher for a free-form term, e.g. a category with no keyword table."""
+    return KeywordMatcher({keyword: [keyword]})
@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from collections import defaultdict
+
+from tools.keywords import KeywordMatcher
+from tools.text_normalize import fold
+
+_SEPARATORS_RE = re.compile(r"[-_'’`]+")
+
+
+def normalize_location_text(text) -> str:
+    """
+    Folds accents and treats hyphens/apostrophes as spaces, so "Aïn-Diab",
+    "ain diab" and "AIN DIAB" all read "ain diab".
+    """
+    return " ".join(_SEPARATORS_RE.sub(" ", fold(text)).split())
+
+
+class LocationIndex:
+    """
+    Blane -> districts/sub-districts mentioned in its name or description.
+
+    `district_map` maps each district to its sub-districts and `aliases` maps a
+    sub-district to other spellings of it. Sub-districts are found with one
+    whole-word, accent-insensitive regex pass per blane (so "cil" no longer
+    matches "facile"), when the catalog loads or a blane changes. Filtering a
+    listing by location is then a set lookup.
+    """
+
+    def __init__(self, district_map: dict, aliases: dict = None):
+        self.districts = {}  # normalized district -> normalized sub-districts
+        self._district_of = {}  # normalized district or district part -> district
+        self._sub_of = {}  # normalized spelling -> canonical sub-district
+        tables = defaultdict(list)
+        for district, subs in district_map.items():
+            key = normalize_location_text(district)
+            self.districts[key] = [normalize_location_text(s) for s in subs]
+            self._district_of[key] = key
+            # "aïn sebaâ – hay mohammadi" is also reachable as either half.
+            for part in re.split(r"\s+[–—/]\s+", district):
+                self._district_of.setdefault(normalize_location_text(part), key)
+            for sub in self.districts[key]:
+                tables[sub].append(sub)
+                self._sub_of[sub] = sub
+        for sub, spellings in (aliases or {}).items():
+            sub = normalize_location_text(sub)
+            for spelling in spellings:
+                spelling = normalize_location_text(spelling)
+                tables[sub].append(spelling)
+                self._sub_of.setdefault(spelling, sub)
+
+        self._matcher = KeywordMatcher(tables)
+        self._lock = threading.Lock()
+        self._subs_of = {}  # blane_id -> set of sub-districts
+        self._by_sub = defaultdict(set)
+        self.builds = 0
+        self.last_build_ms = None
+
+    # ----- Building -----
+
+    def _locate(self, blane: dict) -> set:
+        text = f"{blane.get('name') or ''} {blane.get('description') or ''}"
+        return set(self._matcher.scan(normalize_location_text(text), folded=True))
+
+    def _set(self, blane_id, subs: set):
+        for sub in self._subs_of.pop(blane_id, ()):
+            self._by_sub[sub].discard(blane_id)
+        if subs:
+            self._subs_of[blane_id] = subs
+            for sub in subs:
+                self._by_sub[sub].add(blane_id)
+
+    def rebuild(self, blanes: list):
+        started = time.perf_counter()
+        located = [
+            (b["id"], self._locate(b)) for b in blanes if b.get("id") is not None
+        ]
+        with self._lock:
+            self._subs_of = {}
+            self._by_sub = defaultdict(set)
+            for blane_id, subs in located:
+                self._set(blane_id, subs)
+            self.builds += 1
+        self.last_build_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(
+            f"📍 Location index built: {len(self._subs_of)} of {len(located)} blanes "
+            f"located in {self.last_build_ms} ms"
+        )
+
+    def sync_with_catalog(self, source, changed_ids):
+        """Catalog listener: full rebuild on load, per-blane update on refresh."""
+        if changed_ids is None:
+            self.rebuild(source.all())
+            return
+        located = []
+        for blane_id in changed_ids:
+            blane = source.get(blane_id)
+            located.append((blane_id, self._locate(blane) if blane else set()))
+        with self._lock:
+            for blane_id, subs in located:
+                self._set(blane_id, subs)
+
+    # ----- Queries -----
+
+    def resolve_district(self, district: str):
+        """Canonical district key for user input, or None if unknown."""
+        return self._district_of.get(normalize_location_text(district))
+
+    def resolve_sub_district(self, sub_district: str):
+        """Canonical sub-district for user input, or None if not in the map."""
+        return self._sub_of.get(normalize_location_text(sub_district))
+
+    def blanes_in_sub_district(self, sub_district: str) -> set:
+        with self._lock:
+            return set(self._by_sub.get(sub_district, ()))
+
+    def blanes_in_district(self, district: str) -> set:
+        """Blanes mentioning any sub-district of a (canonical) district."""
+        with self._lock:
+            ids = set()
+            for sub in self.districts.get(district, ()):
+                ids |= self._by_sub.get(sub, set())
+            return ids
+
+    def stats(self) -> dict:
+        return {
+            "located_blanes": len(self._subs_of),
+            "sub_districts": sum(1 for ids in self._by_sub.values() if ids),
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+        }
@@ -0,0 +1,208 @@
+import re
+import threading
+import time
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from tools.catalog import catalog
+
+_NON_WORD_RE = re.compile(r"(?ui)\W")
+
+
+def full_process(text: str) -> str:
+    """fuzzywuzzy's `full_process` (force_ascii), applied before WRatio."""
+    text = text.encode("ascii", "ignore").decode()
+    return _NON_WORD_RE.sub(" ", text).lower().strip()
+
+
+def normalize_name(text) -> str:
+    return str(text or "").lower()
+
+
+def normalize_slug(text) -> str:
+    return str(text or "").lower().replace("-", " ").replace("_", " ")
+
+
+def name_score(query: str, name: str, slug: str) -> int:
+    """
+    max(WRatio, partial_ratio) of a normalized query against a blane's
+    normalized name and slug: what `NameIndex` computes in batch.
+    """
+    scores = [0.0]
+    query_processed = full_process(query)
+    for text in (name, slug):
+        if text:
+            scores.append(fuzz.WRatio(query_processed, full_process(text)))
+            scores.append(fuzz.partial_ratio(query, text))
+    return round(max(scores))
+
+
+class NameIndex:
+    """
+    Fuzzy lookup of blanes by name or slug.
+
+    Names and slugs are normalized once when the catalog loads and kept in
+    columns. A query scores every blane with rapidfuzz's batched C scorers
+    (`process.cdist`), instead of four fuzzywuzzy calls per blane in a Python
+    loop, so it returns exactly what a full scan with `name_score` would.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self.builds = 0
+        self.last_build_ms = None
+        self.last_query_ms = None
+
+    def _reset(self):
+        # One row per blane in each column; removals swap the last row in.
+        self._ids = []
+        self._names = []
+        self._slugs = []
+        self._names_processed = []
+        self._slugs_processed = []
+        self._order = []  # Catalog sort key, to break score ties
+        self._row_of = {}
+
+    def _columns(self) -> tuple:
+        return (
+            self._ids,
+            self._names,
+            self._slugs,
+            self._names_processed,
+            self._slugs_processed,
+            self._order,
+        )
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ----- Building -----
+
+    def _set_row(self, row: int, blane: dict):
+        name = normalize_name(blane.get("name"))
+        slug = normalize_slug(blane.get("slug"))
+        values = (
+            blane["id"],
+            name,
+            slug,
+            full_process(name),
+            full_process(slug),
+            (blane.get("created_at") or "", blane["id"]),
+        )
+        for column, value in zip(self._columns(), values):
+            if row == len(column):
+                column.append(value)
+            else:
+                column[row] = value
+        self._row_of[blane["id"]] = row
+
+    def _remove(self, blane_id):
+        row = self._row_of.pop(blane_id, None)
+        if row is None:
+            return
+        last = len(self._ids) - 1
+        if row != last:
+            for column in self._columns():
+                column[row] = column[last]
+            self._row_of[self._ids[row]] = row
+        for column in self._columns():
+            column.pop()
+
+    def rebuild(self, blanes: list):
+        started = time.perf_counter()
+        blanes = [b for b in blanes if b.get("id") is not None]
+        with self._lock:
+            self._reset()
+            for row, blane in enumerate(blanes):
+                self._set_row(row, blane)
+            self.builds += 1
+        self.last_build_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(f"🔤 Name index built: {len(self)} blanes in {self.last_build_ms} ms")
+
+    def upsert(self, blanes: list):
+        with self._lock:
+            for blane in blanes:
+                if blane.get("id") is None:
+                    continue
+                row = self._row_of.get(blane["id"])
+                if row is None:
+                    self._set_row(len(self._ids), blane)
+                else:
+                    self._set_row(row, blane)
+
+    def remove(self, blane_ids):
+        with self._lock:
+            for blane_id in blane_ids:
+                self._remove(blane_id)
+
+    def sync_with_catalog(self, source, changed_ids):
+        """Catalog listener: full rebuild on load, partial on refresh."""
+        if changed_ids is None:
+            self.rebuild(source.all())
+            return
+        current = [source.get(i) for i in changed_ids]
+        self.upsert([b for b in current if b])
+        self.remove([i for i, b in zip(changed_ids, current) if not b])
+
+    # ----- Querying -----
+
+    def search(self, query: str, limit: int = 10, score_threshold: int = 60) -> list:
+        """Returns up to `limit` (blane_id, score) pairs, best first."""
+        if not len(self) and catalog.ensure_loaded() and len(catalog):
+            self.rebuild(catalog.all())
+
+        started = time.perf_counter()
+        query_norm = normalize_name(query)
+        query_processed = full_process(query_norm)
+        with self._lock:
+            ids = list(self._ids)
+            order = list(self._order)
+            batches = [
+                (fuzz.WRatio, query_processed, list(self._names_processed)),
+                (fuzz.partial_ratio, query_norm, list(self._names)),
+                (fuzz.WRatio, query_processed, list(self._slugs_processed)),
+                (fuzz.partial_ratio, query_norm, list(self._slugs)),
+            ]
+        if not ids:
+            return []
+
+        # Pairs below the cutoff score 0, which lets the scorers give up early.
+        cutoff = max(score_threshold - 0.5, 0)
+        scores = np.zeros(len(ids), dtype=np.float32)
+        for scorer, q, texts in batches:
+            if not q:
+                continue
+            result = process.cdist(
+                [q], texts, scorer=scorer, score_cutoff=cutoff, dtype=np.float32
+            )[0]
+            np.maximum(scores, result, out=scores)
+
+        scores = np.rint(scores)
+        matched = np.flatnonzero(scores >= score_threshold)
+        k = min(max(1, int(limit)), len(matched))
+        top = []
+        if k:
+            kth = -np.partition(-scores[matched], k - 1)[k - 1]
+            # Ties keep catalog order (newest first), like the stable sort
+            # over catalog.all() this replaces.
+            top = sorted(
+                matched[scores[matched] >= kth],
+                key=lambda i: (scores[i], order[i]),
+                reverse=True,
+            )[:k]
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return [(ids[i], int(scores[i])) for i in top]
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self),
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+            "last_query_ms": self.last_query_ms,
+        }
+
+
+name_index = NameIndex()
+catalog.add_listener(name_index.sync_with_catalog)
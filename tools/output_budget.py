@@ -0,0 +1,147 @@
+import functools
+import json
+import os
+import threading
+from collections import defaultdict
+
+# Tool outputs go back into the agent scratchpad and are re-sent on every
+# later LLM step of the turn, so they are kept to what the agent needs.
+TOOL_OUTPUT_MAX_TOKENS = int(os.getenv("TOOL_OUTPUT_MAX_TOKENS", 1500))
+TOOL_LIST_MAX_ITEMS = int(os.getenv("TOOL_LIST_MAX_ITEMS", 10))
+TOOL_TEXT_MAX_TOKENS = int(os.getenv("TOOL_TEXT_MAX_TOKENS", 200))
+
+# Token counts are estimated: ~4 characters per token for the French/English
+# text these tools return, without a tokenizer download at startup.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text) -> int:
+    text = text if isinstance(text, str) else _serialize(text)
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_text(text, max_tokens: int = TOOL_TEXT_MAX_TOKENS) -> str:
+    """Cuts `text` to about `max_tokens`, at a word boundary."""
+    text = str(text or "")
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    if space > limit * 0.8:
+        cut = cut[:space]
+    return cut.rstrip() + " […]"
+
+
+def _lookup(record: dict, path: str):
+    value = record
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def project(record: dict, fields) -> dict:
+    """
+    Only the non-empty `fields` of `record`. `fields` is a list of keys or
+    dotted paths ("blane.name"), or a mapping of output key -> path.
+    """
+    if not isinstance(fields, dict):
+        fields = {f: f for f in fields}
+    projected = {}
+    for key, path in fields.items():
+        value = _lookup(record, path)
+        if value is not None and value != "":
+            projected[key] = value
+    return projected
+
+
+def cap_list(items: list, limit: int = TOOL_LIST_MAX_ITEMS) -> tuple:
+    """(first `limit` items, how many more there are)."""
+    items = list(items or [])
+    return items[:limit], max(len(items) - limit, 0)
+
+
+def more_marker(more: int) -> str:
+    return f"… {more} more available" if more else ""
+
+
+def _serialize(output) -> str:
+    if isinstance(output, str):
+        return output
+    try:
+        return json.dumps(output, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return str(output)
+
+
+class ToolOutputBudget:
+    """
+    Caps what each tool returns to the agent at `max_tokens` and counts the
+    tokens every tool produces, before and after the cap.
+
+    The tools themselves project and cap their data (see `project` and
+    `cap_list`); this is the backstop for anything still too long, applied
+    by wrapping the agent's tools with `wrap_all`.
+    """
+
+    def __init__(self, max_tokens: int = TOOL_OUTPUT_MAX_TOKENS):
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._stats = defaultdict(
+            lambda: {"calls": 0, "tokens": 0, "raw_tokens": 0, "max": 0, "cut": 0}
+        )
+
+    def apply(self, tool_name: str, output):
+        raw_tokens = estimate_tokens(output)
+        cut = raw_tokens > self.max_tokens
+        if cut:
+            output = truncate_text(_serialize(output), self.max_tokens)
+            output += "\n(Output shortened. Ask for a narrower result if needed.)"
+        tokens = estimate_tokens(output) if cut else raw_tokens
+        with self._lock:
+            stats = self._stats[tool_name]
+            stats["calls"] += 1
+            stats["tokens"] += tokens
+            stats["raw_tokens"] += raw_tokens
+            stats["max"] = max(stats["max"], tokens)
+            stats["cut"] += cut
+        return output
+
+    def wrap(self, tool):
+        """A copy of a LangChain tool whose outputs go through `apply`."""
+        update = {}
+        if getattr(tool, "func", None):
+            func = tool.func
+
+            @functools.wraps(func)
+            def budgeted(*args, **kwargs):
+                return self.apply(tool.name, func(*args, **kwargs))
+
+            update["func"] = budgeted
+        if getattr(tool, "coroutine", None):
+            coroutine = tool.coroutine
+
+            @functools.wraps(coroutine)
+            async def abudgeted(*args, **kwargs):
+                return self.apply(tool.name, await coroutine(*args, **kwargs))
+
+            update["coroutine"] = abudgeted
+        return tool.model_copy(update=update)
+
+    def wrap_all(self, tools: list) -> list:
+        return [self.wrap(t) for t in tools]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "avg_tokens": round(stats["tokens"] / stats["calls"]),
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+tool_output_budget = ToolOutputBudget()
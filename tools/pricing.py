@@ -0,0 +1,188 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# How long a computed quote is kept for reuse.
+QUOTE_TTL = int(os.getenv("QUOTE_TTL", 600))
+QUOTE_MAX_SIZE = int(os.getenv("QUOTE_MAX_SIZE", 2048))
+
+# The fields of a blane a quote depends on; a change to any of them is a new
+# pricing version.
+PRICING_FIELDS = (
+    "type",
+    "price_current",
+    "is_digital",
+    "city",
+    "livraison_in_city",
+    "livraison_out_city",
+    "online",
+    "partiel",
+    "cash",
+    "partiel_field",
+    "updated_at",
+)
+
+
+def _amount(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _quantity(value) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+@dataclass(frozen=True)
+class Quote:
+    """The price of `quantity` of a blane delivered to `city`, and how it's paid."""
+
+    quote_id: str
+    blane_id: int
+    quantity: int
+    city: str
+    base_price: float
+    delivery_cost: float
+    total_price: float
+    payment_route: str  # "partiel", "online" or "cash"
+    partiel_percent: Optional[float]  # None unless paid partially
+    partiel_price: int  # due online now when payment_route is "partiel"
+
+    @property
+    def payment_label(self) -> str:
+        return {"partiel": "Partial", "online": "Online"}.get(
+            self.payment_route, "Cash"
+        )
+
+    @property
+    def due_later(self) -> float:
+        """What's left to pay after the partial payment."""
+        return self.total_price - self.partiel_price
+
+
+def price(blane: dict, quantity, city: str, quote_id: str = "") -> Quote:
+    """
+    Prices a booking: base price × quantity (at least 1), plus delivery for
+    physical orders (in-city rate if `city` is the blane's city). Payment is
+    partial if the blane supports it, else online, else cash.
+    """
+    quantity = _quantity(quantity)
+    base_price = _amount(blane.get("price_current"))
+    total_price = base_price * quantity
+
+    delivery_cost = 0.0
+    if blane.get("type") == "order" and not blane.get("is_digital"):
+        if blane.get("city") != city:
+            delivery_cost = _amount(blane.get("livraison_out_city"))
+        else:
+            delivery_cost = _amount(blane.get("livraison_in_city"))
+        total_price += delivery_cost
+
+    payment_route = "cash"
+    if blane.get("partiel"):
+        payment_route = "partiel"
+    elif blane.get("online"):
+        payment_route = "online"
+
+    partiel_percent, partiel_price = None, 0
+    if payment_route == "partiel" and blane.get("partiel_field"):
+        partiel_percent = _amount(blane.get("partiel_field"))
+        partiel_price = round((partiel_percent / 100) * total_price)
+
+    return Quote(
+        quote_id=quote_id,
+        blane_id=blane.get("id"),
+        quantity=quantity,
+        city=city,
+        base_price=base_price,
+        delivery_cost=delivery_cost,
+        total_price=total_price,
+        payment_route=payment_route,
+        partiel_percent=partiel_percent,
+        partiel_price=partiel_price,
+    )
+
+
+class QuoteBook:
+    """
+    Memoized quotes per (blane pricing version, quantity, city), by id.
+
+    The quote id is a hash of the blane id, quantity, city and the blane's
+    `PRICING_FIELDS`. preview_reservation shows it with the recap;
+    create_reservation refetches the blane and `redeem`s the id against the
+    fresh blane and its own quantity and city, so a booking is only made at
+    the previewed price if nothing it depends on has changed since.
+    """
+
+    def __init__(self, ttl: int = QUOTE_TTL, max_size: int = QUOTE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # quote_id -> (quote, created_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.redeemed = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _quote_id(blane: dict, quantity: int, city: str) -> str:
+        values = [blane.get("id"), quantity, city]
+        values += [blane.get(field) for field in PRICING_FIELDS]
+        digest = hashlib.sha1(repr(values).encode()).hexdigest()
+        return f"Q{digest[:10].upper()}"
+
+    def quote(self, blane: dict, quantity, city: str) -> Quote:
+        """The quote for these inputs, reusing one still valid."""
+        quantity = _quantity(quantity)
+        quote_id = self._quote_id(blane, quantity, city)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(quote_id)
+            if entry and now - entry[1] < self.ttl:
+                self._entries.move_to_end(quote_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        quote = price(blane, quantity, city, quote_id)
+        with self._lock:
+            self._entries[quote_id] = (quote, now)
+            self._entries.move_to_end(quote_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return quote
+
+    def redeem(self, quote_id: str, blane: dict, quantity, city: str):
+        """
+        The quote for booking `quantity` of the (freshly fetched) `blane` to
+        `city`, if `quote_id` is that quote; None if the blane's pricing or
+        the booking inputs differ from what was quoted.
+        """
+        quantity = _quantity(quantity)
+        if (quote_id or "").strip().upper() != self._quote_id(blane, quantity, city):
+            with self._lock:
+                self.rejected += 1
+            return None
+        quote = self.quote(blane, quantity, city)
+        with self._lock:
+            self.redeemed += 1
+        return quote
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "redeemed": self.redeemed,
+            "rejected": self.rejected,
+        }
+
+
+quote_book = QuoteBook()
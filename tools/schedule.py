@@ -0,0 +1,222 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date as date_type
+from datetime import datetime, timedelta
+
+BLANE_SCHEDULE_CACHE_MAX_SIZE = int(os.getenv("BLANE_SCHEDULE_CACHE_MAX_SIZE", 1024))
+
+# `jours_creneaux` names the open days in French.
+WEEKDAYS_FR = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+_WEEKDAY_INDEX = {name.lower(): i for i, name in enumerate(WEEKDAYS_FR)}
+_WEEKDAYS_EN = [
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+]  # fmt: skip
+
+# The fields of a blane the schedule is built from; a change to any of them
+# is a new schedule version.
+SCHEDULE_FIELDS = (
+    "type",
+    "type_time",
+    "heure_debut",
+    "heure_fin",
+    "intervale_reservation",
+    "jours_creneaux",
+    "start_date",
+    "expiration_date",
+)
+
+
+def _parse(value, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _parse_day(value):
+    parsed = _parse(value, ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"))
+    return parsed.date() if parsed else None
+
+
+def _slot_grid(heure_debut, heure_fin, interval) -> tuple:
+    """
+    "HH:MM" slot starts from opening up to, not including, closing time: the
+    last slot has to start before the blane closes. A closing time at or
+    before the opening time is past midnight.
+    """
+    formats = ("%Y-%m-%dT%H:%M:%S.%fZ", "%H:%M:%S", "%H:%M")
+    start = _parse(heure_debut, formats)
+    end = _parse(heure_fin, formats)
+    interval = int(interval)
+    if start is None or end is None or interval <= 0:
+        raise ValueError("Could not parse blane time format.")
+    current = datetime.combine(date_type.today(), start.time())
+    end = datetime.combine(date_type.today(), end.time())
+    if end <= current:
+        end += timedelta(days=1)
+    slots = []
+    while current < end:
+        slots.append(current.strftime("%H:%M"))
+        current += timedelta(minutes=interval)
+    return tuple(slots)
+
+
+@dataclass(frozen=True)
+class BlaneSchedule:
+    """
+    When a blane can be booked: its open days, slot grid and date window.
+
+    Built once per schedule version by `ScheduleCache`; the checks are set
+    lookups, so prompt, preview and create validate the same way for free.
+    """
+
+    blane_id: int
+    type_time: str
+    open_days: frozenset  # weekday numbers (Monday = 0); None if every day
+    slots: tuple  # "HH:MM" starts, in order
+    slot_set: frozenset
+    start_date: date_type
+    end_date: date_type
+    error: str = None  # why the slot grid couldn't be built
+
+    @classmethod
+    def from_blane(cls, blane: dict) -> "BlaneSchedule":
+        type_time = blane.get("type_time")
+        slots, error = (), None
+        if blane.get("type") == "reservation" and type_time == "time":
+            try:
+                slots = _slot_grid(
+                    blane.get("heure_debut"),
+                    blane.get("heure_fin"),
+                    blane.get("intervale_reservation"),
+                )
+            except (TypeError, ValueError):
+                error = "Could not parse blane time format."
+
+        jours = blane.get("jours_creneaux")
+        open_days = None
+        if isinstance(jours, list) and jours:
+            open_days = frozenset(
+                _WEEKDAY_INDEX[day.strip().lower()]
+                for day in jours
+                if isinstance(day, str) and day.strip().lower() in _WEEKDAY_INDEX
+            )
+
+        return cls(
+            blane_id=blane.get("id"),
+            type_time=type_time,
+            open_days=open_days,
+            slots=slots,
+            slot_set=frozenset(slots),
+            start_date=_parse_day(blane.get("start_date")),
+            end_date=_parse_day(blane.get("expiration_date")),
+            error=error,
+        )
+
+    def slots_text(self) -> str:
+        return ", ".join(self.slots) if not self.error else "Invalid time format"
+
+    def in_window(self, day: date_type) -> bool:
+        if self.start_date and day < self.start_date:
+            return False
+        if self.end_date and day > self.end_date:
+            return False
+        return True
+
+    def window_text(self) -> str:
+        return f"{self.start_date or '…'} to {self.end_date or '…'}"
+
+    def check_date(self, date: str, label: str = "Reservation date", open_day=True):
+        """An error message for `date` (YYYY-MM-DD), or None if bookable."""
+        try:
+            day = date_type.fromisoformat(date)
+        except (TypeError, ValueError):
+            return "❌ Invalid date format. Use YYYY-MM-DD."
+        if day < date_type.today():
+            return f"❌ {label} {date} must not be in the past."
+        if not self.in_window(day):
+            return f"❌ {label} must be within {self.window_text()}"
+        if (
+            open_day
+            and self.open_days is not None
+            and day.weekday() not in self.open_days
+        ):
+            return f"🚫 This blane is closed on {_WEEKDAYS_EN[day.weekday()]}."
+        return None
+
+    def check_time(self, time: str):
+        """An error message for `time` (HH:MM), or None if it is a slot."""
+        if self.error:
+            return f"❌ {self.error}"
+        if time in self.slot_set:
+            return None
+        if _parse(time, ("%H:%M",)) is None:
+            return "❌ Invalid time format. Use HH:MM."
+        return f"🕓 Invalid time. Choose from: {self.slots_text()}"
+
+    def check(self, date: str, time: str = None, end_date: str = None):
+        """
+        The first problem with a reservation on `date` (and `time` for slot
+        blanes, `end_date` for date-range blanes), or None.
+        """
+        label = "Start date" if self.type_time == "date" else "Reservation date"
+        error = self.check_date(date, label)
+        if error:
+            return error
+        if self.type_time == "time":
+            return self.check_time(time)
+        if self.type_time == "date":
+            error = self.check_date(end_date, "End date", open_day=False)
+            if not error and end_date < date:
+                error = "❌ End date must not be before the start date."
+            return error
+        return None
+
+
+class ScheduleCache:
+    """
+    LRU cache of `BlaneSchedule`s keyed by blane id and the values of
+    `SCHEDULE_FIELDS`, so an edited blane gets a fresh schedule as soon as
+    the detail cache holds the new version.
+    """
+
+    def __init__(self, max_size: int = BLANE_SCHEDULE_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # (blane_id, *fields) -> BlaneSchedule
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(blane: dict) -> tuple:
+        values = []
+        for field in SCHEDULE_FIELDS:
+            value = blane.get(field)
+            values.append(str(value) if isinstance(value, (list, dict)) else value)
+        return (blane.get("id"), *values)
+
+    def get(self, blane: dict) -> BlaneSchedule:
+        key = self._key(blane)
+        with self._lock:
+            schedule = self._entries.get(key)
+            if schedule is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return schedule
+            self.misses += 1
+        schedule = BlaneSchedule.from_blane(blane)
+        with self._lock:
+            self._entries[key] = schedule
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return schedule
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+blane_schedules = ScheduleCache()
@@ -0,0 +1,251 @@
+import importlib.util
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from tools.catalog import catalog
+from tools.text_normalize import tokenize
+
+# A local sentence-embedding model is used when `sentence-transformers` is
+# installed and SEMANTIC_SEARCH_MODEL names one (e.g.
+# "paraphrase-multilingual-MiniLM-L12-v2"); otherwise a hashed TF-IDF.
+SENTENCE_TRANSFORMERS_AVAILABLE = (
+    importlib.util.find_spec("sentence_transformers") is not None
+)
+EMBEDDING_MODEL = os.getenv("SEMANTIC_SEARCH_MODEL", "")
+
+HASH_DIM = int(os.getenv("SEMANTIC_SEARCH_HASH_DIM", 2048))
+TITLE_WEIGHT = 2  # Name tokens count this many times more than description ones
+
+STOPWORDS = set("""
+    a au aux avec ce ces dans de des du en et il la le les leur ma mes mon ne
+    nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes
+    ton un une vos votre vous l d s c j n y
+    an and are as at be by for from i in is it me my of on or the to we with
+    you your
+    """.split())
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(feature: str) -> int:
+    return zlib.crc32(feature.encode()) % HASH_DIM
+
+
+def _features(text: str) -> list:
+    """
+    Words plus their character 3/4-grams, so "photographe", "photography" and
+    "photo" still share most features, and typos only lose a few.
+    """
+    features = []
+    for word in tokenize(text):
+        if word in STOPWORDS:
+            continue
+        features.append(word)
+        padded = f"<{word}>"
+        for n in (3, 4):
+            features.extend("#" + padded[i : i + n] for i in range(len(padded) - n + 1))
+    return features
+
+
+class HashedTfidf:
+    """Hashed bag of words + char n-grams; the index weights them by IDF."""
+
+    name = "hashed-tfidf"
+    uses_idf = True
+    dim = HASH_DIM
+
+    def embed(self, texts: list) -> np.ndarray:
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for r, text in enumerate(texts):
+            counts = Counter(_bucket(f) for f in _features(text))
+            for col, count in counts.items():
+                rows[r, col] = 1.0 + math.log(count)
+        return rows
+
+
+class SentenceEmbedder:
+    """Dense multilingual embeddings from a local sentence-transformers model."""
+
+    uses_idf = False
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list) -> np.ndarray:
+        return self.model.encode(
+            texts, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+
+def _default_embedder():
+    if EMBEDDING_MODEL and SENTENCE_TRANSFORMERS_AVAILABLE:
+        try:
+            return SentenceEmbedder(EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"❌ Could not load embedding model {EMBEDDING_MODEL}: {e}")
+    return HashedTfidf()
+
+
+def _document(blane: dict) -> str:
+    name = blane.get("name") or ""
+    parts = [name] * TITLE_WEIGHT
+    parts += [blane.get("category") or "", blane.get("description") or ""]
+    return "\n".join(str(p) for p in parts)
+
+
+class SemanticIndex:
+    """
+    Vector index over blane name + description for local top-k retrieval.
+
+    Rows live in one L2-normalized float32 matrix, so a search is a single
+    matrix-vector product. The index follows the catalog: a full load rebuilds
+    it (and recomputes IDF), an incremental refresh only re-embeds the blanes
+    that changed, weighting them with the IDF of the last full build.
+    """
+
+    def __init__(self, embedder=None):
+        self._embedder = embedder
+        self._lock = threading.Lock()
+        self._ids = []
+        self._row_of = {}
+        self._matrix = None  # One weighted, L2-normalized row per blane
+        self._idf = None
+        self.builds = 0
+        self.updates = 0
+        self.last_build_ms = None
+        self.last_query_ms = None
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = _default_embedder()
+        return self._embedder
+
+    def __len__(self):
+        return len(self._ids)
+
+    # ----- Building -----
+
+    def _weigh(self, rows: np.ndarray) -> np.ndarray:
+        if self._idf is not None:
+            rows = rows * self._idf
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return rows / norms
+
+    def rebuild(self, blanes: list):
+        started = time.perf_counter()
+        blanes = [b for b in blanes if b.get("id") is not None]
+        raw = self.embedder.embed([_document(b) for b in blanes])
+        idf = None
+        if self.embedder.uses_idf:
+            df = np.count_nonzero(raw, axis=0)
+            idf = np.log((len(raw) + 1) / (df + 1)).astype(np.float32) + 1.0
+        with self._lock:
+            self._idf = idf
+            self._matrix = self._weigh(raw)
+            self._ids = [b["id"] for b in blanes]
+            self._row_of = {blane_id: i for i, blane_id in enumerate(self._ids)}
+            self.builds += 1
+        self.last_build_ms = round((time.perf_counter() - started) * 1000, 1)
+        print(
+            f"🧭 Semantic index built: {len(blanes)} blanes in {self.last_build_ms} ms"
+        )
+
+    def upsert(self, blanes: list):
+        """Re-embeds only the given blanes."""
+        blanes = [b for b in blanes if b.get("id") is not None]
+        if not blanes:
+            return
+        raw = self.embedder.embed([_document(b) for b in blanes])
+        with self._lock:
+            rows = self._weigh(raw)
+            new_rows = []
+            for blane, row in zip(blanes, rows):
+                i = self._row_of.get(blane["id"])
+                if i is None:
+                    self._row_of[blane["id"]] = len(self._ids)
+                    self._ids.append(blane["id"])
+                    new_rows.append(row)
+                else:
+                    self._matrix[i] = row
+            if new_rows:
+                stacked = np.vstack(new_rows)
+                self._matrix = (
+                    stacked
+                    if self._matrix is None
+                    else np.vstack([self._matrix, stacked])
+                )
+            self.updates += 1
+
+    def remove(self, blane_ids):
+        with self._lock:
+            for blane_id in blane_ids:
+                i = self._row_of.pop(blane_id, None)
+                if i is None:
+                    continue
+                # Move the last row into the hole to keep the matrix dense.
+                last = len(self._ids) - 1
+                if i != last:
+                    self._matrix[i] = self._matrix[last]
+                    self._ids[i] = self._ids[last]
+                    self._row_of[self._ids[i]] = i
+                self._ids.pop()
+                self._matrix = self._matrix[:last]
+
+    def sync_with_catalog(self, source, changed_ids):
+        """Catalog listener: full rebuild on load, partial on refresh."""
+        if changed_ids is None:
+            self.rebuild(source.all())
+            return
+        current = [source.get(i) for i in changed_ids]
+        self.upsert([b for b in current if b])
+        self.remove([i for i, b in zip(changed_ids, current) if not b])
+
+    # ----- Querying -----
+
+    def search(self, query: str, k: int = 10) -> list:
+        """Returns up to k (blane_id, cosine score) pairs, best first."""
+        if not len(self) and catalog.ensure_loaded() and len(catalog):
+            self.rebuild(catalog.all())
+
+        started = time.perf_counter()
+        q = self.embedder.embed([query])[0]
+        with self._lock:
+            if self._matrix is None or not len(self._matrix):
+                return []
+            q = self._weigh(q[np.newaxis, :])[0]
+            if not q.any():
+                return []
+            scores = self._matrix @ q
+            ids = list(self._ids)
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return [(ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.embedder.name if self._embedder else None,
+            "size": len(self),
+            "builds": self.builds,
+            "updates": self.updates,
+            "last_build_ms": self.last_build_ms,
+            "last_query_ms": self.last_query_ms,
+        }
+
+
+semantic_index = SemanticIndex()
+catalog.add_listener(semantic_index.sync_with_catalog)
@@ -0,0 +1,43 @@
+import re
+import unicodedata
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Letters NFKD doesn't decompose into base + accent.
+_EXTRA_FOLDS = {"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "đ": "d", "ł": "l", "’": "'"}
+
+
+def _build_fold_table() -> dict:
+    # Latin-1 Supplement + Latin Extended-A cover French and transliterated
+    # Arabic names; anything else (emojis, Arabic script) is left untouched.
+    table = {}
+    for code in range(0xC0, 0x180):
+        char = chr(code)
+        base = "".join(
+            c
+            for c in unicodedata.normalize("NFKD", char)
+            if not unicodedata.combining(c)
+        )
+        if base != char:
+            table[code] = base
+    table.update((ord(k), v) for k, v in _EXTRA_FOLDS.items())
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold(text) -> str:
+    """
+    Lowercases and strips accents, so "Aïn Diab", "ain diab" and "AIN DIAB"
+    compare equal. Emojis and other symbols are kept as-is.
+    """
+    text = str(text or "").lower()
+    if text.isascii():
+        return text
+    return text.translate(_FOLD_TABLE)
+
+
+def tokenize(text) -> list:
+    """Folded alphanumeric words of `text`."""
+    return _WORD_RE.findall(fold(text))
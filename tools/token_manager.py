@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOGIN_URL = "https://api.dabablane.com/api/login"
+# Required: there are no default credentials.
+API_EMAIL = os.getenv("DABABLANE_API_EMAIL")
+API_PASSWORD = os.getenv("DABABLANE_API_PASSWORD")
+
+# How long a token is trusted before logging in again, and how early the
+# background thread refreshes it before that deadline (seconds).
+TOKEN_TTL = int(os.getenv("DABABLANE_TOKEN_TTL", 6 * 3600))
+TOKEN_REFRESH_MARGIN = int(os.getenv("DABABLANE_TOKEN_REFRESH_MARGIN", 300))
+LOGIN_RETRY_DELAY = 30
+
+
+class LoginError(RuntimeError):
+    """No Dabablane API token: credentials missing or the login failed."""
+
+
+class TokenManager:
+    """
+    Process-wide holder for the Dabablane API token.
+
+    Logs in once, keeps the token in memory for `ttl` seconds and refreshes it
+    from a daemon thread shortly before it expires, so tools never pay for a
+    login round-trip on the hot path. Callers that get a 401 should call
+    `invalidate(token)` and ask for a new one.
+    """
+
+    def __init__(
+        self, ttl: int = TOKEN_TTL, refresh_margin: int = TOKEN_REFRESH_MARGIN
+    ):
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl // 2)
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher = None
+
+    def _login(self):
+        # Imported here because the HTTP client layer itself depends on us.
+        from tools.http_client import get_client, timeout_for
+
+        if not API_EMAIL or not API_PASSWORD:
+            raise LoginError(
+                "DABABLANE_API_EMAIL and DABABLANE_API_PASSWORD must be set"
+            )
+        try:
+            response = get_client().post(
+                LOGIN_URL,
+                headers={"Content-Type": "application/json"},
+                json={"email": API_EMAIL, "password": API_PASSWORD},
+                timeout=timeout_for(LOGIN_URL),
+            )
+        except httpx.HTTPError as e:
+            print(f"❌ Dabablane login failed: {e}")
+            return None
+
+        if response.status_code != 200:
+            print(f"❌ Dabablane login failed: {response.status_code}")
+            return None
+        return response.json()["data"]["user_token"]
+
+    def _is_fresh(self) -> bool:
+        return bool(self._token) and time.monotonic() < self._expires_at
+
+    def _refresh_locked(self):
+        token = self._login()
+        if token:
+            self._token = token
+            self._expires_at = time.monotonic() + self.ttl
+        return token
+
+    def cached_token(self):
+        """Returns the cached token if it is still valid, without logging in."""
+        token = self._token
+        return token if self._is_fresh() else None
+
+    def get_token(self):
+        """
+        Returns a valid token, logging in only if none is cached or it expired.
+        Returns None if the login fails; raises LoginError if the credentials
+        aren't configured.
+        """
+        if self._is_fresh():
+            return self._token
+
+        with self._lock:
+            # Another thread may have logged in while we were waiting.
+            if self._is_fresh():
+                return self._token
+            token = self._refresh_locked()
+
+        self.start_background_refresh()
+        return token
+
+    def refresh(self):
+        """Forces a new login and returns the new token (None on failure)."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def invalidate(self, token=None):
+        """
+        Drops the cached token so the next `get_token()` logs in again.
+        If `token` is given, only drops it if it is still the cached one, so
+        concurrent 401s don't throw away a token another thread just fetched.
+        """
+        with self._lock:
+            if token is None or token == self._token:
+                self._token = None
+                self._expires_at = 0.0
+
+    def start_background_refresh(self):
+        """Starts the refresh thread once per process; safe to call repeatedly."""
+        with self._lock:
+            if self._refresher and self._refresher.is_alive():
+                return
+            self._stop.clear()
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="dabablane-token-refresh", daemon=True
+            )
+            self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            wait = self._expires_at - self.refresh_margin - time.monotonic()
+            if self._stop.wait(max(wait, 1)):
+                break
+            if self.refresh() is None:
+                self._stop.wait(LOGIN_RETRY_DELAY)
+
+
+token_manager = TokenManager()